@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+src_path = (Path(__file__).parent.parent / "src/").absolute()
+if str(src_path) + "/" not in sys.path:
+    sys.path.append(str(src_path) + "/")
@@ -0,0 +1,74 @@
+"""
+Times the conversion of a large SKDUPD timetable to CSV files, and the projection of the CSV model objects to rows.
+
+Run from the root of the project: `python -m benchmarks.edifact_to_csvs --repeat 3`
+"""
+import argparse
+import dataclasses
+import time
+from copy import copy, deepcopy
+from pathlib import Path
+from typing import Callable, List
+
+from merits.csvs_zip.collector import dataclass_to_row
+from merits.csvs_zip.collector_in_memory import CollectorInMemory
+from merits.skdupd.csv_model import Por, Train
+from merits.skdupd.edifact_to_csvs import EdifactToCsvs
+
+SKDUPD_EXAMPLE_FILE = Path(__file__).parent.parent / "tests/EDIFACT_examples/SKDUPD_example.r"
+
+
+def get_skdupd_segments(repeat: int) -> List[str]:
+    """
+    Gives the SKDUPD example with its 2_PRD groups repeated.
+    :param repeat: the number of times the groups occur
+    :return: the segments
+    """
+    with open(SKDUPD_EXAMPLE_FILE, "r") as f:
+        segments = f.read().splitlines(keepends=False)
+    group_start = next(idx for idx, segment in enumerate(segments) if segment.startswith("PRD+"))
+    trailer_start = next(idx for idx, segment in enumerate(segments) if segment.startswith("UIT+"))
+    return segments[:group_start] + segments[group_start:trailer_start] * repeat + segments[trailer_start:]
+
+
+def time_it(name: str, function: Callable[[], None], count: int) -> float:
+    """
+    Runs the function and prints the time it took.
+    :param name: to print
+    :param function:
+    :param count: the number of items the function handles, for the throughput
+    :return: the duration in seconds
+    """
+    start = time.perf_counter()
+    function()
+    duration = time.perf_counter() - start
+    print(f"{name:40} {duration:8.3f} s {count / duration:12,.0f} per s")
+    return duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=1, help="The number of times to repeat the example trains.")
+    args = parser.parse_args()
+
+    segments = get_skdupd_segments(args.repeat)
+    convertor = EdifactToCsvs()
+    time_it("EDIFACT to CSVs (segments)", lambda: convertor.load(edifact_segments=segments), len(segments))
+    csv_collector: CollectorInMemory = convertor.get_csv_collector()
+    row_count = sum(
+        len(csv_collector.get_rows(csv_file_name))
+        for csv_file_name in csv_collector.get_csv_file_names()
+    )
+    print(f"{row_count:,} rows")
+
+    # The projection of the objects to rows, as before and after replacing deepcopy and dataclasses.asdict.
+    pors = [Por(por_id=idx, train_id=idx // 10, stop_number=idx % 10, uic="008200100") for idx in range(row_count)]
+    train = Train(train_id=-1, service_number="11602", service_provider="1088")
+    time_it("dataclasses.asdict (rows)", lambda: [dataclasses.asdict(por) for por in pors], row_count)
+    time_it("dataclass_to_row (rows)", lambda: [dataclass_to_row(por) for por in pors], row_count)
+    time_it("deepcopy Train (rows)", lambda: [deepcopy(train) for _ in pors], row_count)
+    time_it("copy Train (rows)", lambda: [copy(train) for _ in pors], row_count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Generates synthetic SKDUPD and TSDUPD messages of configurable size. The segments have the shapes of the all fields
+examples in tests/EDIFACT_examples, so a conversion to CSV files and back gives the same segments.
+"""
+import random
+from dataclasses import dataclass
+from typing import List
+
+ESCAPED_TEXTS = ["?+", "?:", "?*", "?'", "??"]
+"Escaped special characters, as they appear in a segment."
+
+
+@dataclass
+class SkdupdSize:
+    trains: int = 1000
+    stops_per_train: int = 10
+    relations_per_train: int = 2
+    odis_per_train: int = 3
+    escape_density: float = 0.1
+    "The fraction of the texts that contain an escaped special character."
+
+
+@dataclass
+class TsdupdSize:
+    stops: int = 2000
+    synonyms_per_stop: int = 2
+    mcts_per_stop: int = 2
+    footpaths_per_stop: int = 2
+    escape_density: float = 0.1
+    "The fraction of the texts that contain an escaped special character."
+
+
+def _text(rnd: random.Random, text: str, escape_density: float) -> str:
+    """
+    Gives the text, with an escaped special character in the middle for a fraction of the texts.
+    :param rnd:
+    :param text:
+    :param escape_density:
+    :return:
+    """
+    if rnd.random() < escape_density:
+        middle = len(text) // 2
+        return text[:middle] + rnd.choice(ESCAPED_TEXTS) + text[middle:]
+    return text
+
+
+def _time(minutes: int) -> str:
+    return f"{minutes // 60 % 24:02d}{minutes % 60:02d}"
+
+
+def _finish(header: List[str], body: List[str], reference: str) -> List[str]:
+    """
+    Adds the trailer segments with the segment count from UIH to UIT.
+    """
+    return header + body + [f"UIT+1+{len(header) - 1 + len(body) + 1}'", f"UIZ+{reference}+1'"]
+
+
+def generate_skdupd(size: SkdupdSize, seed: int = 1) -> List[str]:
+    """
+    Generates an SKDUPD message with one 2_PRD group per train.
+    :param size:
+    :param seed: for the random escaped characters
+    :return: the segments
+    """
+    rnd = random.Random(seed)
+    reference = "2022-07-26T112758"
+    header = [
+        f"UIB+UNOB:4+{reference}'",
+        f"UIH+SKDUPD:D:04A+1+{reference}'",
+        "MSD+AAR:61'",
+        "ORG+0000+++0000'",
+        f"HDR+81+273:2021-01-01/2021-12-12*45:2022-07-26T1127+{reference}'",
+    ]
+    body: List[str] = []
+    stop_count = max(size.stops_per_train, 2)
+    for train_idx in range(size.trains):
+        name = _text(rnd, f"SERVICE {train_idx}", size.escape_density)
+        body.append(f"PRD+{train_idx + 1}:11:1:3:::{name}+0060**80'")
+        body.append(f"RFR+AVI:{train_idx % 100:02d}'")
+        body.append("POP+273:2021-08-23/2021-08-28::101111'")
+        uics = [f"00{(train_idx * 7 + stop_idx) % 10_000_000:07d}" for stop_idx in range(stop_count)]
+        minutes = 300 + train_idx % 600
+        for stop_idx, uic in enumerate(uics):
+            if stop_idx == 0:
+                body.append(f"POR+{uic}+*{_time(minutes)}+*1+5'")
+                body.append("ASD+7'")
+                body.append("TRF+1'")
+            elif stop_idx == stop_count - 1:
+                body.append(f"POR+{uic}+{_time(minutes)}'")
+                body.append("MES+200:KMT'")
+            else:
+                body.append(f"POR+{uic}+{_time(minutes)}:::1*{_time(minutes + 2)}:::1+3*3+17'")
+                body.append(f"MES+{stop_idx * 10}:KMT'")
+                body.append("ASD+44::0330'")
+                if stop_idx == 1:
+                    for relation_idx in range(size.relations_per_train):
+                        body.append(f"RFR+AUE:{relation_idx % 100:02d}'")
+                        body.append("RLS+13+7'")
+                        body.append("TCE+10+1'")
+            minutes += 7
+        for odi_idx in range(size.odis_per_train):
+            from_idx = odi_idx % (stop_count - 1)
+            to_idx = stop_count - 1
+            body.append(f"ODI+{uics[from_idx]}*{uics[to_idx]}+{from_idx + 1}*{to_idx + 1}'")
+            body.append("PDT++:::84'")
+    return _finish(header, body, reference)
+
+
+def generate_tsdupd(size: TsdupdSize, seed: int = 1) -> List[str]:
+    """
+    Generates a TSDUPD message with one 2_ALS group per stop.
+    :param size:
+    :param seed: for the random escaped characters
+    :return: the segments
+    """
+    rnd = random.Random(seed)
+    reference = "2022-03-24T112355"
+    header = [
+        f"UIB+UNOB:4+{reference}'",
+        f"UIH+TSDUPD:D:04A+1+{reference}'",
+        "MSD+AAR:61'",
+        "ORG+0000+++0000'",
+        f"HDR+81+273:2022-01-01*45:2022-03-24T1123+{reference}'",
+    ]
+    body: List[str] = []
+    for stop_idx in range(size.stops):
+        uic = f"00{stop_idx % 10_000_000:07d}"
+        name = _text(rnd, f"Station {stop_idx}", size.escape_density)
+        body.append(f"ALS+29+{uic}:{name}+375656N+233833E'")
+        body.append("POP+273:2021-08-12/2999-12-31'")
+        body.append("POP+87:0005'")
+        body.append("CNY+GR'")
+        body.append("TIZ+EET:2'")
+        body.append(f"IFT+X02+{_text(rnd, f'St {stop_idx}', size.escape_density)}'")
+        for synonym_idx in range(size.synonyms_per_stop):
+            body.append(f"IFT+AGW::::FR+{_text(rnd, f'Gare {stop_idx} {synonym_idx}', size.escape_density)}'")
+        for mct_idx in range(size.mcts_per_stop):
+            body.append(f"PRD+::::54::0008+{1000 + mct_idx}'")
+        body.append(f"RFR+X01:{uic}'")
+        for footpath_idx in range(size.footpaths_per_stop):
+            body.append(f"RFR+AWN:00{(stop_idx + footpath_idx + 1) % 10_000_000:07d}'")
+            body.append(f"MES+{footpath_idx + 5}:MIN'")
+            body.append("RLS+13+6'")
+    return _finish(header, body, reference)
@@ -0,0 +1,294 @@
+"""
+Runs the benchmark suite on synthetic SKDUPD and TSDUPD messages, see fixtures.py. Every case is timed (the best of a
+number of runs) and run once more under tracemalloc for its peak memory. The results are compared with a stored
+baseline: a case regresses if its throughput drops, or its peak memory grows, by more than the tolerance. A growth of
+the peak memory is ignored if it is small in absolute terms, see MIN_MEMORY_GROWTH_KIB.
+
+Run from the root of the project: `python -m benchmarks.run`. Use --save-baseline to store the results as the new
+baseline. Timings depend on the machine, so keep the baseline of one machine.
+"""
+import argparse
+import dataclasses
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.fixtures import SkdupdSize, TsdupdSize, generate_skdupd, generate_tsdupd
+from merits.csvs_zip.collector_on_disk import CollectorOnDisk
+from merits.edifact.collector_to_file import CollectorToFile
+from merits.edifact.data_handler import DataHandler
+from merits.edifact.edifact_reader import EdifactReader
+from merits.edifact.object_model import DataBranch, DataLeaf
+from merits.skdupd import definition as skdupd_definition
+from merits.skdupd.csvs_to_edifact import CsvsToEdifact as SkdupdCsvsToEdifact
+from merits.skdupd.edifact_to_csvs import EdifactToCsvs as SkdupdEdifactToCsvs
+from merits.tsdupd import definition as tsdupd_definition
+from merits.tsdupd.csvs_to_edifact import CsvsToEdifact as TsdupdCsvsToEdifact
+from merits.tsdupd.edifact_to_csvs import EdifactToCsvs as TsdupdEdifactToCsvs
+
+BASELINE_FILE = Path(__file__).parent / "baseline.json"
+DEFAULT_TOLERANCE = 0.25
+MIN_SECONDS = 1.0
+"Short cases are run more often than the repeat argument, until they took this long in total."
+MIN_MEMORY_GROWTH_KIB = 4.0
+"""
+A smaller growth of the peak memory is no regression, however large the ratio: the peak of a streaming case is a few
+KiB, of which a few objects more would give a large ratio. Buffering the segments of a message grows it by far more.
+"""
+
+
+@dataclass
+class Case:
+    name: str
+    function: Callable[[], None]
+    segment_count: int
+    "The number of EDIFACT segments that the case reads or writes, for the throughput."
+
+
+@dataclass
+class Result:
+    seconds: float
+    segments_per_second: float
+    peak_memory_mib: float
+
+
+class NoOpDataHandler(DataHandler):
+    """
+    Receives all segments, parsed in full, and does nothing with them. This times the EdifactReader on its own.
+    """
+
+    def on_enter_branch(self, branch: DataBranch) -> None:
+        pass
+
+    def on_exit_branch(self, path: str) -> None:
+        pass
+
+    def on_enter_leaf(self, leaf: DataLeaf):
+        pass
+
+    def on_exit_leaf(self, path: str):
+        pass
+
+
+def get_cases(
+        name: str,
+        segments: List[str],
+        definition_module,
+        edifact_to_csvs_class,
+        csvs_to_edifact_class,
+        directory: Path,
+) -> List[Case]:
+    """
+    Gives the cases of one EDIFACT type.
+    :param name: the prefix of the case names
+    :param segments: the input message
+    :param definition_module: the definition module of the type
+    :param edifact_to_csvs_class:
+    :param csvs_to_edifact_class:
+    :param directory: for the files of the cases
+    :return:
+    """
+    edifact_to_csvs = edifact_to_csvs_class()
+    edifact_to_csvs.load(edifact_segments=segments)
+    csv_file_name_2_content = edifact_to_csvs.get_csvs()
+    edifact = "".join(segment + "\n" for segment in segments)
+    check = csvs_to_edifact_class()
+    check.load_csvs(csv_file_name_2_content=csv_file_name_2_content)
+    if check.get() != edifact:
+        raise ValueError(f"The {name} fixture does not convert back to itself.")
+    edifact_file = directory / f"{name}.r"
+    edifact_file.write_text(edifact, encoding="utf-8")
+    csv_directory = directory / f"{name}-csv"
+
+    def edifact_to_csvs_in_memory():
+        edifact_to_csvs_class().load(edifact_segments=segments)
+
+    def edifact_to_csvs_on_disk():
+        if csv_directory.exists():
+            shutil.rmtree(csv_directory)
+        csv_directory.mkdir()
+        csv_collector = CollectorOnDisk(
+            csv_file_name_2_field_names=edifact_to_csvs_class.get_csv_file_name_2_field_names(),
+            directory=csv_directory,
+        )
+        try:
+            edifact_to_csvs_class(csv_collector=csv_collector).load(edifact_segments=edifact_file)
+            csv_collector.close()
+        finally:
+            csv_collector.cleanup()
+
+    def csvs_to_edifact_in_memory():
+        csvs_to_edifact_class().load_csvs(csv_file_name_2_content=csv_file_name_2_content)
+
+    def csvs_to_edifact_to_file():
+        edifact_collector = CollectorToFile(directory / f"{name}-actual.r")
+        try:
+            csvs_to_edifact_class(edifact_collector=edifact_collector).load_csvs(
+                csv_file_name_2_content=csv_file_name_2_content,
+            )
+            edifact_collector.close()
+        finally:
+            edifact_collector.cleanup()
+
+    def read():
+        EdifactReader(definition=definition_module.edifact_definition).read(
+            segments=segments,
+            data_handler=NoOpDataHandler(),
+        )
+
+    def count():
+        edifact_to_csvs_class.count_csv_rows(segments)
+
+    segment_count = len(segments)
+    return [
+        Case(f"{name} read", read, segment_count),
+        Case(f"{name} count", count, segment_count),
+        Case(f"{name} edifact-csv memory", edifact_to_csvs_in_memory, segment_count),
+        Case(f"{name} edifact-csv disk", edifact_to_csvs_on_disk, segment_count),
+        Case(f"{name} csv-edifact memory", csvs_to_edifact_in_memory, segment_count),
+        Case(f"{name} csv-edifact file", csvs_to_edifact_to_file, segment_count),
+    ]
+
+
+def run_case(case: Case, repeat: int) -> Result:
+    """
+    Times the case and measures its peak memory.
+    :param case:
+    :param repeat: the minimum number of timed runs, of which the fastest counts
+    :return:
+    """
+    seconds = float("inf")
+    total_seconds = 0.0
+    run_count = 0
+    while run_count < repeat or total_seconds < MIN_SECONDS:
+        start = time.perf_counter()
+        case.function()
+        run_seconds = time.perf_counter() - start
+        seconds = min(seconds, run_seconds)
+        total_seconds += run_seconds
+        run_count += 1
+    tracemalloc.start()
+    try:
+        case.function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return Result(
+        seconds=seconds,
+        segments_per_second=case.segment_count / seconds,
+        peak_memory_mib=peak / (1024 * 1024),
+    )
+
+
+def compare(
+        name_2_result: Dict[str, Result],
+        baseline: Dict,
+        tolerance: float,
+) -> List[str]:
+    """
+    Prints the results next to the baseline.
+    :param name_2_result:
+    :param baseline: as saved by main
+    :param tolerance: the allowed relative loss of throughput and gain of peak memory. The gain of peak memory is also
+        allowed below MIN_MEMORY_GROWTH_KIB
+    :return: the descriptions of the regressions
+    """
+    regressions = []
+    print(f"{'case':32} {'segments/s':>12} {'baseline':>12} {'ratio':>6} {'peak KiB':>9} {'baseline':>9} {'ratio':>6}")
+    for name, result in name_2_result.items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:32} {result.segments_per_second:12,.0f} {'-':>12} {'':6} {result.peak_memory_mib * 1024:9,.0f}")
+            continue
+        speed_ratio = result.segments_per_second / base["segments_per_second"]
+        memory_ratio = result.peak_memory_mib / base["peak_memory_mib"] if base["peak_memory_mib"] else 1.0
+        print(
+            f"{name:32} {result.segments_per_second:12,.0f} {base['segments_per_second']:12,.0f} {speed_ratio:6.2f}"
+            f" {result.peak_memory_mib * 1024:9,.0f} {base['peak_memory_mib'] * 1024:9,.0f} {memory_ratio:6.2f}"
+        )
+        if speed_ratio < 1 - tolerance:
+            regressions.append(f"{name}: throughput {speed_ratio:.2f} times the baseline")
+        memory_growth_kib = (result.peak_memory_mib - base["peak_memory_mib"]) * 1024
+        if memory_ratio > 1 + tolerance and memory_growth_kib >= MIN_MEMORY_GROWTH_KIB:
+            regressions.append(f"{name}: peak memory {memory_ratio:.2f} times the baseline")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    for size_class, prefix in ((SkdupdSize, "skdupd"), (TsdupdSize, "tsdupd")):
+        for field in dataclasses.fields(size_class):
+            parser.add_argument(
+                f"--{prefix}-{field.name.replace('_', '-')}",
+                type=field.type,
+                default=field.default,
+                help=f"Defaults to {field.default}.",
+            )
+    parser.add_argument("--repeat", type=int, default=3, help="The minimum number of timed runs per case. Defaults to 3.")
+    parser.add_argument("--filter", default="", help="Only run the cases of which the name contains this text.")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE, help="Defaults to benchmarks/baseline.json.")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the baseline.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help=f"The allowed relative regression. Defaults to {DEFAULT_TOLERANCE}.",
+    )
+    args = parser.parse_args(argv)
+    skdupd_size = SkdupdSize(**{
+        field.name: getattr(args, f"skdupd_{field.name}")
+        for field in dataclasses.fields(SkdupdSize)
+    })
+    tsdupd_size = TsdupdSize(**{
+        field.name: getattr(args, f"tsdupd_{field.name}")
+        for field in dataclasses.fields(TsdupdSize)
+    })
+    sizes = {"skdupd": dataclasses.asdict(skdupd_size), "tsdupd": dataclasses.asdict(tsdupd_size)}
+
+    name_2_result: Dict[str, Result] = {}
+    with tempfile.TemporaryDirectory(prefix="merits-benchmark-") as directory:
+        cases = get_cases(
+            "skdupd", generate_skdupd(skdupd_size), skdupd_definition,
+            SkdupdEdifactToCsvs, SkdupdCsvsToEdifact, Path(directory),
+        ) + get_cases(
+            "tsdupd", generate_tsdupd(tsdupd_size), tsdupd_definition,
+            TsdupdEdifactToCsvs, TsdupdCsvsToEdifact, Path(directory),
+        )
+        for case in cases:
+            if args.filter in case.name:
+                name_2_result[case.name] = run_case(case, args.repeat)
+
+    baseline = None
+    if args.baseline.is_file():
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if baseline["sizes"] != sizes:
+            print(f"The baseline in {args.baseline} has other sizes, so it is not compared.")
+            baseline = None
+    regressions = compare(name_2_result, baseline or {"results": {}}, args.tolerance)
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(
+            {
+                "sizes": sizes,
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "results": {name: dataclasses.asdict(result) for name, result in name_2_result.items()},
+            },
+            indent=2,
+        ) + "\n", encoding="utf-8")
+        print(f"Saved the baseline to {args.baseline}.")
+    elif regressions:
+        print("Regressions:\n" + "\n".join(f"    {regression}" for regression in regressions))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,6 +15,8 @@ CONVERSION_SKDUPD_CSV_EDIFACT_MULTI = "skdupd-csv-edifact-multi"
 CONVERSION_SKDUPD_EDIFACT_CSV_MULTI = "skdupd-edifact-csv-multi"
 CONVERSION_TSDUPD_CSV_EDIFACT_MULTI = "tsdupd-csv-edifact-multi"
 CONVERSION_TSDUPD_EDIFACT_CSV_MULTI = "tsdupd-edifact-csv-multi"
+CONVERSION_SKDUPD_EDIFACT_COUNT = "skdupd-edifact-count"
+CONVERSION_TSDUPD_EDIFACT_COUNT = "tsdupd-edifact-count"
 
 CONVERSIONS = [
     CONVERSION_SKDUPD_CSV_EDIFACT,
@@ -25,6 +27,8 @@ CONVERSIONS = [
     CONVERSION_SKDUPD_EDIFACT_CSV_MULTI,
     CONVERSION_TSDUPD_CSV_EDIFACT_MULTI,
     CONVERSION_TSDUPD_EDIFACT_CSV_MULTI,
+    CONVERSION_SKDUPD_EDIFACT_COUNT,
+    CONVERSION_TSDUPD_EDIFACT_COUNT,
 ]
 
 
@@ -39,6 +43,16 @@ class Arguments:
     input: Optional[Path] = None
     output: Optional[Path] = None
     csv_file_name_2_next_id: Optional[Dict[str, int]] = None
+    jobs: int = 1
+    lazy_csv: bool = False
+    unsorted_csv: bool = False
+    sort_csv: bool = False
+    sort_memory: int = 64
+    temp_dir: Optional[Path] = None
+    profile: bool = False
+    profile_stats: Optional[Path] = None
+    segment_stats: Optional[Path] = None
+    memory_report: bool = False
 
 
 class DictAction(Action):
@@ -114,4 +128,76 @@ The defaults for TSDUPD are {tsdupd_definition.EDIFACT_FILE_NAME}, {tsdupd_defin
         help="Sets the first ID's in created CSV files. Example --csv-id SKDUPD_TRAIN.csv=12 SKDUPD_POR.csv=3456"
     )
 
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=1,
+        help="The number of processes to convert one EDIFACT file to CSV files with. For the multi conversions the"
+             " number of files that are converted at the same time. Defaults to 1.",
+    )
+    parser.add_argument(
+        "--lazy-csv",
+        type=bool,
+        default=False,
+        action=BooleanOptionalAction,
+        help="If set, the CSV files are read row by row during a CSV to EDIFACT conversion, instead of loaded into"
+             " memory first.",
+    )
+    parser.add_argument(
+        "--unsorted-csv",
+        type=bool,
+        default=False,
+        action=BooleanOptionalAction,
+        help="If set, the rows of child CSV files do not have to be grouped by parent ID during a CSV to EDIFACT"
+             " conversion. The child tables are then indexed in memory.",
+    )
+    parser.add_argument(
+        "--sort-csv",
+        type=bool,
+        default=False,
+        action=BooleanOptionalAction,
+        help="If set, the CSV files are sorted by parent ID before a CSV to EDIFACT conversion, using temporary files"
+             " for tables that do not fit in the memory budget.",
+    )
+    parser.add_argument(
+        "--sort-memory",
+        type=int,
+        default=64,
+        help="The memory budget in MB per table for --sort-csv. Defaults to 64.",
+    )
+    parser.add_argument(
+        "--temp-dir",
+        type=Path,
+        default=None,
+        help="The directory for temporary files. Defaults to the system default.",
+    )
+    parser.add_argument(
+        "--profile",
+        type=bool,
+        default=False,
+        action=BooleanOptionalAction,
+        help="If set, the wall time, CPU time and throughput of the phases of the conversion are printed at the end.",
+    )
+    parser.add_argument(
+        "--profile-stats",
+        type=Path,
+        default=None,
+        help="A file to write cProfile statistics of the conversion to, which can be read with the pstats module.",
+    )
+    parser.add_argument(
+        "--segment-stats",
+        type=Path,
+        default=None,
+        help="A JSON file to write the number, size, parse or write time and errors of the segments per definition"
+             " path to.",
+    )
+    parser.add_argument(
+        "--memory-report",
+        type=bool,
+        default=False,
+        action=BooleanOptionalAction,
+        help="If set, the peak memory and the top allocation sites of the phases of the conversion are printed at the"
+             " end. This makes the conversion a few times slower.",
+    )
+
     return parser
@@ -15,6 +15,8 @@ from merits.cmd.arg_definition import (
     CONVERSION_SKDUPD_CSV_EDIFACT_MULTI,
     CONVERSION_TSDUPD_EDIFACT_CSV_MULTI,
     CONVERSION_TSDUPD_CSV_EDIFACT_MULTI,
+    CONVERSION_SKDUPD_EDIFACT_COUNT,
+    CONVERSION_TSDUPD_EDIFACT_COUNT,
 )
 from merits.cmd.worker import Worker
 from merits.exceptions import MeritsException
@@ -107,6 +109,16 @@ def csv_2_tsdupd_multi():
     main()
 
 
+def skdupd_count():
+    sys.argv.insert(1, CONVERSION_SKDUPD_EDIFACT_COUNT)
+    main()
+
+
+def tsdupd_count():
+    sys.argv.insert(1, CONVERSION_TSDUPD_EDIFACT_COUNT)
+    main()
+
+
 def _print(s: str):
     """
     Prints to the command line with some wrapping format.
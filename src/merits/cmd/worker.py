@@ -1,6 +1,11 @@
+import cProfile
 import dataclasses
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, nullcontext
 from pathlib import Path
-from typing import Callable, Optional, List, Union
+from types import ModuleType
+from typing import Callable, ContextManager, Dict, Iterable, Optional, List, Tuple, Type, Union
+from zipfile import ZipFile
 
 from merits import common
 from merits.cmd.arg_definition import (
@@ -13,9 +18,30 @@ from merits.cmd.arg_definition import (
     CONVERSION_SKDUPD_EDIFACT_CSV_MULTI,
     CONVERSION_TSDUPD_CSV_EDIFACT_MULTI,
     CONVERSION_TSDUPD_EDIFACT_CSV_MULTI,
+    CONVERSION_SKDUPD_EDIFACT_COUNT,
+    CONVERSION_TSDUPD_EDIFACT_COUNT,
 )
+from merits.csvs_zip.collector_on_disk import CollectorOnDisk
+from merits.csvs_zip.csv_hierarchy import CsvHierarchy
+from merits.csvs_zip.csv_sorter import CsvSorter
 from merits.csvs_zip.rows import RowsFactory
+from merits.edifact.collector_to_file import CollectorToFile
+from merits.edifact.segment_stats import SegmentStats
+from merits.edifact_to_csvs_base import EdifactToCsvsBase
+from merits.edifact_to_csvs_parallel import EdifactToCsvsParallel
 from merits.exceptions import MeritsException
+from merits.memory_tracker import PHASE_CONVERT, MemoryTracker
+from merits.profiler import (
+    PHASE_CSV_READ,
+    PHASE_CSV_SERIALIZE,
+    PHASE_CSV_SORT,
+    PHASE_EDIFACT_READ,
+    PHASE_EDIFACT_WRITE,
+    PHASE_FILE_WRITE,
+    PHASE_OTHER,
+    PHASE_ZIP,
+    Profiler,
+)
 from merits.skdupd import definition as skdupd_definition
 from merits.skdupd.csvs_to_edifact import CsvsToEdifact as SkdupdCsvsToEdifact
 from merits.skdupd.edifact_to_csvs import EdifactToCsvs as SkdupdEdifactToCsv
@@ -41,10 +67,63 @@ class Worker(object):
         """
         self.arguments = arguments
         self._print_function = print_function
+        self._profiler: Optional[Profiler] = Profiler() if arguments.profile else None
+        "Measures the phases of the conversion if --profile is set."
+        self._segment_stats: Optional[SegmentStats] = SegmentStats() if arguments.segment_stats else None
+        "Counts the segments per path if --segment-stats is set."
+        self._memory_tracker: Optional[MemoryTracker] = MemoryTracker() if arguments.memory_report else None
+        "Measures the memory of the phases of the conversion if --memory-report is set."
 
     def run(self) -> None:
         conversion = self.arguments.conversion
-        conversion_2_method = {
+        method = self._get_conversion_2_method().get(conversion)
+        if not method:
+            self._print(
+                f'Sorry conversion {conversion} is not available in this version.'
+            )
+            return
+        c_profile: Optional[cProfile.Profile] = None
+        if self.arguments.profile_stats:
+            c_profile = cProfile.Profile()
+            c_profile.enable()
+        if self._profiler:
+            self._profiler.start(PHASE_OTHER)
+        try:
+            method()
+        finally:
+            if self._profiler:
+                self._profiler.stop()
+            if self._memory_tracker:
+                self._memory_tracker.close()
+            if c_profile:
+                c_profile.disable()
+                self._print(
+                    f'Writing profile statistics to "{self.arguments.profile_stats.resolve()}".'
+                )
+                c_profile.dump_stats(self.arguments.profile_stats)
+        if self._profiler:
+            self._print("Profile:\n" + "\n".join(
+                f"    {line}"
+                for line in self._profiler.get_report()
+            ))
+        if self._memory_tracker:
+            self._print("Memory report:\n" + "\n".join(
+                f"    {line}"
+                for line in self._memory_tracker.get_report()
+            ))
+        if self._segment_stats:
+            self._print(
+                f'Writing segment statistics to "{self.arguments.segment_stats.resolve()}".'
+            )
+            self.arguments.segment_stats.write_text(self._segment_stats.to_json() + "\n", encoding="utf-8")
+
+    def _get_conversion_2_method(self) -> Dict[str, Callable]:
+        """
+        Gives the method of this worker per conversion name. The methods of the single file conversions also take the
+        arguments of one file of a multi conversion.
+        :return:
+        """
+        return {
             CONVERSION_SKDUPD_CSV_EDIFACT: self._skdupd_csv_edifact,
             CONVERSION_SKDUPD_EDIFACT_CSV: self._skdupd_edifact_csv,
             CONVERSION_TSDUPD_CSV_EDIFACT: self._tsdupd_csv_edifact,
@@ -53,25 +132,24 @@ class Worker(object):
             CONVERSION_SKDUPD_EDIFACT_CSV_MULTI: self._skdupd_edifact_csv_multi,
             CONVERSION_TSDUPD_CSV_EDIFACT_MULTI: self._tsdupd_csv_edifact_multi,
             CONVERSION_TSDUPD_EDIFACT_CSV_MULTI: self._tsdupd_edifact_csv_multi,
+            CONVERSION_SKDUPD_EDIFACT_COUNT: self._skdupd_edifact_count,
+            CONVERSION_TSDUPD_EDIFACT_COUNT: self._tsdupd_edifact_count,
         }
-        method = conversion_2_method.get(conversion)
-        if method:
-            method()
-        else:
-            self._print(
-                f'Sorry conversion {conversion} is not available in this version.'
-            )
 
     def _skdupd_csv_edifact_multi(self):
-        self._csv_edifact_multi(self._skdupd_csv_edifact)
+        self._csv_edifact_multi(CONVERSION_SKDUPD_CSV_EDIFACT)
 
     def _tsdupd_csv_edifact_multi(self):
-        self._csv_edifact_multi(self._tsdupd_csv_edifact)
+        self._csv_edifact_multi(CONVERSION_TSDUPD_CSV_EDIFACT)
 
     def _csv_edifact_multi(
             self,
-            target_method: Callable,
+            conversion: str,
     ):
+        """
+        Converts the CSV files of every zip file or subdirectory of the input to an EDIFACT file in the output directory.
+        :param conversion: the name of the conversion of one file
+        """
         if self.arguments.input:
             input_dir = self.arguments.input
         else:
@@ -93,37 +171,57 @@ class Worker(object):
             for k, v in dataclasses.asdict(self.arguments).items()
             if k not in ("input", "output")
         }
+        arguments_list: List[Arguments] = []
         if self.arguments.csv_zip:
             for input_file in input_dir.glob("*.zip"):
                 output_file = output_dir / input_file.with_suffix(".r").name
-                arguments = Arguments(
+                arguments_list.append(Arguments(
                     input=input_file,
                     output=output_file,
                     **args_dict,
-                )
-                target_method(arguments)
+                ))
         else:
             for input_sub_dir in input_dir.iterdir():
                 if not input_sub_dir.is_dir():
                     continue
                 output_file = output_dir / (input_sub_dir.name + ".r")
-                arguments = Arguments(
+                arguments_list.append(Arguments(
                     input=input_sub_dir,
                     output=output_file,
                     **args_dict,
-                )
+                ))
+        if self.arguments.jobs > 1:
+            self._print(f'Converting {len(arguments_list)} inputs with {self.arguments.jobs} processes.')
+            with ProcessPoolExecutor(max_workers=self.arguments.jobs) as executor:
+                futures = [
+                    executor.submit(_run_conversion, conversion, arguments)
+                    for arguments in arguments_list
+                ]
+                for future in futures:
+                    _, profiler, segment_stats, memory_tracker = future.result()
+                    self._merge_instrumentation(profiler, segment_stats, memory_tracker)
+        else:
+            target_method = self._get_conversion_2_method()[conversion]
+            for arguments in arguments_list:
                 target_method(arguments)
 
     def _skdupd_edifact_csv_multi(self):
-        self._edifact_csv_multi(self._skdupd_edifact_csv)
+        self._edifact_csv_multi(CONVERSION_SKDUPD_EDIFACT_CSV, SkdupdEdifactToCsv)
 
     def _tsdupd_edifact_csv_multi(self):
-        self._edifact_csv_multi(self._tsdupd_edifact_csv)
+        self._edifact_csv_multi(CONVERSION_TSDUPD_EDIFACT_CSV, TsdupdEdifactToCsv)
 
     def _edifact_csv_multi(
             self,
-            target_method: Callable,
+            conversion: str,
+            convertor_class: Union[Type[SkdupdEdifactToCsv], Type[TsdupdEdifactToCsv]],
     ):
+        """
+        Converts every *.r file of the input to CSV files in the output directory, with row ID's that count on over all
+        files.
+        :param conversion: the name of the conversion of one file
+        :param convertor_class: counts the rows of a file
+        """
         if self.arguments.input:
             input_dir = self.arguments.input
         else:
@@ -145,26 +243,164 @@ class Worker(object):
             for k, v in dataclasses.asdict(self.arguments).items()
             if k not in ("input", "output", "csv_file_name_2_next_id")
         }
-        csv_file_name_2_next_id = self.arguments.csv_file_name_2_next_id
+        arguments_list: List[Arguments] = []
         for input_file in input_dir.glob("*.r"):
             if self.arguments.csv_zip:
                 output_file = output_dir / input_file.with_suffix(".zip").name
-                arguments = Arguments(
+                arguments_list.append(Arguments(
                     input=input_file,
                     output=output_file,
-                    csv_file_name_2_next_id=csv_file_name_2_next_id,
                     **args_dict,
-                )
+                ))
             else:
                 output_sub_dir = output_dir / input_file.stem
-                arguments = Arguments(
+                arguments_list.append(Arguments(
                     input=input_file,
                     output=output_sub_dir,
-                    csv_file_name_2_next_id=csv_file_name_2_next_id,
                     **args_dict,
-                )
-            target_method(arguments)
-            csv_file_name_2_next_id = arguments.csv_file_name_2_next_id
+                ))
+        csv_file_name_2_next_id = self.arguments.csv_file_name_2_next_id
+        if self.arguments.jobs > 1:
+            csv_file_name_2_next_id = self._edifact_csv_multi_parallel(
+                conversion=conversion,
+                convertor_class=convertor_class,
+                arguments_list=arguments_list,
+            )
+        else:
+            target_method = self._get_conversion_2_method()[conversion]
+            for arguments in arguments_list:
+                arguments.csv_file_name_2_next_id = csv_file_name_2_next_id
+                target_method(arguments)
+                csv_file_name_2_next_id = arguments.csv_file_name_2_next_id
+        if csv_file_name_2_next_id:
+            self.arguments.csv_file_name_2_next_id = csv_file_name_2_next_id
+            self._print(f'Next CSV row ID\'s: {csv_file_name_2_next_id}.')
+
+    def _edifact_csv_multi_parallel(
+            self,
+            conversion: str,
+            convertor_class: Union[Type[SkdupdEdifactToCsv], Type[TsdupdEdifactToCsv]],
+            arguments_list: List[Arguments],
+    ) -> Dict[str, int]:
+        """
+        Converts the files in a pool of processes, one file per process at a time. The rows of every file are counted
+        first, so each file gets the range of row ID's that it would get in a sequential run.
+        :param conversion: the name of the conversion of one file
+        :param convertor_class: counts the rows of a file
+        :param arguments_list: the arguments per file, in the order of a sequential run
+        :return: the next row ID's after the last file
+        :raise MeritsException: if a conversion does not end at the counted row ID's
+        """
+        self._print(f'Converting {len(arguments_list)} files with {self.arguments.jobs} processes.')
+        with ProcessPoolExecutor(max_workers=self.arguments.jobs) as executor:
+            self._print(f'Counting rows.')
+            first_next_ids, csv_file_name_2_next_id = self._get_next_id_ranges(
+                convertor_class=convertor_class,
+                counts=executor.map(
+                    convertor_class.count_csv_rows,
+                    [arguments.input for arguments in arguments_list],
+                ),
+            )
+            for arguments, first_next_id in zip(arguments_list, first_next_ids):
+                # Each file is converted serially in its own process.
+                arguments.jobs = 1
+                arguments.csv_file_name_2_next_id = first_next_id
+            futures = [
+                executor.submit(_run_conversion, conversion, arguments)
+                for arguments in arguments_list
+            ]
+            expected_next_ids = first_next_ids[1:] + [csv_file_name_2_next_id]
+            for arguments, future, expected_next_id in zip(arguments_list, futures, expected_next_ids):
+                next_id, profiler, segment_stats, memory_tracker = future.result()
+                self._merge_instrumentation(profiler, segment_stats, memory_tracker)
+                if next_id != expected_next_id:
+                    raise MeritsException(
+                        f'Converting "{arguments.input}" ended at row ID\'s {next_id}'
+                        f' instead of the counted {expected_next_id}.'
+                    )
+        return csv_file_name_2_next_id
+
+    def _get_next_id_ranges(
+            self,
+            convertor_class: Union[Type[SkdupdEdifactToCsv], Type[TsdupdEdifactToCsv]],
+            counts: Iterable[Dict[str, int]],
+    ) -> Tuple[List[Dict[str, int]], Dict[str, int]]:
+        """
+        Gives the row ID's with which to convert a number of files so the ID's count on over all files. The first file
+        starts at the --csv-id arguments.
+        :param convertor_class: gives the default first row ID's
+        :param counts: the number of rows per CSV file, per file, see count_csv_rows
+        :return: the first row ID's per file, the next row ID's after the last file
+        """
+        csv_file_name_2_next_id = convertor_class().get_csv_file_name_2_next_id()
+        for csv_file_name, next_id in (self.arguments.csv_file_name_2_next_id or {}).items():
+            # Like the convertor, ignore unknown CSV file names.
+            if csv_file_name in csv_file_name_2_next_id:
+                csv_file_name_2_next_id[csv_file_name] = next_id
+        first_next_ids: List[Dict[str, int]] = []
+        for csv_file_name_2_count in counts:
+            first_next_ids.append(csv_file_name_2_next_id)
+            csv_file_name_2_next_id = {
+                csv_file_name: next_id + csv_file_name_2_count.get(csv_file_name, 0)
+                for csv_file_name, next_id in csv_file_name_2_next_id.items()
+            }
+        return first_next_ids, csv_file_name_2_next_id
+
+    def _skdupd_edifact_count(self):
+        self._edifact_count(
+            conversion_name=CONVERSION_SKDUPD_EDIFACT_COUNT,
+            convertor_class=SkdupdEdifactToCsv,
+            default_input=Path(skdupd_definition.EDIFACT_FILE_NAME),
+        )
+
+    def _tsdupd_edifact_count(self):
+        self._edifact_count(
+            conversion_name=CONVERSION_TSDUPD_EDIFACT_COUNT,
+            convertor_class=TsdupdEdifactToCsv,
+            default_input=Path(tsdupd_definition.EDIFACT_FILE_NAME),
+        )
+
+    def _edifact_count(
+            self,
+            conversion_name: str,
+            convertor_class: Union[Type[SkdupdEdifactToCsv], Type[TsdupdEdifactToCsv]],
+            default_input: Path,
+    ):
+        """
+        Counts the CSV rows of one EDIFACT file or of the *.r files in a directory, and gives the --csv-id arguments with
+        which to convert each file so the row ID's count on over all files, like a multi conversion does.
+        """
+        self._print(f'Running {conversion_name}.')
+        source = self._with_default(self.arguments.input, default_input)
+        if source.is_dir():
+            input_files = list(source.glob("*.r"))
+        elif source.is_file():
+            input_files = [source]
+        else:
+            raise FileNotFoundError(
+                f'No such file or directory: "{source.resolve()}".'
+            )
+        if self.arguments.jobs > 1:
+            with ProcessPoolExecutor(max_workers=self.arguments.jobs) as executor:
+                counts = list(executor.map(convertor_class.count_csv_rows, input_files))
+        else:
+            counts = [convertor_class.count_csv_rows(input_file) for input_file in input_files]
+        first_next_ids, csv_file_name_2_next_id = self._get_next_id_ranges(
+            convertor_class=convertor_class,
+            counts=counts,
+        )
+        lines = [
+            f'{input_file.name}: {_to_csv_id_argument(first_next_id)}'
+            for input_file, first_next_id in zip(input_files, first_next_ids)
+        ]
+        lines.append(f'next: {_to_csv_id_argument(csv_file_name_2_next_id)}')
+        for line in lines:
+            self._print(line)
+        if self.arguments.output:
+            self._print(f'Writing the arguments to "{self.arguments.output.resolve()}".')
+            self.arguments.output.write_text("".join(line + "\n" for line in lines), encoding="utf-8")
+        self.arguments.csv_file_name_2_next_id = csv_file_name_2_next_id
+        self._print(f"Finished {conversion_name}.")
 
     def _skdupd_csv_edifact(
             self,
@@ -187,7 +423,8 @@ class Worker(object):
                 skdupd_definition.POR_FILE_NAME,
                 skdupd_definition.TRAIN_FILE_NAME,
             ],
-            convertor=SkdupdCsvsToEdifact(),
+            convertor_class=SkdupdCsvsToEdifact,
+            csv_hierarchy=skdupd_definition.get_csv_hierarchy(),
         )
 
     def _tsdupd_csv_edifact(
@@ -211,7 +448,8 @@ class Worker(object):
                 tsdupd_definition.MCT_FILE_NAME,
                 tsdupd_definition.FOOTPATH_FILE_NAME,
             ],
-            convertor=TsdupdCsvsToEdifact(),
+            convertor_class=TsdupdCsvsToEdifact,
+            csv_hierarchy=tsdupd_definition.get_csv_hierarchy(),
         )
 
     def _skdupd_edifact_csv(
@@ -224,16 +462,14 @@ class Worker(object):
             default_output = Path(skdupd_definition.CSV_ZIP_FILE_NAME)
         else:
             default_output = Path()
-        convertor = SkdupdEdifactToCsv()
-        if arguments.csv_file_name_2_next_id:
-            convertor.set_csv_file_name_2_next_id(arguments.csv_file_name_2_next_id)
         self._edifact_csv(
+            arguments=arguments,
             source=self._with_default(arguments.input, Path(skdupd_definition.EDIFACT_FILE_NAME)),
             destination=self._with_default(arguments.output, default_output),
             conversion_name=CONVERSION_SKDUPD_EDIFACT_CSV,
-            convertor=convertor,
+            convertor_class=SkdupdEdifactToCsv,
+            definition_module=skdupd_definition,
         )
-        arguments.csv_file_name_2_next_id = convertor.get_csv_file_name_2_next_id()
 
     def _tsdupd_edifact_csv(
             self,
@@ -245,31 +481,72 @@ class Worker(object):
             default_output = Path(tsdupd_definition.CSV_ZIP_FILE_NAME)
         else:
             default_output = Path()
-        convertor = TsdupdEdifactToCsv()
-        if arguments.csv_file_name_2_next_id:
-            convertor.set_csv_file_name_2_next_id(arguments.csv_file_name_2_next_id)
         self._edifact_csv(
+            arguments=arguments,
             source=self._with_default(arguments.input, Path(tsdupd_definition.EDIFACT_FILE_NAME)),
             destination=self._with_default(arguments.output, default_output),
             conversion_name=CONVERSION_TSDUPD_EDIFACT_CSV,
-            convertor=convertor,
+            convertor_class=TsdupdEdifactToCsv,
+            definition_module=tsdupd_definition,
         )
-        arguments.csv_file_name_2_next_id = convertor.get_csv_file_name_2_next_id()
+
+    @staticmethod
+    def _create_edifact_to_csvs(
+            arguments: Arguments,
+            convertor_class: Type[EdifactToCsvsBase],
+            definition_module: ModuleType,
+            csv_collector: CollectorOnDisk,
+            profiler: Optional[Profiler],
+            segment_stats: Optional[SegmentStats],
+    ) -> EdifactToCsvsBase:
+        """
+        Gives the convertor, running in parallel if more than one job is requested.
+        :param arguments:
+        :param convertor_class: the serial convertor
+        :param definition_module: the definition module of the EDIFACT type
+        :param csv_collector: receives the converted rows
+        :param profiler: times the phases of a serial convertor. The phases of a parallel convertor run in other
+            processes and are not timed
+        :param segment_stats: counts the segments of a serial convertor, like the profiler
+        :return:
+        """
+        if arguments.jobs > 1:
+            convertor = EdifactToCsvsParallel(
+                convertor_class=convertor_class,
+                definition=definition_module.edifact_definition,
+                csv_hierarchy=definition_module.get_csv_hierarchy(),
+                partition_path=definition_module.PARTITION_PATH,
+                jobs=arguments.jobs,
+                csv_collector=csv_collector,
+            )
+        else:
+            convertor = convertor_class(
+                csv_collector=csv_collector,
+                profiler=profiler,
+                segment_observer=segment_stats,
+            )
+        if arguments.csv_file_name_2_next_id:
+            convertor.set_csv_file_name_2_next_id(arguments.csv_file_name_2_next_id)
+        return convertor
 
     def _edifact_csv(
             self,
+            arguments: Arguments,
             source: Path,
             destination: Path,
             conversion_name: str,
-            convertor: Union[SkdupdEdifactToCsv, TsdupdEdifactToCsv],
+            convertor_class: Type[EdifactToCsvsBase],
+            definition_module: ModuleType,
     ):
         self._print(f'Running {conversion_name}.')
         self._print(
             f'Reading source file from "{source.resolve()}".'
         )
-        with open(source, "r") as f:
-            edifact_segments = f.read().splitlines(keepends=False)
-        is_csv_zip = self.arguments.csv_zip
+        if not source.is_file():
+            raise FileNotFoundError(
+                f'No such file: "{source.resolve()}".'
+            )
+        is_csv_zip = arguments.csv_zip
         if destination.is_file() and not is_csv_zip:
             raise MeritsException(
                 f'The output, "{destination.resolve()}" is an existing file but a directory was expected.'
@@ -282,28 +559,55 @@ class Worker(object):
             self._print(
                 f'Creating destination directory "{destination_directory.resolve()}".'
             )
-            destination_directory.mkdir(parents=True)
+            destination_directory.mkdir(parents=True, exist_ok=True)
 
-        self._print(
-            f'Starting conversion.'
+        # The rows are written to temporary CSV files as they are converted, which are moved into the destination
+        # directory, or copied into the ZIP file, at the end. A failed conversion leaves no partial files.
+        csv_collector = CollectorOnDisk(
+            csv_file_name_2_field_names=convertor_class.get_csv_file_name_2_field_names(),
+            directory=None if is_csv_zip else destination,
         )
-        convertor.load(edifact_segments=edifact_segments)
-
-        if is_csv_zip:
+        try:
+            convertor = self._create_edifact_to_csvs(
+                arguments=arguments,
+                convertor_class=convertor_class,
+                definition_module=definition_module,
+                csv_collector=csv_collector,
+                profiler=self._profiler,
+                segment_stats=self._segment_stats,
+            )
+            if not is_csv_zip:
+                self._print(
+                    f'Writing destination files to directory "{destination.resolve()}".'
+                )
             self._print(
-                f'Writing to ZIP destination "{destination.resolve()}".'
+                f'Starting conversion.'
             )
-            with open(destination, "wb") as f:
-                f.write(convertor.get_zip())
-        else:
-            csv_file_name_2_content = convertor.get_csvs()
-            for csv_file_name, content in csv_file_name_2_content.items():
-                file = destination / csv_file_name
+            # The source file is read lazily during the conversion.
+            with self._memory_phase(PHASE_CONVERT):
+                convertor.load(edifact_segments=source)
+
+            with self._phase(PHASE_FILE_WRITE):
+                csv_collector.close()
+            csv_size = 0
+            if self._profiler:
+                csv_size = sum(
+                    csv_collector.get_csv_file(csv_file_name).stat().st_size
+                    for csv_file_name in convertor_class.get_csv_file_name_2_field_names()
+                )
+                self._profiler.add(PHASE_EDIFACT_READ, byte_count=source.stat().st_size)
+                self._profiler.add(PHASE_CSV_SERIALIZE, byte_count=csv_size)
+            if is_csv_zip:
                 self._print(
-                    f'Writing destination file "{file.resolve()}".'
+                    f'Writing to ZIP destination "{destination.resolve()}".'
                 )
-                with open(file, "w") as f:
-                    f.write(content)
+                with self._phase(PHASE_ZIP):
+                    csv_collector.to_zip(destination)
+                if self._profiler:
+                    self._profiler.add(PHASE_ZIP, byte_count=csv_size)
+        finally:
+            csv_collector.cleanup()
+        arguments.csv_file_name_2_next_id = convertor.get_csv_file_name_2_next_id()
         self._print(f"Finished {conversion_name}.")
 
     def _csv_edifact(
@@ -312,7 +616,8 @@ class Worker(object):
             destination: Path,
             conversion_name: str,
             name_pass_filter: List[str],
-            convertor: Union[SkdupdCsvsToEdifact, TsdupdCsvsToEdifact],
+            convertor_class: Union[Type[SkdupdCsvsToEdifact], Type[TsdupdCsvsToEdifact]],
+            csv_hierarchy: CsvHierarchy,
     ):
         self._print(f'Running {conversion_name}.')
         is_csv_zip = self.arguments.csv_zip
@@ -320,36 +625,124 @@ class Worker(object):
             self._print(
                 f'Reading source files from ZIP "{source.resolve()}".'
             )
-            csv_file_name_2_rows = RowsFactory.from_zip(
-                zipped=source,
-            )
+            with self._phase(PHASE_CSV_READ):
+                csv_file_name_2_rows = RowsFactory.from_zip(
+                    zipped=source,
+                    pre_load=not self.arguments.lazy_csv,
+                    positional=True,
+                )
+            if self._profiler:
+                with ZipFile(source) as zf:
+                    self._profiler.add(PHASE_CSV_READ, byte_count=sum(zinfo.file_size for zinfo in zf.infolist()))
         else:
             self._print(
                 f'Reading source files from directory "{source.resolve()}".'
             )
-            csv_file_name_2_rows = RowsFactory.from_directory(
-                directory=source,
-                name_pass_filter=name_pass_filter,
-            )
+            with self._phase(PHASE_CSV_READ):
+                csv_file_name_2_rows = RowsFactory.from_directory(
+                    directory=source,
+                    name_pass_filter=name_pass_filter,
+                    pre_load=not self.arguments.lazy_csv,
+                    positional=True,
+                )
+            if self._profiler:
+                self._profiler.add(PHASE_CSV_READ, byte_count=sum(
+                    (source / csv_file_name).stat().st_size
+                    for csv_file_name in csv_file_name_2_rows
+                ))
         if not destination.parent.is_dir():
             self._print(
                 f'Creating destination directory "{destination.parent.resolve()}".'
             )
-            destination.parent.mkdir(parents=True)
+            destination.parent.mkdir(parents=True, exist_ok=True)
 
         self._print(
-            f'Starting conversion.'
+            f'Starting conversion, writing to destination "{destination.resolve()}".'
         )
-        convertor.load(csv_file_name_2_rows=csv_file_name_2_rows)
-        edifact: str = convertor.get()
-
-        self._print(
-            f'Writing to destination "{destination.resolve()}".'
-        )
-        with open(destination, "w") as f:
-            f.write(edifact)
+        csv_sorter: Optional[CsvSorter] = None
+        try:
+            if self.arguments.sort_csv:
+                self._print(
+                    f'Sorting source files.'
+                )
+                csv_sorter = CsvSorter(
+                    csv_hierarchy=csv_hierarchy,
+                    memory_budget=self.arguments.sort_memory * 1024 * 1024,
+                    temporary_directory=self.arguments.temp_dir,
+                )
+                with self._phase(PHASE_CSV_SORT):
+                    csv_file_name_2_rows = csv_sorter.sort(csv_file_name_2_rows)
+            edifact_collector = CollectorToFile(destination)
+            try:
+                convertor = convertor_class(
+                    edifact_collector=edifact_collector,
+                    unsorted_csvs=self.arguments.unsorted_csv,
+                    profiler=self._profiler,
+                    segment_observer=self._segment_stats,
+                )
+                with self._memory_phase(PHASE_CONVERT):
+                    convertor.load(csv_file_name_2_rows=csv_file_name_2_rows)
+                with self._phase(PHASE_FILE_WRITE):
+                    edifact_collector.close()
+            finally:
+                # Removes the partial output if the conversion failed.
+                edifact_collector.cleanup()
+        finally:
+            RowsFactory.close(csv_file_name_2_rows)
+            if csv_sorter:
+                csv_sorter.cleanup()
+        if self._profiler:
+            self._profiler.add(PHASE_EDIFACT_WRITE, byte_count=destination.stat().st_size)
         self._print(f"Finished {conversion_name}.")
 
+    def _phase(self, name: str) -> ContextManager:
+        """
+        Runs the body of a with statement as a phase of the profiler and of the memory tracker, if any.
+        :param name:
+        :return:
+        """
+        if not self._memory_tracker:
+            if self._profiler:
+                return self._profiler.phase(name)
+            return nullcontext()
+        if not self._profiler:
+            return self._memory_tracker.phase(name)
+        exit_stack = ExitStack()
+        exit_stack.enter_context(self._memory_tracker.phase(name))
+        exit_stack.enter_context(self._profiler.phase(name))
+        return exit_stack
+
+    def _memory_phase(self, name: str) -> ContextManager:
+        """
+        Runs the body of a with statement as a phase of the memory tracker, if any. This is for phases that the profiler
+        splits up further.
+        :param name:
+        :return:
+        """
+        if self._memory_tracker:
+            return self._memory_tracker.phase(name)
+        return nullcontext()
+
+    def _merge_instrumentation(
+            self,
+            profiler: Optional[Profiler],
+            segment_stats: Optional[SegmentStats],
+            memory_tracker: Optional[MemoryTracker],
+    ) -> None:
+        """
+        Adds the measurements of a conversion in another process.
+        :param profiler: as returned by _run_conversion
+        :param segment_stats: as returned by _run_conversion
+        :param memory_tracker: as returned by _run_conversion
+        :return: None
+        """
+        if self._profiler and profiler:
+            self._profiler.merge(profiler)
+        if self._segment_stats and segment_stats:
+            self._segment_stats.merge(segment_stats)
+        if self._memory_tracker and memory_tracker:
+            self._memory_tracker.merge(memory_tracker)
+
     def _print(self, s):
         logger.info(s)
         if self._print_function:
@@ -360,3 +753,41 @@ class Worker(object):
         if value:
             return value
         return default
+
+
+def _run_conversion(
+        conversion: str,
+        arguments: Arguments,
+) -> Tuple[Optional[Dict[str, int]], Optional[Profiler], Optional[SegmentStats], Optional[MemoryTracker]]:
+    """
+    Runs the conversion of one file of a multi conversion. This runs in a worker process, with a new Worker that has its
+    own profiler, segment statistics and memory tracker if the arguments ask for them.
+    :param conversion: the name of the conversion of one file, like CONVERSION_SKDUPD_EDIFACT_CSV
+    :param arguments: the arguments of the file
+    :return: the next row ID's after an EDIFACT to CSVs conversion, and the profiler, segment statistics and memory
+        tracker of the conversion if used
+    """
+    worker = Worker(arguments)
+    profiler, segment_stats, memory_tracker = worker._profiler, worker._segment_stats, worker._memory_tracker
+    if profiler:
+        profiler.start(PHASE_OTHER)
+    try:
+        worker._get_conversion_2_method()[conversion](arguments)
+    finally:
+        if profiler:
+            profiler.stop()
+        if memory_tracker:
+            memory_tracker.close()
+    return arguments.csv_file_name_2_next_id, profiler, segment_stats, memory_tracker
+
+
+def _to_csv_id_argument(csv_file_name_2_next_id: Dict[str, int]) -> str:
+    """
+    Formats row ID's as a command line argument.
+    :param csv_file_name_2_next_id:
+    :return: for example "--csv-id SKDUPD_TRAIN.csv=12 SKDUPD_POR.csv=3456"
+    """
+    return "--csv-id " + " ".join(
+        f"{csv_file_name}={next_id}"
+        for csv_file_name, next_id in csv_file_name_2_next_id.items()
+    )
@@ -1,8 +1,11 @@
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Dict, BinaryIO, Union
+from typing import Dict, BinaryIO, Iterator, Union
 
+from merits.csvs_zip.csv_reader import CsvReader
 from merits.csvs_zip.rows import RowsFactory, Rows
+from merits.edifact.collector import Collector
+from merits.edifact.collector_to_iterator import CollectorToIterator
 
 
 class CsvsToEdifactBase(ABC):
@@ -21,7 +24,7 @@ class CsvsToEdifactBase(ABC):
         :param zipped: source: [str or Path] the path to a file; [bytes] the zipped bytes; [BinaryIO] file-like
         :return: None
         """
-        csv_file_name_2_rows = RowsFactory.from_zip(zipped)
+        csv_file_name_2_rows = RowsFactory.from_zip(zipped, positional=True)
         self.load(csv_file_name_2_rows)
 
     def load_csvs(
@@ -34,7 +37,7 @@ class CsvsToEdifactBase(ABC):
         :return:
         """
         csv_file_name_2_rows = {
-            csv_file_name: RowsFactory.from_string(content)
+            csv_file_name: RowsFactory.from_string(content, positional=True)
             for csv_file_name, content in csv_file_name_2_content.items()
         }
         self.load(csv_file_name_2_rows)
@@ -55,10 +58,52 @@ class CsvsToEdifactBase(ABC):
         """
         pass
 
+    def iter_segments(
+            self,
+            csv_file_name_2_rows: Dict[str, Rows],
+    ) -> Iterator[str]:
+        """
+        Converts like load, but gives the EDIFACT segments while they are written instead of collecting them. The
+        segments of each row of the root table (like a train) with its child rows are given as soon as that row is
+        handled, so the output can be piped to a socket, a compressor or a file in constant memory. The number of
+        segments in UIT is counted while the segments are given. The collector of the convertor is not used.
+
+        The rows are read as the segments are taken, so with lazy Rows (see RowsFactory) the input is not held in
+        memory either. Stopping the iteration stops the conversion. The caller closes the Rows, as for load.
+
+        :param csv_file_name_2_rows: see load
+        :return: the segments, without end-of-line
+        """
+        edifact_collector = CollectorToIterator()
+        csv_reader = self._create_csv_reader(edifact_collector)
+        for _ in csv_reader.iter_read(csv_file_name_2_rows):
+            yield from edifact_collector.pop_segments()
+
+    @abstractmethod
+    def _create_csv_reader(
+            self,
+            edifact_collector: Collector,
+    ) -> CsvReader:
+        """
+        Creates the CSV reader with the CSV handler that converts the rows to segments for the collector.
+        :param edifact_collector:
+        :return:
+        """
+        pass
+
     @abstractmethod
     def get(self) -> str:
         """
-        After loading is completed, this method returns the EDIFACT file content as one string.
+        After loading is completed, this method returns the EDIFACT file content as one string. This is only possible
+        when the segments are collected in memory.
+        :return:
+        """
+        pass
+
+    @abstractmethod
+    def get_edifact_collector(self) -> Collector:
+        """
+        Gives the collector that receives the EDIFACT segments.
         :return:
         """
         pass
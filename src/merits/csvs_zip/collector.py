@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Any, Dict
 
 
 class Collector(ABC):
@@ -20,3 +20,13 @@ class Collector(ABC):
         :return:
         """
         pass
+
+
+def dataclass_to_row(obj: Any) -> Dict[str, Any]:
+    """
+    Gives the fields of a dataclass object (like in a csv_model module) as a row for a Collector. Unlike
+    dataclasses.asdict this is a shallow copy, which is much faster and enough for fields with immutable values.
+    :param obj: a dataclass object with a __dict__ (so without slots)
+    :return: a new dict in the order of the fields
+    """
+    return vars(obj).copy()
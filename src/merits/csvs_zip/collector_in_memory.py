@@ -53,6 +53,21 @@ class CollectorInMemory(Collector):
         row_list = self._csv_file_name_2_row_list[csv_file_name]
         row_list.append(row)
 
+    def get_csv_file_names(self) -> List[str]:
+        """
+        Gives the names of the CSV files in the order of the constructor argument.
+        :return:
+        """
+        return list(self._csv_file_name_2_field_names.keys())
+
+    def get_rows(self, csv_file_name: str) -> List[Dict[str, str]]:
+        """
+        Gives the collected rows for one CSV file. The list is not copied.
+        :param csv_file_name:
+        :return:
+        """
+        return self._csv_file_name_2_row_list[csv_file_name]
+
     def to_zip(self, file=None) -> Optional[bytes]:
         """
         Writes the collected data to CSV files in a ZIP file.
@@ -0,0 +1,199 @@
+import csv
+import io
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Any, TextIO
+from zipfile import ZipFile, ZipInfo
+
+from merits.csvs_zip import config
+from merits.csvs_zip.collector import Collector
+from merits.exceptions import MeritsException
+
+
+class CollectorOnDisk(Collector):
+    """
+    Writes the rows to a CSV file per table as they are collected, so the rows do not have to be kept in memory. The
+    files are either written to a given directory, or to a temporary directory from which they can be copied into a ZIP
+    file.
+
+    The files for a given directory are written to a temporary directory in it first, and moved into place when the
+    collector is closed. So a conversion that fails, and calls cleanup without close, leaves no partial files.
+    """
+
+    def __init__(
+            self,
+            csv_file_name_2_field_names: Dict[str, List[str]],
+            directory: Optional[Path] = None,
+            csv_dict_writer_kwargs: Optional[Dict[str, Any]] = None,
+            zip_file_kwargs: Optional[Dict[str, Any]] = None,
+    ):
+        """
+
+        :param csv_file_name_2_field_names:
+        :param directory: the existing directory to write the CSV files to when the collector is closed. If None, the
+            files are written to a temporary directory that is removed by cleanup.
+        :param csv_dict_writer_kwargs: arguments passed on to csv.DictWriter constructor. Note that fieldnames is
+        obtained from csv_file_name_2_field_names and can NOT be set here.
+        :param zip_file_kwargs: arguments passed on to zipfile.ZipFile.
+        """
+        super().__init__()
+
+        self._csv_file_name_2_field_names = csv_file_name_2_field_names
+        if csv_dict_writer_kwargs and "fieldnames" in csv_dict_writer_kwargs:
+            del csv_dict_writer_kwargs["fieldnames"]
+        self._csv_dict_writer_kwargs = config.get_csv_dict_writer_kwargs(csv_dict_writer_kwargs)
+        if zip_file_kwargs:
+            self._zip_file_kwargs = {
+                k: v
+                for k, v in zip_file_kwargs.items()
+                if k != "mode"
+            }
+        else:
+            self._zip_file_kwargs = {}
+
+        self._destination: Optional[Path] = directory
+        "The directory to move the files to when closing, if any."
+        if directory is None:
+            # The files are only copied into a ZIP file: write them as ZipFile.writestr would encode the text.
+            self._open_kwargs = {"encoding": "utf-8", "newline": ""}
+        else:
+            # The same as writing the text of a CollectorInMemory to a file with default options.
+            self._open_kwargs = {}
+        # A temporary directory in the given directory, so the files can be moved instead of copied.
+        self._temporary_directory: Optional[tempfile.TemporaryDirectory] = tempfile.TemporaryDirectory(
+            prefix="merits-" if directory is None else ".merits-",
+            dir=directory,
+        )
+        self.directory = Path(self._temporary_directory.name)
+        "The directory with the files, which is the given directory once the collector is closed."
+
+        self._csv_file_name_2_file: Dict[str, TextIO] = {}
+        self._csv_file_name_2_writer: Dict[str, csv.DictWriter] = {}
+
+    def collect(self, csv_file_name: str, row: Dict[str, str]) -> None:
+        writer = self._csv_file_name_2_writer.get(csv_file_name)
+        if writer is None:
+            writer = self._open(csv_file_name)
+        writer.writerow(row)
+
+    def get_csv_file(self, csv_file_name: str) -> Path:
+        """
+        Gives the path of the file that the rows of one CSV file are written to.
+        :param csv_file_name:
+        :return:
+        """
+        return self.directory / csv_file_name
+
+    def close(self) -> None:
+        """
+        Finishes the CSV files and moves them to the given directory, if any. Files without rows get only the header.
+        This may be called more than once.
+        :return: None
+        """
+        for csv_file_name in self._csv_file_name_2_field_names.keys():
+            if csv_file_name not in self._csv_file_name_2_writer:
+                self._open(csv_file_name)
+        self._close_files()
+        if self._destination is not None:
+            for csv_file_name in self._csv_file_name_2_field_names.keys():
+                os.replace(self.get_csv_file(csv_file_name), self._destination / csv_file_name)
+            self.directory = self._destination
+            self._destination = None
+            self._temporary_directory.cleanup()
+            self._temporary_directory = None
+
+    def cleanup(self) -> None:
+        """
+        Closes the files and removes the temporary directory, if used. Files that were not moved to the given directory
+        by close are removed too.
+        :return: None
+        """
+        self._close_files()
+        if self._temporary_directory:
+            self._temporary_directory.cleanup()
+            self._temporary_directory = None
+
+    def to_zip(self, file=None) -> Optional[bytes]:
+        """
+        Closes the CSV files and copies them into a ZIP file, one at a time.
+
+        :param file: as for zipfile.ZipFile can be a path to a file (a string), a file-like object or a path-like
+        object. It can also be None to get bytes instead of writing to file.
+        :return: the zipped bytes only if argument file was None
+        """
+        self.close()
+        no_file = file is None
+        if no_file:
+            file = io.BytesIO()
+        with ZipFile(
+            file,
+            mode="w",
+            **self._zip_file_kwargs,
+        ) as zf:
+            for csv_file_name in self._csv_file_name_2_field_names.keys():
+                csv_file = self.get_csv_file(csv_file_name)
+                # The same member attributes as ZipFile.writestr gives.
+                zinfo = ZipInfo(filename=csv_file_name, date_time=time.localtime(time.time())[:6])
+                zinfo.compress_type = zf.compression
+                zinfo.external_attr = 0o600 << 16
+                # Knowing the size up front lets ZipFile decide if ZIP64 is needed.
+                zinfo.file_size = csv_file.stat().st_size
+                with open(csv_file, "rb") as source, zf.open(zinfo, mode="w") as destination:
+                    shutil.copyfileobj(source, destination)
+        if no_file:
+            return file.getvalue()
+
+    def to_csvs(self) -> Dict[str, str]:
+        """
+        Closes the CSV files and gives their content mapped by file name.
+        :return: {csv_file_name: content}
+        """
+        return {
+            csv_file_name: self.to_csv(csv_file_name)
+            for csv_file_name in self._csv_file_name_2_field_names.keys()
+        }
+
+    def to_csv(self, csv_file_name: str, add_header: bool = True) -> str:
+        """
+        Closes the CSV files and gives the content of one.
+        :param csv_file_name: the name of the file to get the content for
+        :param add_header: begin the result with the header
+        :return: the content
+        """
+        if csv_file_name not in self._csv_file_name_2_field_names:
+            raise MeritsException(
+                f'Please, specify the field names for csv_file_name "{csv_file_name}"'
+                f' in argument csv_file_name_2_field_names in the CollectorOnDisk constructor.'
+            )
+        self.close()
+        with open(self.get_csv_file(csv_file_name), "r", **self._open_kwargs) as f:
+            if not add_header:
+                f.readline()
+            return f.read()
+
+    def _close_files(self) -> None:
+        for f in self._csv_file_name_2_file.values():
+            if not f.closed:
+                f.close()
+
+    def _open(self, csv_file_name: str) -> csv.DictWriter:
+        """
+        Creates the file for one CSV file and writes the header.
+        :param csv_file_name:
+        :return: the writer for the rows
+        """
+        field_names = self._csv_file_name_2_field_names.get(csv_file_name)
+        if not field_names:
+            raise MeritsException(
+                f'Please, specify the field names for csv_file_name "{csv_file_name}"'
+                f' in argument csv_file_name_2_field_names in the CollectorOnDisk constructor.'
+            )
+        f = open(self.get_csv_file(csv_file_name), "w", **self._open_kwargs)
+        writer = csv.DictWriter(f, fieldnames=field_names, **self._csv_dict_writer_kwargs)
+        writer.writeheader()
+        self._csv_file_name_2_file[csv_file_name] = f
+        self._csv_file_name_2_writer[csv_file_name] = writer
+        return writer
@@ -1,5 +1,6 @@
+import dataclasses
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Dict, Generic, List, Optional, Sequence, Type, TypeVar
 
 
 class CsvHandler(ABC):
@@ -34,6 +35,25 @@ class CsvHandler(ABC):
         """
         pass
 
+    def handle_row_values(
+            self,
+            csv_file_name: str,
+            values: Sequence[Optional[str]],
+            header_2_index: Dict[str, int],
+    ):
+        """
+        As handle_row, but with the row as values. CsvReader calls this method. By default, it makes a dict and calls
+        handle_row. Override it to avoid the dict.
+        :param csv_file_name: the name of the file where this row came from
+        :param values: the data in the row in the order of the file's headers
+        :param header_2_index: the index in values per field name, the same object for all rows of a file
+        :return:
+        """
+        self.handle_row(
+            csv_file_name,
+            dict(zip(header_2_index, values)),
+        )
+
     @abstractmethod
     def handle_end(self, meta_data: Dict[str, str]):
         """
@@ -42,3 +62,55 @@ class CsvHandler(ABC):
         :return:
         """
         pass
+
+
+T = TypeVar("T")
+
+
+class RowObjectFactory(Generic[T]):
+    """
+    This class makes objects of a dataclass (like in a csv_model module) from row values, passing them positionally.
+    """
+
+    def __init__(
+            self,
+            datacls: Type[T],
+    ):
+        """
+
+        :param datacls: a dataclass with a field per header
+        """
+        self._datacls = datacls
+        self._field_names = [
+            field.name
+            for field in dataclasses.fields(datacls)
+        ]
+        self._header_2_index: Optional[Dict[str, int]] = None
+        "The header_2_index for which _indexes was made."
+        self._indexes: Optional[List[int]] = None
+        "The index in the values per field, None if the values are already in the order of the fields."
+
+    def create(
+            self,
+            values: Sequence[Optional[str]],
+            header_2_index: Dict[str, int],
+    ) -> T:
+        """
+        Makes one object.
+        :param values: see CsvHandler.handle_row_values
+        :param header_2_index: see CsvHandler.handle_row_values
+        :return:
+        """
+        if header_2_index is not self._header_2_index:
+            indexes = [
+                header_2_index[field_name]
+                for field_name in self._field_names
+            ]
+            if indexes == list(range(len(header_2_index))):
+                self._indexes = None
+            else:
+                self._indexes = indexes
+            self._header_2_index = header_2_index
+        if self._indexes is None:
+            return self._datacls(*values)
+        return self._datacls(*[values[idx] for idx in self._indexes])
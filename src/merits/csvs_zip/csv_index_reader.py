@@ -0,0 +1,90 @@
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from merits import common
+from merits.csvs_zip.csv_hierarchy import CsvTable
+from merits.csvs_zip.csv_reader import CsvReader
+from merits.csvs_zip.rows import Rows
+from merits.exceptions import MeritsException
+
+logger = common.get_logger(__file__)
+
+
+class CsvIndexReader(CsvReader):
+    """
+    This reader does not require the rows of child tables to be sorted or grouped by parent. The child tables are first
+    loaded into an index from parent ID to rows, which takes O(n) time and holds the child rows in memory. The root
+    table is read on the fly. Rows with the same parent keep the order of their file.
+
+    Child rows of which the parent ID is not found can not be handled, and raise a MeritsException after the root table
+    is read.
+    """
+
+    def _iter_tables(
+            self,
+            csv_file_name_2_rows: Dict[str, Rows],
+    ) -> Iterator[None]:
+        csv_file_name_2_index: Dict[str, Dict[str, List[Sequence[Optional[str]]]]] = {}
+        for csv_file_name, table in self.csv_hierarchy.csv_file_name_2_table.items():
+            if table.parent is None:
+                continue
+            parent_id_2_values = defaultdict(list)
+            rows = csv_file_name_2_rows[csv_file_name]
+            parent_id_idx = rows.header_2_index()[table.parent.id_name]
+            while rows.has_more():
+                values = rows.pop_values()
+                parent_id_2_values[values[parent_id_idx]].append(values)
+            csv_file_name_2_index[csv_file_name] = parent_id_2_values
+
+        root_table = self.csv_hierarchy.root_table
+        root_rows = csv_file_name_2_rows[root_table.csv_file_name]
+        while root_rows.has_more():
+            self._read_row(
+                values=root_rows.pop_values(),
+                table=root_table,
+                csv_file_name_2_rows=csv_file_name_2_rows,
+                csv_file_name_2_index=csv_file_name_2_index,
+            )
+            yield
+
+        for csv_file_name, parent_id_2_values in csv_file_name_2_index.items():
+            if parent_id_2_values:
+                orphan_count = sum(len(values_list) for values_list in parent_id_2_values.values())
+                parent_ids = list(parent_id_2_values.keys())
+                raise MeritsException(
+                    f'Found {orphan_count} rows in {csv_file_name} of which the parent is not found'
+                    f', with parent ID\'s {parent_ids[:10]}{" and more" if len(parent_ids) > 10 else ""}.'
+                )
+
+    def _read_row(
+            self,
+            values: Sequence[Optional[str]],
+            table: CsvTable,
+            csv_file_name_2_rows: Dict[str, Rows],
+            csv_file_name_2_index: Dict[str, Dict[str, List[Sequence[Optional[str]]]]],
+    ) -> None:
+        """
+        Handles one row and recurses to its child rows.
+        :param values: the row
+        :param table: the table of the row
+        :param csv_file_name_2_rows: for the headers
+        :param csv_file_name_2_index: the child rows by parent ID per child table. The handled rows are removed
+        :return:
+        """
+        header_2_index = csv_file_name_2_rows[table.csv_file_name].header_2_index()
+        self.csv_handler.handle_row_values(
+            table.csv_file_name,
+            values,
+            header_2_index,
+        )
+        row_id = values[header_2_index[table.id_name]]
+        for child in self.csv_hierarchy.csv_file_name_2_children[table.csv_file_name]:
+            child_values_list = csv_file_name_2_index[child.csv_file_name].pop(row_id, None)
+            if child_values_list:
+                for child_values in child_values_list:
+                    self._read_row(
+                        values=child_values,
+                        table=child,
+                        csv_file_name_2_rows=csv_file_name_2_rows,
+                        csv_file_name_2_index=csv_file_name_2_index,
+                    )
@@ -1,9 +1,10 @@
-from typing import Optional, Dict
+from typing import Dict, Iterator, Optional
 
 from merits.csvs_zip.csv_handler import CsvHandler
 from merits.csvs_zip.csv_hierarchy import CsvTable, CsvHierarchy
 from merits.csvs_zip.rows import Rows
 from merits.exceptions import MeritsException
+from merits.profiler import ProfiledCsvHandler, ProfiledRows, Profiler
 
 
 class CsvReader(object):
@@ -18,13 +19,18 @@ class CsvReader(object):
             self,
             csv_hierarchy: CsvHierarchy,
             csv_handler: CsvHandler,
+            profiler: Optional[Profiler] = None,
     ):
         """
 
         :param csv_hierarchy: a definition of the hierarchy of CSV tables to expect
         :param csv_handler: a handler that will process the CSV rows
+        :param profiler: if given, the reading of rows and the handler are timed as its phases
         """
         self.csv_hierarchy = csv_hierarchy
+        self._profiler = profiler
+        if profiler:
+            csv_handler = ProfiledCsvHandler(csv_handler=csv_handler, profiler=profiler)
         self.csv_handler = csv_handler
 
     def read(
@@ -38,6 +44,21 @@ class CsvReader(object):
         :return:
         :raises MeritsException: if any of the checks went wrong
         """
+        for _ in self.iter_read(csv_file_name_2_rows):
+            pass
+
+    def iter_read(
+            self,
+            csv_file_name_2_rows: Dict[str, Rows],
+    ) -> Iterator[None]:
+        """
+        Reads like read, one step at a time: the iterator stops after the begin of the handler, after every row of the
+        root table with its child rows, and after the end. This way the output of the handler can be taken while
+        reading, like the segments of a train. Stopping the iteration stops reading.
+        :param csv_file_name_2_rows:
+        :return: an iterator that gives None after each step
+        :raises MeritsException: if any of the checks went wrong
+        """
         # Check file names.
         expected_files = set(self.csv_hierarchy.csv_file_name_2_table.keys())
         expected_files.add(self.csv_hierarchy.meta_file_name)
@@ -59,6 +80,11 @@ class CsvReader(object):
             else:
                 table = self.csv_hierarchy.csv_file_name_2_table[csv_file_name]
             table.check_field_names(rows.headers())
+        if self._profiler:
+            csv_file_name_2_rows = {
+                csv_file_name: ProfiledRows(rows=rows, profiler=self._profiler)
+                for csv_file_name, rows in csv_file_name_2_rows.items()
+            }
 
         # Start with meta data.
         meta_file_name = self.csv_hierarchy.meta_file_name
@@ -67,18 +93,57 @@ class CsvReader(object):
         self.csv_handler.handle_begin(
             meta_data=meta_row,
         )
+        yield
 
-        # Read from the root table and recurse to child tables.
-        self._read(
-            parent_id=None,
-            table=self.csv_hierarchy.root_table,
-            csv_file_name_2_rows=csv_file_name_2_rows,
-        )
+        yield from self._iter_tables(csv_file_name_2_rows)
 
         # End (again with the same meta-data)
         self.csv_handler.handle_end(
             meta_data=meta_row,
         )
+        yield
+
+    def _iter_tables(
+            self,
+            csv_file_name_2_rows: Dict[str, Rows],
+    ) -> Iterator[None]:
+        """
+        Handles the rows of all non-meta tables in the parent-then-children order. The rows of a child table must be
+        grouped by parent in the same order as the parents.
+        :param csv_file_name_2_rows: all data
+        :return: an iterator that gives None after each row of the root table with its child rows
+        """
+        # Read from the root table and recurse to child tables.
+        root_table = self.csv_hierarchy.root_table
+        rows = csv_file_name_2_rows[root_table.csv_file_name]
+        header_2_index = rows.header_2_index()
+        id_idx = header_2_index[root_table.id_name]
+        child_list = self.csv_hierarchy.csv_file_name_2_children[root_table.csv_file_name]
+        while rows.has_more():
+            values = rows.pop_values()
+            self.csv_handler.handle_row_values(
+                root_table.csv_file_name,
+                values,
+                header_2_index,
+            )
+            row_id = values[id_idx]
+            for child in child_list:
+                self._read(
+                    parent_id=row_id,
+                    table=child,
+                    csv_file_name_2_rows=csv_file_name_2_rows,
+                )
+            yield
+
+        # A row that is left was not reached, because its parent was passed or does not exist.
+        for csv_file_name, table in self.csv_hierarchy.csv_file_name_2_table.items():
+            rows = csv_file_name_2_rows[csv_file_name]
+            if table.parent and rows.has_more():
+                parent_id = rows.peek_values()[rows.header_2_index()[table.parent.id_name]]
+                raise MeritsException(
+                    f'Row in {csv_file_name} with parent ID {parent_id} is not grouped by parent in the order of'
+                    f' the parents, or its parent is not found. Use --sort-csv or --unsorted-csv.'
+                )
 
     def _read(
             self,
@@ -87,30 +152,33 @@ class CsvReader(object):
             csv_file_name_2_rows: Dict[str, Rows],
     ) -> None:
         """
-        Recursive method to read parent-then-children and recurse to further offspring.
-        :param parent_id: the value of the ID cell if any parent
+        Recursive method to read the child rows of a parent and recurse to further offspring.
+        :param parent_id: the value of the ID cell of the parent
         :param table: the table definition for which rows are to be handled
         :param csv_file_name_2_rows: all data
         :return:
         """
         rows = csv_file_name_2_rows[table.csv_file_name]
+        header_2_index = rows.header_2_index()
+        id_idx = header_2_index[table.id_name]
+        parent_id_idx = header_2_index[table.parent.id_name] if parent_id else None
+        child_list = self.csv_hierarchy.csv_file_name_2_children[table.csv_file_name]
 
         while rows.has_more():
             # Peek at the row to see if it has the given parent_id.
-            row = rows.peek()
             if parent_id:
-                current_parent_id = row[table.parent.id_name]
+                current_parent_id = rows.peek_values()[parent_id_idx]
                 if current_parent_id != parent_id:
                     break
             # Same parent: continue handling row.
-            row = rows.pop()
-            self.csv_handler.handle_row(
+            values = rows.pop_values()
+            self.csv_handler.handle_row_values(
                 table.csv_file_name,
-                row,
+                values,
+                header_2_index,
             )
             # Handle child table rows.
-            child_list = self.csv_hierarchy.csv_file_name_2_children[table.csv_file_name]
-            row_id = row[table.id_name]
+            row_id = values[id_idx]
             for child in child_list:
                 self._read(
                     parent_id=row_id,
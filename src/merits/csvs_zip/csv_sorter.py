@@ -0,0 +1,390 @@
+import heapq
+import pickle
+import tempfile
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from merits.csvs_zip.csv_hierarchy import CsvHierarchy, CsvTable
+from merits.csvs_zip.rows import Rows, RowsValuesInMemory, RowsValuesIterator
+
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+"The default number of bytes of row data to sort in memory per run."
+
+_ROW_OVERHEAD = 64
+"Estimated bytes per row on top of the field values."
+_FIELD_OVERHEAD = 56
+"Estimated bytes per field on top of the characters."
+_BLOCK_SIZE = 100
+"The number of rows per pickle in a run file."
+
+
+def get_id_key(value: str) -> Tuple[int, Union[int, str]]:
+    """
+    Gives a sort key for an ID value. Numeric ID's are compared as numbers and sort before other ID's.
+    :param value:
+    :return:
+    """
+    if value.isdigit():
+        return 0, int(value)
+    return 1, value
+
+
+class CsvSorter(object):
+    """
+    This class is a pipeline stage between RowsFactory and CsvReader. It sorts the root table by its ID, and every child
+    table by the position of its parent row in the sorted parent table, so the rows of a child table are grouped by
+    parent in the order of the parents. Rows with the same key keep their order. Child rows of which the parent is not
+    found come last, where CsvReader reports them.
+
+    A table is sorted in memory in runs of at most about memory_budget bytes. A table that needs more than one run is
+    written to run files in a temporary directory, which are merged on the fly while the rows are read. So the memory
+    use does not depend on the size of the tables.
+
+    A child of the root table is sorted by the ID of its parent. A deeper table (like the RELATION table of SKDUPD) is
+    sorted in three external sorts: the (ID, position) pairs of the sorted parent table by ID, the rows of the table by
+    parent ID, and after joining these two, the rows by the position of their parent.
+    """
+
+    def __init__(
+            self,
+            csv_hierarchy: CsvHierarchy,
+            memory_budget: int = DEFAULT_MEMORY_BUDGET,
+            temporary_directory: Optional[Union[str, Path]] = None,
+    ):
+        """
+
+        :param csv_hierarchy: defines the ID columns
+        :param memory_budget: the approximate number of bytes of row data to sort in memory at once, per table
+        :param temporary_directory: the parent of the directory for the run files. If None the system default is used
+        """
+        self._csv_hierarchy = csv_hierarchy
+        self._memory_budget = memory_budget
+        self._temporary_directory = temporary_directory
+        self._run_directory: Optional[tempfile.TemporaryDirectory] = None
+        self._run_count = 0
+        "The number of run files written."
+
+    def sort(
+            self,
+            csv_file_name_2_rows: Dict[str, Rows],
+    ) -> Dict[str, Rows]:
+        """
+        Reads all rows and gives them sorted. The given rows are closed. Call cleanup when the result is read.
+        :param csv_file_name_2_rows: as for CsvReader.read
+        :return: the same tables, sorted. Other files (like the meta file) are given as is
+        """
+        result: Dict[str, Rows] = {
+            csv_file_name: rows
+            for csv_file_name, rows in csv_file_name_2_rows.items()
+            if csv_file_name not in self._csv_hierarchy.csv_file_name_2_table
+        }
+        csv_file_name_2_sorted: Dict[str, _SortedItems] = {}
+        "The sorted tables that are the parent of a deeper table."
+        # Parents first, so the positions of their rows are known when their children are sorted.
+        for table in self._get_tables_top_down():
+            rows = csv_file_name_2_rows.get(table.csv_file_name)
+            if rows is None:
+                continue
+            headers = rows.headers()
+            try:
+                sorted_items = self._sort_rows(
+                    table=table,
+                    rows=rows,
+                    csv_file_name_2_sorted=csv_file_name_2_sorted,
+                )
+            finally:
+                rows.close()
+            if table.parent and self._csv_hierarchy.csv_file_name_2_children[table.csv_file_name]:
+                csv_file_name_2_sorted[table.csv_file_name] = sorted_items
+            result[table.csv_file_name] = sorted_items.to_rows(headers=headers)
+        return result
+
+    def get_run_count(self) -> int:
+        """
+        Gives the number of run files written, which is 0 when every table fitted in the memory budget.
+        :return:
+        """
+        return self._run_count
+
+    def cleanup(self) -> None:
+        """
+        Removes the run files. The sorted rows can not be read after this.
+        :return: None
+        """
+        if self._run_directory:
+            self._run_directory.cleanup()
+            self._run_directory = None
+
+    def _get_tables_top_down(self) -> List[CsvTable]:
+        """
+        Gives the non-meta tables with every parent before its children.
+        :return:
+        """
+        tables = [self._csv_hierarchy.root_table]
+        for table in tables:
+            tables.extend(self._csv_hierarchy.csv_file_name_2_children[table.csv_file_name])
+        return tables
+
+    def _sort_rows(
+            self,
+            table: CsvTable,
+            rows: Rows,
+            csv_file_name_2_sorted: Dict[str, "_SortedItems"],
+    ) -> "_SortedItems":
+        """
+        Sorts the rows of one table.
+        :param table:
+        :param rows:
+        :param csv_file_name_2_sorted: the sorted parent tables of deeper tables
+        :return:
+        """
+        header_2_index = rows.header_2_index()
+        if table.parent is None:
+            id_idx = header_2_index[table.id_name]
+            return self._sort(
+                name=table.csv_file_name,
+                items=_iter_rows(rows),
+                get_key=lambda values: get_id_key(values[id_idx]),
+                get_size=_get_row_size,
+            )
+        parent_id_idx = header_2_index[table.parent.id_name]
+        if table.parent.parent is None:
+            return self._sort(
+                name=table.csv_file_name,
+                items=_iter_rows(rows),
+                get_key=lambda values: get_id_key(values[parent_id_idx]),
+                get_size=_get_row_size,
+            )
+
+        # The position of every parent row, by parent ID.
+        parent_sorted = csv_file_name_2_sorted[table.parent.csv_file_name]
+        parent_header_2_index = parent_sorted.header_2_index
+        parent_positions = self._sort(
+            name=f"{table.parent.csv_file_name}.positions",
+            items=(
+                (values[parent_header_2_index[table.parent.id_name]] or "", position)
+                for position, values in enumerate(parent_sorted.iter_values())
+            ),
+            get_key=itemgetter(0),
+            get_size=_get_pair_size,
+        )
+        # The rows by parent ID, in the same order as the positions.
+        rows_by_parent = self._sort(
+            name=f"{table.csv_file_name}.by-parent",
+            items=_iter_rows(rows),
+            get_key=lambda values: values[parent_id_idx] or "",
+            get_size=_get_row_size,
+        )
+        try:
+            sorted_items = self._sort(
+                name=table.csv_file_name,
+                items=_iter_joined(rows_by_parent, parent_positions, parent_id_idx),
+                get_key=itemgetter(0),
+                get_size=_get_keyed_row_size,
+                is_keyed=True,
+            )
+        finally:
+            parent_positions.remove()
+            rows_by_parent.remove()
+        return sorted_items
+
+    def _sort(
+            self,
+            name: str,
+            items: Iterable[Any],
+            get_key: Callable[[Any], Any],
+            get_size: Callable[[Any], int],
+            is_keyed: bool = False,
+    ) -> "_SortedItems":
+        """
+        Sorts items in memory, or in runs that are written to files when the items do not fit in the memory budget.
+        :param name: for the names of the run files
+        :param items: rows, or other picklable items
+        :param get_key:
+        :param get_size: the estimated bytes of an item
+        :param is_keyed: see _SortedItems
+        :return:
+        """
+        run_files: List[Path] = []
+        run: List[Any] = []
+        run_size = 0
+        for item in items:
+            run.append(item)
+            run_size += get_size(item)
+            if run_size >= self._memory_budget:
+                run.sort(key=get_key)
+                run_files.append(self._write_run(name, run))
+                run = []
+                run_size = 0
+        run.sort(key=get_key)
+        if run_files and run:
+            run_files.append(self._write_run(name, run))
+            run = []
+        return _SortedItems(
+            items=None if run_files else run,
+            run_files=run_files,
+            get_key=get_key,
+            is_keyed=is_keyed,
+        )
+
+    def _write_run(
+            self,
+            name: str,
+            run: List[Any],
+    ) -> Path:
+        """
+        Writes one sorted run to a new file.
+        :param name: for the file name
+        :param run: the items, like the values per row in the order of the headers
+        :return: the path to the run file
+        """
+        if self._run_directory is None:
+            self._run_directory = tempfile.TemporaryDirectory(prefix="merits-sort-", dir=self._temporary_directory)
+        path = Path(self._run_directory.name) / f"{name}.{self._run_count}.run"
+        self._run_count += 1
+        with open(path, "wb") as f:
+            for idx in range(0, len(run), _BLOCK_SIZE):
+                pickle.dump(run[idx:idx + _BLOCK_SIZE], f, protocol=pickle.HIGHEST_PROTOCOL)
+        return path
+
+
+class _SortedItems(object):
+    """
+    The result of CsvSorter._sort: the items in a list, or in run files that are merged each time they are iterated.
+    """
+
+    def __init__(
+            self,
+            items: Optional[List[Any]],
+            run_files: List[Path],
+            get_key: Callable[[Any], Any],
+            is_keyed: bool,
+    ):
+        """
+
+        :param items: the sorted items, or None if they are in the run files
+        :param run_files: the sorted runs
+        :param get_key:
+        :param is_keyed: True if the items are (key, values) pairs, of which iter_values gives only the values
+        """
+        self._items = items
+        self._run_files = run_files
+        self._get_key = get_key
+        self._is_keyed = is_keyed
+        self.header_2_index: Dict[str, int] = {}
+        "The index per header of the values, set by to_rows."
+
+    def __iter__(self) -> Iterator[Any]:
+        if self._items is not None:
+            return iter(self._items)
+        return _iter_merged(self._run_files, self._get_key)
+
+    def iter_values(self) -> Iterator[Sequence[Optional[str]]]:
+        """
+        Gives the values of the rows in the sorted order. This can be called more than once.
+        :return:
+        """
+        if self._is_keyed:
+            return (values for _, values in self)
+        return iter(self)
+
+    def to_rows(self, headers: List[str]) -> Rows:
+        """
+        Gives the sorted rows.
+        :param headers: of the values
+        :return:
+        """
+        self.header_2_index = {header: idx for idx, header in enumerate(headers)}
+        if self._items is not None:
+            return RowsValuesInMemory(
+                data=self.iter_values(),
+                headers=headers,
+            )
+        return RowsValuesIterator(
+            values_iterator=self.iter_values(),
+            headers=headers,
+        )
+
+    def remove(self) -> None:
+        """
+        Removes the run files and the items, when they are not needed anymore.
+        :return: None
+        """
+        for run_file in self._run_files:
+            run_file.unlink(missing_ok=True)
+        self._run_files = []
+        self._items = []
+
+
+def _iter_rows(rows: Rows) -> Iterator[Sequence[Optional[str]]]:
+    while rows.has_more():
+        yield rows.pop_values()
+
+
+def _get_row_size(values: Sequence[Optional[str]]) -> int:
+    return _ROW_OVERHEAD + sum(_FIELD_OVERHEAD + len(value or "") for value in values)
+
+
+def _get_keyed_row_size(item: Tuple[Tuple, Sequence[Optional[str]]]) -> int:
+    return _ROW_OVERHEAD + _get_row_size(item[1])
+
+
+def _get_pair_size(pair: Tuple[str, int]) -> int:
+    return _ROW_OVERHEAD + 2 * _FIELD_OVERHEAD + len(pair[0])
+
+
+def _iter_joined(
+        rows_by_parent: Iterable[Sequence[Optional[str]]],
+        parent_positions: Iterable[Tuple[str, int]],
+        parent_id_idx: int,
+) -> Iterator[Tuple[Tuple, Sequence[Optional[str]]]]:
+    """
+    Gives every row with the position of its parent, by walking both sorted by parent ID at the same time.
+    :param rows_by_parent: sorted by parent ID
+    :param parent_positions: the (ID, position) of the parent rows, sorted by ID
+    :param parent_id_idx: the index of the parent ID in the values of a row
+    :return: per row ((0, position), values), or ((1,), values) if the parent is not found, so it sorts last
+    """
+    position_iterator = iter(parent_positions)
+    parent_position = next(position_iterator, None)
+    for values in rows_by_parent:
+        parent_id = values[parent_id_idx] or ""
+        while parent_position is not None and parent_position[0] < parent_id:
+            parent_position = next(position_iterator, None)
+        if parent_position is not None and parent_position[0] == parent_id:
+            yield (0, parent_position[1]), values
+        else:
+            yield (1,), values
+
+
+def _iter_run(f: BinaryIO) -> Iterator[Any]:
+    """
+    Reads the items of one run file, one block at a time.
+    :param f:
+    :return:
+    """
+    while True:
+        try:
+            block = pickle.load(f)
+        except EOFError:
+            return
+        yield from block
+
+
+def _iter_merged(
+        run_files: List[Path],
+        get_key: Callable[[Any], Any],
+) -> Iterator[Any]:
+    """
+    Merges the sorted runs. For equal keys the items of an earlier run come first, so the sort is stable.
+    :param run_files: in the order they were written
+    :param get_key:
+    :return:
+    """
+    files = [open(run_file, "rb") for run_file in run_files]
+    try:
+        yield from heapq.merge(*(_iter_run(f) for f in files), key=get_key)
+    finally:
+        for f in files:
+            f.close()
@@ -1,9 +1,9 @@
 from abc import ABC, abstractmethod
 from collections import deque
-from csv import DictReader
-from io import StringIO, BytesIO
+from csv import DictReader, reader as csv_reader
+from io import StringIO, BytesIO, TextIOWrapper
 from pathlib import Path
-from typing import Dict, List, Iterable, Collection, Optional, Any, Union, BinaryIO
+from typing import Dict, List, Iterable, Iterator, Collection, Optional, Any, Union, BinaryIO, TextIO, Sequence
 from zipfile import ZipFile
 
 from merits.csvs_zip import config
@@ -12,8 +12,15 @@ from merits.csvs_zip import config
 class Rows(ABC):
     """
     This interface provides CSV data rows for a single CSV table/file.
+
+    A row is available as a dict from field name to value, or as a list of values in the order of the headers with
+    header_2_index for the lookup. Implementations store rows in one of these forms and convert to the other on demand.
     """
 
+    def __init__(self):
+        super().__init__()
+        self._header_2_index: Optional[Dict[str, int]] = None
+
     @abstractmethod
     def headers(self) -> List[str]:
         pass
@@ -44,6 +51,149 @@ class Rows(ABC):
         """
         pass
 
+    def header_2_index(self) -> Dict[str, int]:
+        """
+        Gives the index in the values of a row per header. The same dict is returned every time, so it can be used to
+        cache lookups per table.
+        :return:
+        """
+        if self._header_2_index is None:
+            self._header_2_index = {
+                header: idx
+                for idx, header in enumerate(self.headers())
+            }
+        return self._header_2_index
+
+    def peek_values(self) -> Sequence[Optional[str]]:
+        """
+        Reads the next row as values but keeps it in the data.
+        :return: the values in the order of the headers
+        :raise StopIteration: if no more rows are available
+        """
+        row = self.peek()
+        return [row.get(header) for header in self.header_2_index()]
+
+    def pop_values(self) -> Sequence[Optional[str]]:
+        """
+        Reads the next row as values and removes it from the data.
+        :return: the values in the order of the headers
+        :raise StopIteration: if no more rows are available
+        """
+        row = self.pop()
+        return [row.get(header) for header in self.header_2_index()]
+
+    def close(self) -> None:
+        """
+        Releases the source of the rows, if any. This may be called more than once.
+        :return:
+        """
+        pass
+
+
+class RowsValues(Rows, ABC):
+    """
+    The base for implementations that store the rows as values. The dicts are made on demand.
+    """
+
+    def __init__(
+            self,
+            headers: Collection[str],
+    ):
+        super().__init__()
+        self._headers = list(headers)
+
+    def headers(self) -> List[str]:
+        return list(self._headers)
+
+    def peek(self) -> Dict[str, str]:
+        return dict(zip(self._headers, self.peek_values()))
+
+    def pop(self) -> Dict[str, str]:
+        return dict(zip(self._headers, self.pop_values()))
+
+    @abstractmethod
+    def peek_values(self) -> Sequence[Optional[str]]:
+        pass
+
+    @abstractmethod
+    def pop_values(self) -> Sequence[Optional[str]]:
+        pass
+
+
+class RowsValuesInMemory(RowsValues):
+    """
+    This implementation has all the data as lists of values in memory, which takes less memory than dicts.
+    """
+
+    def __init__(
+            self,
+            data: Iterable[Sequence[Optional[str]]],
+            headers: Collection[str],
+    ):
+        super().__init__(headers=headers)
+        self.data: deque[Sequence[Optional[str]]] = deque(data)
+
+    def has_more(self) -> bool:
+        return bool(self.data)
+
+    def peek_values(self) -> Sequence[Optional[str]]:
+        return self.data[0]
+
+    def pop_values(self) -> Sequence[Optional[str]]:
+        return self.data.popleft()
+
+
+class RowsValuesIterator(RowsValues):
+    """
+    This implementation reads values from an iterator and can buffer one row to support the peek operation. Only that
+    row is kept in memory.
+    """
+
+    def __init__(
+            self,
+            values_iterator: Iterator[Sequence[Optional[str]]],
+            headers: Collection[str],
+            stream: Optional[TextIO] = None,
+    ):
+        """
+
+        :param values_iterator: gives the rows. If it has a close method (like a generator), that is called by close
+        :param headers:
+        :param stream: the stream that values_iterator reads from, to close with the close method
+        """
+        super().__init__(headers=headers)
+        self._values_iterator = values_iterator
+        self._stream = stream
+        self._peeked: Optional[Sequence[Optional[str]]] = None
+
+    def has_more(self) -> bool:
+        if self._peeked is None:
+            try:
+                self._peeked = next(self._values_iterator)
+            except StopIteration:
+                return False
+        return True
+
+    def peek_values(self) -> Sequence[Optional[str]]:
+        if self._peeked is None:
+            self._peeked = next(self._values_iterator)
+        return self._peeked
+
+    def pop_values(self) -> Sequence[Optional[str]]:
+        if self._peeked is not None:
+            result = self._peeked
+            self._peeked = None
+        else:
+            result = next(self._values_iterator)
+        return result
+
+    def close(self) -> None:
+        close = getattr(self._values_iterator, "close", None)
+        if close is not None:
+            close()
+        if self._stream is not None:
+            self._stream.close()
+
 
 class RowsInMemory(Rows):
     """
@@ -72,52 +222,91 @@ class RowsInMemory(Rows):
         return self.data.popleft()
 
 
-class RowsDictReader(Rows):
+class RowsIterator(Rows):
     """
-    This implementation reads from a csv.DictReader and can buffer one row to support the peek operation.
+    This implementation reads from an iterator of rows and can buffer one row to support the peek operation. Only that
+    row is kept in memory.
     """
 
     def __init__(
             self,
-            dict_reader: DictReader,
+            row_iterator: Iterator[Dict[str, str]],
+            headers: Collection[str],
     ):
+        """
+
+        :param row_iterator: gives the rows. If it has a close method (like a generator), that is called by close
+        :param headers:
+        """
         super().__init__()
-        self._dict_reader = dict_reader
-        self._headers = self._dict_reader.fieldnames
+        self._row_iterator = row_iterator
+        self._headers = headers
         self._peeked: Optional[Dict[str, str]] = None
 
     def headers(self) -> List[str]:
         return list(self._headers)
 
     def has_more(self) -> bool:
-        return self._try_peek() is None
+        return self._try_peek() is not None
 
     def peek(self) -> Dict[str, str]:
-        if not self._peeked:
-            self._peeked = next(self._dict_reader)
+        if self._peeked is None:
+            self._peeked = next(self._row_iterator)
         return self._peeked
 
     def pop(self) -> Dict[str, str]:
-        if self._peeked:
+        if self._peeked is not None:
             result = self._peeked
             self._peeked = None
         else:
-            result = next(self._dict_reader)
+            result = next(self._row_iterator)
         return result
 
-    def _try_peek(self) -> Dict[str, str]:
+    def close(self) -> None:
+        close = getattr(self._row_iterator, "close", None)
+        if close is not None:
+            close()
+
+    def _try_peek(self) -> Optional[Dict[str, str]]:
         """
         Almost as the peek operation but returns None (instead of raising StopIteration) if no row is available.
         :return:
         """
-        if not self._peeked:
+        if self._peeked is None:
             try:
-                self._peeked = next(self._dict_reader)
+                self._peeked = next(self._row_iterator)
             except StopIteration:
                 self._peeked = None
         return self._peeked
 
 
+class RowsDictReader(RowsIterator):
+    """
+    This implementation reads from a csv.DictReader and can buffer one row to support the peek operation. Only that
+    row is kept in memory.
+    """
+
+    def __init__(
+            self,
+            dict_reader: DictReader,
+            stream: Optional[TextIO] = None,
+    ):
+        """
+
+        :param dict_reader:
+        :param stream: the stream that dict_reader reads from, to close with the close method
+        """
+        super().__init__(
+            row_iterator=dict_reader,
+            headers=dict_reader.fieldnames,
+        )
+        self._stream = stream
+
+    def close(self) -> None:
+        if self._stream is not None:
+            self._stream.close()
+
+
 class RowsFactory(object):
     """
     This class contains convenience methods for creating Rows objects.
@@ -128,67 +317,156 @@ class RowsFactory(object):
             csv_content: str,
             csv_dict_reader_kwargs: Optional[Dict[str, Any]] = None,
             pre_load: bool = True,
+            positional: bool = False,
     ) -> Rows:
         """
         Gives the single string content of one CSV file as a Rows object.
         :param csv_content:
         :param csv_dict_reader_kwargs:
         :param pre_load: if True convert to dicts now, else use a csv.DictReader on the fly
+        :param positional: see from_stream
         :return:
         """
-        f = StringIO(csv_content)
-        dr = DictReader(f, **config.get_csv_dict_reader_kwargs(csv_dict_reader_kwargs))
+        return RowsFactory.from_stream(
+            stream=StringIO(csv_content),
+            csv_dict_reader_kwargs=csv_dict_reader_kwargs,
+            pre_load=pre_load,
+            positional=positional,
+        )
+
+    @staticmethod
+    def from_stream(
+            stream: TextIO,
+            csv_dict_reader_kwargs: Optional[Dict[str, Any]] = None,
+            pre_load: bool = True,
+            positional: bool = False,
+    ) -> Rows:
+        """
+        Gives the content of one CSV file from a text stream as a Rows object.
+        :param stream: is closed when the rows are loaded if pre_load, else by the close method of the Rows
+        :param csv_dict_reader_kwargs:
+        :param pre_load: if True convert to dicts now, else use a csv.DictReader on the fly
+        :param positional: if True store the rows as lists of values from a csv.reader instead of dicts, see
+            Rows.pop_values
+        :return:
+        """
+        if positional:
+            return RowsFactory._from_stream_positional(
+                stream=stream,
+                csv_reader_kwargs=config.get_csv_dict_reader_kwargs(csv_dict_reader_kwargs),
+                pre_load=pre_load,
+            )
+        dr = DictReader(stream, **config.get_csv_dict_reader_kwargs(csv_dict_reader_kwargs))
 
         if pre_load:
-            row_list = [
-                row
-                for row in dr
-            ]
+            with stream:
+                row_list = [
+                    row
+                    for row in dr
+                ]
             rows = RowsInMemory(
                 data=row_list,
                 headers=dr.fieldnames,
             )
         else:
+            try:
+                # Read the header now, as with pre_load.
+                _ = dr.fieldnames
+            except Exception:
+                stream.close()
+                raise
             rows = RowsDictReader(
                 dict_reader=dr,
+                stream=stream,
             )
 
         return rows
 
+    @staticmethod
+    def _from_stream_positional(
+            stream: TextIO,
+            csv_reader_kwargs: Dict[str, Any],
+            pre_load: bool,
+    ) -> Rows:
+        """
+        As from_stream with positional.
+        :param stream:
+        :param csv_reader_kwargs: as for csv.DictReader. Option restkey is not supported: extra values stay in the row
+        :param pre_load:
+        :return:
+        """
+        csv_reader_kwargs = dict(csv_reader_kwargs)
+        headers = csv_reader_kwargs.pop("fieldnames", None)
+        restval = csv_reader_kwargs.pop("restval", None)
+        csv_reader_kwargs.pop("restkey", None)
+        try:
+            reader = csv_reader(stream, **csv_reader_kwargs)
+            if headers is None:
+                headers = next(reader, [])
+            if pre_load:
+                rows = RowsValuesInMemory(
+                    data=_iter_values(reader, len(headers), restval),
+                    headers=headers,
+                )
+                stream.close()
+            else:
+                rows = RowsValuesIterator(
+                    values_iterator=_iter_values(reader, len(headers), restval),
+                    headers=headers,
+                    stream=stream,
+                )
+        except Exception:
+            stream.close()
+            raise
+        return rows
+
     @staticmethod
     def from_files(
             csv_paths: List[Union[str, Path]],
             csv_dict_reader_kwargs: Optional[Dict[str, Any]] = None,
+            pre_load: bool = True,
+            positional: bool = False,
     ) -> Dict[str, Rows]:
         """
         Gives the contents of the CSV files as Rows objects
         :param csv_paths: source files paths
         :param csv_dict_reader_kwargs:
+        :param pre_load: if True read the files now, else keep them open and read the rows on the fly. Then call
+            RowsFactory.close when done
+        :param positional: see from_stream
         :return: Dict[csv_file_name_without_path: str, Rows]
         """
         csv_file_name_2_rows = {}
-        for path in csv_paths:
-            if isinstance(path, str):
-                path = Path(path)
-            csv_file_name = path.name
-            with open(path, "r") as f:
-                text = f.read()
-            rows = RowsFactory.from_string(
-                csv_content=text,
-                csv_dict_reader_kwargs=csv_dict_reader_kwargs,
-            )
-            csv_file_name_2_rows[csv_file_name] = rows
+        try:
+            for path in csv_paths:
+                if isinstance(path, str):
+                    path = Path(path)
+                csv_file_name = path.name
+                rows = RowsFactory.from_stream(
+                    stream=open(path, "r"),
+                    csv_dict_reader_kwargs=csv_dict_reader_kwargs,
+                    pre_load=pre_load,
+                    positional=positional,
+                )
+                csv_file_name_2_rows[csv_file_name] = rows
+        except Exception:
+            RowsFactory.close(csv_file_name_2_rows)
+            raise
         return csv_file_name_2_rows
 
     @staticmethod
     def from_directory(
             directory: Union[str, Path],
             name_pass_filter: Optional[Collection[str]] = None,
+            pre_load: bool = True,
+            positional: bool = False,
     ) -> Dict[str, Rows]:
         """
         Reads all *.csv (case-insensitive extension) files in the directory
         :param directory:
         :param name_pass_filter:
+        :param pre_load: see from_files
+        :param positional: see from_stream
         :return: Dict[csv_file_name_without_path: str, Rows]
         """
         if not isinstance(directory, Path):
@@ -198,15 +476,20 @@ class RowsFactory(object):
             for csv_path in directory.glob("*.[Cc][Ss][Vv]")
             if name_pass_filter is None or csv_path.name in name_pass_filter
         ]
-        return RowsFactory.from_files(csv_paths)
+        return RowsFactory.from_files(csv_paths, pre_load=pre_load, positional=positional)
 
     @staticmethod
     def from_zip(
         zipped: Union[str, Path, bytes, BinaryIO],
+        pre_load: bool = True,
+        positional: bool = False,
     ) -> Dict[str, Rows]:
         """
         Makes rows from a zipped archive.
         :param zipped: Path or str: path to the zipped file; bytes: zipped bytes; BinaryIO zipped file-like object
+        :param pre_load: if True read the members now, else keep them open and decompress the rows on the fly. Then
+            call RowsFactory.close when done
+        :param positional: see from_stream
         :return: { csv_file_name: rows }
         """
         csv_file_name_2_rows = {}
@@ -215,10 +498,54 @@ class RowsFactory(object):
         else:
             f = zipped
 
+        # The opened members keep the archive file open after the ZipFile is closed.
         with ZipFile(file=f) as zf:
-            for csv_file_name in zf.namelist():
-                csv_content = zf.read(csv_file_name).decode()
-                rows = RowsFactory.from_string(csv_content)
-                csv_file_name_2_rows[csv_file_name] = rows
+            try:
+                for csv_file_name in zf.namelist():
+                    if pre_load:
+                        csv_content = zf.read(csv_file_name).decode()
+                        rows = RowsFactory.from_string(csv_content, positional=positional)
+                    else:
+                        rows = RowsFactory.from_stream(
+                            stream=TextIOWrapper(zf.open(csv_file_name), encoding="utf-8", newline=""),
+                            pre_load=False,
+                            positional=positional,
+                        )
+                    csv_file_name_2_rows[csv_file_name] = rows
+            except Exception:
+                RowsFactory.close(csv_file_name_2_rows)
+                raise
 
         return csv_file_name_2_rows
+
+    @staticmethod
+    def close(
+            csv_file_name_2_rows: Dict[str, Rows],
+    ) -> None:
+        """
+        Closes all the rows, see Rows.close.
+        :param csv_file_name_2_rows:
+        :return:
+        """
+        for rows in csv_file_name_2_rows.values():
+            rows.close()
+
+
+def _iter_values(
+        reader: Iterator[List[str]],
+        header_count: int,
+        restval: Optional[str],
+) -> Iterator[List[Optional[str]]]:
+    """
+    Gives the rows from a csv.reader as csv.DictReader would: empty lines are skipped and missing values are restval.
+    :param reader:
+    :param header_count:
+    :param restval:
+    :return:
+    """
+    for values in reader:
+        if not values:
+            continue
+        if len(values) < header_count:
+            values.extend([restval] * (header_count - len(values)))
+        yield values
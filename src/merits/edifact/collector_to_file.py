@@ -0,0 +1,89 @@
+import os
+import uuid
+from pathlib import Path
+from typing import Optional, TextIO, Union
+
+from merits.edifact.collector import Collector
+
+DEFAULT_BUFFER_SIZE = 1 << 20
+"The buffer size for a file opened by the collector."
+
+
+class CollectorToFile(Collector):
+    """
+    This implementation writes the segments to a file or text stream as they are collected. Only the number of
+    segments is kept in memory. The result is the same as writing the text of a CollectorInMemory.
+
+    A file is written as a temporary file in the same directory, which replaces the file when the collector is closed.
+    So a conversion that fails, and calls cleanup without close, leaves no partial file.
+    """
+
+    def __init__(
+            self,
+            file: Union[str, Path, TextIO],
+            line_separator: str = "\n",
+            buffer_size: int = DEFAULT_BUFFER_SIZE,
+    ):
+        """
+
+        :param file: the path to a file that is created or replaced (with default encoding), or a text stream to
+            write to. A stream is not closed by the collector.
+        :param line_separator: written after every segment
+        :param buffer_size: the buffer size when a file is opened
+        """
+        super().__init__()
+        self._line_separator = line_separator
+        self._file: Optional[TextIO] = None
+        "The file that the collector opened itself, so must close."
+        self._path: Optional[Path] = None
+        self._temporary_path: Optional[Path] = None
+        "The file that is written until it replaces self._path."
+        if isinstance(file, (str, Path)):
+            self._path = Path(file)
+            self._temporary_path = self._path.with_name(f".{self._path.name}.{uuid.uuid4().hex}.tmp")
+            self._file = open(self._temporary_path, "x", buffering=buffer_size)
+            self._stream: TextIO = self._file
+        else:
+            self._stream = file
+        self._segment_count = 0
+
+    def collect(self, edifact_segment: str) -> None:
+        """
+        Implements collect method and removes any new-line ("\n" and "\r") characters from the edifact_segment
+        :param edifact_segment:
+        :return:
+        """
+        clean_segment = edifact_segment.replace("\n", "").replace("\r", "")
+        self._stream.write(clean_segment)
+        self._stream.write(self._line_separator)
+        self._segment_count += 1
+
+    def segment_count(self) -> int:
+        return self._segment_count
+
+    def close(self) -> None:
+        """
+        Closes the file and moves it into place if the collector opened it, otherwise flushes the stream. This may be
+        called more than once.
+        :return: None
+        """
+        if self._file is not None:
+            self._file.close()
+            if self._temporary_path is not None:
+                os.replace(self._temporary_path, self._path)
+                self._temporary_path = None
+        elif not self._stream.closed:
+            self._stream.flush()
+
+    def cleanup(self) -> None:
+        """
+        Closes and removes the temporary file if the collector was not closed, so after a failure. This may be called
+        more than once.
+        :return: None
+        """
+        if self._file is not None:
+            self._file.close()
+        if self._temporary_path is not None:
+            self._temporary_path.unlink(missing_ok=True)
+            self._temporary_path = None
+
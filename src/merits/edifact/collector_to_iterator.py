@@ -0,0 +1,38 @@
+from typing import List
+
+from merits.edifact.collector import Collector
+
+
+class CollectorToIterator(Collector):
+    """
+    This implementation keeps the segments only until they are taken with pop_segments, so an iterator can give them
+    while they are being written. The number of segments counts all segments collected so far.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._segment_list: List[str] = []
+        "The segments that are not taken yet, without end-of-line."
+        self._segment_count = 0
+
+    def collect(self, edifact_segment: str) -> None:
+        """
+        Implements collect method and removes any new-line ("\n" and "\r") characters from the edifact_segment
+        :param edifact_segment:
+        :return:
+        """
+        clean_segment = edifact_segment.replace("\n", "").replace("\r", "")
+        self._segment_list.append(clean_segment)
+        self._segment_count += 1
+
+    def segment_count(self) -> int:
+        return self._segment_count
+
+    def pop_segments(self) -> List[str]:
+        """
+        Takes the segments that were collected since the last call.
+        :return: the segments in the order in which they were collected
+        """
+        segment_list = self._segment_list
+        self._segment_list = []
+        return segment_list
@@ -0,0 +1,89 @@
+from typing import Dict
+
+from merits.edifact.definition_model import Definition, Node
+from merits.edifact.segment_format import SegmentFormat
+from merits.edifact.state_machine import StateMachine, State
+from merits.exceptions import MeritsException
+
+
+class CompiledDefinition(object):
+    """
+    This class holds what is derived from a Definition: the states and transitions of the state machine and the segment
+    formats by path. Use CompiledDefinition.get, so readers, writers and converters share one compilation per
+    Definition object in the process.
+
+    Do not change the definition after it has been compiled. Only the config may be changed, like its separators: the
+    segment formats refer to it and follow the changes.
+    """
+
+    _id_2_compiled: Dict[int, "CompiledDefinition"] = {}
+    "The compiled definitions by id of the Definition. A compiled definition keeps its Definition, so an id is not reused."
+
+    def __init__(
+            self,
+            definition: Definition,
+    ):
+        """
+
+        :param definition: the definition to compile
+        :raise MeritsException: if a segment node in the structure has no segment definition
+        """
+        self.definition = definition
+        self._state_machine = StateMachine(
+            definition=definition,
+        )
+        "The template for create_state_machine."
+        self.path_2_state: Dict[str, State] = {}
+        "The states of the segments (not groups) by path."
+        states = list(self._state_machine.top_state_list)
+        while states:
+            state = states.pop()
+            if state.segment:
+                self.path_2_state[state.path] = state
+            states.extend(state.child_state_list)
+        self._node_id_2_segment_definition = {
+            seg.node_id: seg
+            for seg in definition.segment_list
+        }
+        self.path_2_segment_format: Dict[str, SegmentFormat] = {}
+        for top_node in definition.structure.child_list:
+            self._fill_path_2_segment_format(node=top_node, parent_path="")
+
+    @staticmethod
+    def get(definition: Definition) -> "CompiledDefinition":
+        """
+        Gives the compiled definition, which is compiled on first use.
+        :param definition:
+        :return:
+        """
+        compiled = CompiledDefinition._id_2_compiled.get(id(definition))
+        if compiled is None:
+            compiled = CompiledDefinition(definition)
+            CompiledDefinition._id_2_compiled[id(definition)] = compiled
+        return compiled
+
+    def create_state_machine(self) -> StateMachine:
+        """
+        Gives a new state machine at the beginning state. It shares the states and the memo of routes with the other
+        state machines of this definition.
+        :return:
+        """
+        return self._state_machine.copy()
+
+    def _fill_path_2_segment_format(self, node: Node, parent_path: str) -> None:
+        is_group = bool(node.child_list)
+        if is_group:
+            node_path = parent_path + node.name + "/"
+            for child_node in node.child_list:
+                self._fill_path_2_segment_format(node=child_node, parent_path=node_path)
+        else:
+            node_path = parent_path + node.name
+            segment_definition = self._node_id_2_segment_definition.get(node.node_id)
+            if not segment_definition:
+                raise MeritsException(
+                    f'Could not find segment {node.node_id} {node_path} in definition.'
+                )
+            self.path_2_segment_format[node_path] = SegmentFormat(
+                definition=segment_definition,
+                config=self.definition.config,
+            )
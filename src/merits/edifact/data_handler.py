@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Collection, Dict, Optional
 
 from merits.edifact.object_model import DataLeaf, DataBranch
 
@@ -61,3 +62,17 @@ class DataHandler(ABC):
         :return:
         """
         pass
+
+    def interest(self) -> Optional[Dict[str, Optional[Collection[str]]]]:
+        """
+        Declares which segments and fields this handler uses, so the reader can skip parsing the rest. Override this to
+        speed up reading. The structure is always validated in full.
+
+        Segments with a path that is not declared are still given to on_enter_leaf, but as an empty DataLeaf. For
+        declared segments parsing stops after the last declared field, so DataLeaf.get gives the default for any field
+        that is not declared.
+
+        :return: the field names (None for all fields) by segment path. For example {"2_PRD/PRD": ["service_number"]}.
+            None (the default) means that all segments are parsed in full
+        """
+        return None
@@ -0,0 +1,42 @@
+from typing import Iterable, Tuple, Union
+
+from merits.edifact.data_handler import DataHandler
+from merits.edifact.object_model import DataBranch, DataLeaf
+
+ENTER_BRANCH = "enter_branch"
+"An EDIFACT group was entered. The payload is the path of the group."
+EXIT_BRANCH = "exit_branch"
+"An EDIFACT group was left. The payload is the path of the group."
+LEAF = "leaf"
+"An EDIFACT segment was read. The payload is the DataLeaf, with the path in DataLeaf.path."
+
+EdifactEvent = Tuple[str, Union[str, DataLeaf]]
+"""
+An event of EdifactReader.iter_events as (kind, payload), with kind ENTER_BRANCH, EXIT_BRANCH or LEAF. A LEAF event
+stands for both the enter and the exit of a segment, see DataHandler.on_enter_leaf.
+"""
+
+
+def handle_events(
+        events: Iterable[EdifactEvent],
+        data_handler: DataHandler,
+) -> None:
+    """
+    Gives the events to a data handler, as EdifactReader.read does. The events can come from EdifactReader.iter_events,
+    filtered or stopped early.
+    :param events:
+    :param data_handler:
+    :return: None
+    """
+    on_enter_branch = data_handler.on_enter_branch
+    on_exit_branch = data_handler.on_exit_branch
+    on_enter_leaf = data_handler.on_enter_leaf
+    on_exit_leaf = data_handler.on_exit_leaf
+    for kind, payload in events:
+        if kind == LEAF:
+            on_enter_leaf(leaf=payload)
+            on_exit_leaf(path=payload.path)
+        elif kind == ENTER_BRANCH:
+            on_enter_branch(DataBranch(path=payload))
+        else:
+            on_exit_branch(path=payload)
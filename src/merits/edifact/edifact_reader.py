@@ -1,126 +1,179 @@
-from typing import Dict, Iterable, List, Optional
+import time
+from itertools import chain
+from typing import Collection, Dict, Iterator, List, Optional
 
+from merits.edifact.compiled_definition import CompiledDefinition
 from merits.edifact.data_handler import DataHandler
+from merits.edifact.edifact_event import ENTER_BRANCH, EXIT_BRANCH, LEAF, EdifactEvent, handle_events
 from merits.edifact.definition_model import Definition
-from merits.edifact.object_model import DataLeaf, DataBranch
-from merits.edifact.segment_format import SegmentFormat
+from merits.edifact.object_model import DataLeaf
+from merits.edifact.segment_observer import SegmentObserver
 from merits.edifact.segment_reader import SegmentReader
-from merits.edifact.state_machine import StateMachine, State, Transition
+from merits.edifact.segment_source import EdifactSource, iter_segments
+from merits.edifact.state_machine import StateMachine, State
 from merits.exceptions import MeritsException
+from merits.profiler import (
+    PHASE_EDIFACT_PARSE,
+    PHASE_EDIFACT_READ,
+    PHASE_EDIFACT_STATE_MACHINE,
+    ProfiledDataHandler,
+    Profiler,
+)
+
+_END_OF_SEGMENTS = ((None, None),)
+"Follows the (index, segment) pairs of the segments, to finish the state machine in the same loop."
 
 
 class EdifactReader(object):
     """
-    This class parses an EDIFACT file and outputs to a DataHandler.
+    This class parses an EDIFACT file and outputs to a DataHandler, or gives the results as events with iter_events.
     """
 
     def __init__(
             self,
             definition: Definition,
+            profiler: Optional[Profiler] = None,
+            segment_observer: Optional[SegmentObserver] = None,
     ):
         """
 
         :param definition: the definition of the specific EDIFACT structure and formats.
+        :param profiler: if given, the reading, state machine, parsing and data handler are timed as its phases
+        :param segment_observer: if given, it is told about every parsed segment
         """
         self._definition = definition
+        self._profiler = profiler
+        self._segment_observer = segment_observer
 
         self._main_separator = self._definition.config.separators[0]
-        self._state_machine: StateMachine = StateMachine(
-            definition=self._definition,
-        )
+        self._compiled_definition = CompiledDefinition.get(definition)
+        self._state_machine: StateMachine = self._compiled_definition.create_state_machine()
         self._path_2_segment_reader: Dict[str, SegmentReader] = {}
+        self._path_2_field_names: Optional[Dict[str, Optional[Collection[str]]]] = None
+        "The interest of the current data handler, see DataHandler.interest."
         self._stack: List[State] = []
 
     def read(
             self,
-            segments: Iterable[str],
+            segments: EdifactSource,
             data_handler: DataHandler,
+            is_complete: bool = True,
     ) -> None:
         """
-        Parses the segments and outputs the results to the data_handler.
-        :param segments:
+        Parses the segments and outputs the results to the data_handler. Files and streams are read lazily, one chunk at
+        a time.
+        :param segments: the segments or a file path or stream, see EdifactSource
         :param data_handler:
+        :param is_complete: False if the segments are only the first part of a message. Then the groups and segment
+            that are still open at the end are exited, without checking that the message is finished
         :return:
         """
+        if self._profiler:
+            data_handler = ProfiledDataHandler(data_handler=data_handler, profiler=self._profiler)
+        events = self.iter_events(
+            segments=segments,
+            is_complete=is_complete,
+            interest=data_handler.interest(),
+        )
+        # The begin state is no segment and gives no event, but a data handler has always been told that it is left.
+        data_handler.on_exit_leaf(path=self._state_machine.begin_state.path)
+        handle_events(events=events, data_handler=data_handler)
+
+    def iter_events(
+            self,
+            segments: EdifactSource,
+            is_complete: bool = True,
+            interest: Optional[Dict[str, Optional[Collection[str]]]] = None,
+    ) -> Iterator[EdifactEvent]:
+        """
+        Parses the segments and gives the results as events, see edifact_event. The segments are read and parsed as the
+        events are taken, so the iteration can be stopped at any point. A reader runs one iteration at a time: starting
+        a new one abandons the one before.
+        :param segments: the segments or a file path or stream, see EdifactSource
+        :param is_complete: see read
+        :param interest: the segments and fields to parse, see DataHandler.interest. None means all
+        :return: the events
+        """
+        self._set_interest(interest)
         # Reset stack and state machine.
+        self._stack.clear()
         self._stack_push(self._state_machine.begin_state)
         self._state_machine.state = self._state_machine.begin_state
 
+        segment_iterator = iter_segments(segments)
+        handle = self._state_machine.handle
+        if self._profiler:
+            segment_iterator = self._profiler.iter_timed(PHASE_EDIFACT_READ, segment_iterator)
+            handle = self._profiler.timed(PHASE_EDIFACT_STATE_MACHINE, handle)
+        stack_pop = self._stack_pop
+        stack_push = self._stack_push
+        read_segment = self._read_segment
+
+        # One generator, without nested ones, so that taking an event allocates as little as possible.
         segment_count = 0
-        for segment_idx, segment in enumerate(segments):
-            if not segment:
+        for segment_idx, segment in chain(enumerate(segment_iterator), _END_OF_SEGMENTS):
+            if segment is None:
+                if not is_complete:
+                    break
+                # Exit to root state.
+                segment_idx = segment_count
+                transitions, err_msg = self._state_machine.finish()
+                if err_msg:
+                    raise MeritsException(
+                        f'Could not finalize coming from state '
+                        f'{self._state_machine.state.node.node_id} {self._state_machine.state.path}'
+                        f': {err_msg}'
+                    )
+            elif not segment:
                 # Skip empty lines (at the end of the file).
                 continue
-            segment_count += 1
-            segment_name = segment[:3]
-            transitions, err_msg = self._state_machine.handle(segment_name=segment_name)
-            if err_msg:
-                raise MeritsException(
-                    f'Illegal segment at line {segment_idx + 1} coming from state '
-                    f'{self._state_machine.state.node.node_id} {self._state_machine.state.path}'
-                    f': {err_msg}'
-                )
-            self._transition(
-                transitions=transitions,
-                data_handler=data_handler,
-                segment_idx=segment_idx,
-                segment=segment,
-            )
-        # Exit to root state.
-        transitions, err_msg = self._state_machine.finish()
-        if err_msg:
-            raise MeritsException(
-                f'Could not finalize coming from state '
-                f'{self._state_machine.state.node.node_id} {self._state_machine.state.path}'
-                f': {err_msg}'
-            )
-        self._transition(
-            transitions=transitions,
-            data_handler=data_handler,
-            segment_idx=segment_count,
-            segment=None,
-        )
-
-    def _transition(
-            self,
-            transitions: List[Transition],
-            data_handler: DataHandler,
-            segment_idx: int,
-            segment: Optional[str],
-    ):
-        for transition in transitions:
-            if transition.exit:
+            else:
+                segment_count += 1
+                transitions, err_msg = handle(segment_name=segment[:3])
+                if err_msg:
+                    raise MeritsException(
+                        f'Illegal segment at line {segment_idx + 1} coming from state '
+                        f'{self._state_machine.state.node.node_id} {self._state_machine.state.path}'
+                        f': {err_msg}'
+                    )
+            for transition in transitions:
                 state = transition.exit
-                self._stack_pop(state)
-                if state.is_group():
-                    data_handler.on_exit_branch(path=state.path)
-                else:
-                    data_handler.on_exit_leaf(path=state.path)
-            if transition.enter:
+                if state:
+                    stack_pop(state)
+                    if state.is_group():
+                        yield EXIT_BRANCH, state.path
                 state = transition.enter
-                if state.is_group():
-                    data_handler.on_enter_branch(DataBranch(path=state.path))
-                elif segment:
-                    data_leaf: DataLeaf = self._read_segment(
-                        segment=segment,
-                        state=state,
-                    )
-                    if data_leaf.error:
-                        raise MeritsException(
-                            f'Failed to read line {segment_idx + 1} as segment type {state}: {data_leaf.error}'
+                if state:
+                    if state.is_group():
+                        yield ENTER_BRANCH, state.path
+                    elif segment:
+                        data_leaf: DataLeaf = read_segment(
+                            segment=segment,
+                            state=state,
                         )
-                    data_handler.on_enter_leaf(leaf=data_leaf)
-                else:
-                    # No segment means entering the end state: do nothing.
-                    pass
-                self._stack_push(state)
+                        if data_leaf.error:
+                            raise MeritsException(
+                                f'Failed to read line {segment_idx + 1} as segment type {state}: {data_leaf.error}'
+                            )
+                        yield LEAF, data_leaf
+                    else:
+                        # No segment means entering the end state: do nothing.
+                        pass
+                    stack_push(state)
+        if not is_complete:
+            # Exit the groups that are still open, as if the message ended here.
+            while self._stack:
+                state = self._stack.pop()
+                if state.is_group():
+                    yield EXIT_BRANCH, state.path
+            self._state_machine.reset()
 
     def _stack_pop(self, state: State):
         if not self._stack:
             raise MeritsException(
                 f'Cannot exit state {state}: currently in root.'
             )
-        if self._stack[-1] != state:
+        if self._stack[-1] is not state:
             raise MeritsException(
                 f'Cannot exit state {state}: not top of stack {[str(state) for state in self._stack]}.'
             )
@@ -129,29 +182,93 @@ class EdifactReader(object):
     def _stack_push(self, state: State):
         if self._stack:
             parent_state = self._stack[-1]
-            if state not in parent_state.child_state_list:
+            if state.parent is not parent_state:
                 raise MeritsException(
                     f'Cannot enter state {state}: it is no child of current top of'
                     f' stack {[str(state) for state in self._stack]}.'
                 )
         self._stack.append(state)
 
-    def _read_segment(
-            self,
-            segment: str,
-            state: State,
-    ) -> DataLeaf:
+    def _set_interest(self, interest: Optional[Dict[str, Optional[Collection[str]]]]) -> None:
+        """
+        Takes over the interest, like that of a data handler, and checks it against the definition.
+        :param interest: see DataHandler.interest
+        :return: None
+        :raise MeritsException: if a path is not a segment path or if a field name is not in its segment format
+        """
+        self._path_2_segment_reader.clear()
+        self._path_2_field_names = interest
+        if self._path_2_field_names is None:
+            return
+        path_2_state = self._compiled_definition.path_2_state
+        for path, field_names in self._path_2_field_names.items():
+            state = path_2_state.get(path)
+            if not state:
+                raise MeritsException(
+                    f'Invalid path "{path}" in the interest of the data handler: it is no segment in the definition.'
+                )
+            if field_names is not None:
+                invalid_names = set(field_names) - self._get_segment_reader(state).segment_format.name_set
+                if invalid_names:
+                    raise MeritsException(
+                        f'Invalid field names {sorted(invalid_names)} for "{path}" in the interest of the data handler.'
+                    )
+
+    def _get_segment_reader(self, state: State) -> SegmentReader:
         path = state.path
         segment_reader = self._path_2_segment_reader.get(path)
         if not segment_reader:
-            segment_format = SegmentFormat(
-                definition=state.segment,
-                config=self._definition.config,
-            )
+            segment_format = self._compiled_definition.path_2_segment_format[path]
+            if self._path_2_field_names is None:
+                field_names = None
+            else:
+                field_names = self._path_2_field_names.get(path, ())
             segment_reader = SegmentReader(
                 path=path,
                 segment_format=segment_format,
+                field_names=field_names,
             )
             self._path_2_segment_reader[path] = segment_reader
-        result = segment_reader.from_edifact(edifact_segment=segment)
-        return result
+        return segment_reader
+
+    def _read_segment(
+            self,
+            segment: str,
+            state: State,
+    ) -> DataLeaf:
+        segment_reader = self._get_segment_reader(state)
+        if self._profiler is None and self._segment_observer is None:
+            return segment_reader.from_edifact(edifact_segment=segment)
+        return self._read_segment_measured(
+            segment=segment,
+            segment_reader=segment_reader,
+        )
+
+    def _read_segment_measured(
+            self,
+            segment: str,
+            segment_reader: SegmentReader,
+    ) -> DataLeaf:
+        """
+        Parses a segment for the profiler and the segment observer.
+        :param segment:
+        :param segment_reader:
+        :return:
+        """
+        if self._profiler:
+            self._profiler.start(PHASE_EDIFACT_PARSE)
+        start = time.perf_counter()
+        try:
+            data_leaf = segment_reader.from_edifact(edifact_segment=segment)
+        finally:
+            seconds = time.perf_counter() - start
+            if self._profiler:
+                self._profiler.stop(1)
+        if self._segment_observer:
+            self._segment_observer.on_segment(
+                path=segment_reader.path,
+                segment=segment,
+                seconds=seconds,
+                error=data_leaf.error,
+            )
+        return data_leaf
@@ -1,11 +1,27 @@
-from typing import Dict, List, Optional
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
 
-from merits.edifact.definition_model import Definition, Node
-from merits.edifact.object_model import DataLeaf
+from merits.edifact.compiled_definition import CompiledDefinition
+from merits.edifact.definition_model import Definition
 from merits.edifact.segment_format import SegmentFormat, Field
+from merits.edifact.segment_observer import SegmentObserver
 from merits.edifact.segment_writer import SegmentWriter
-from merits.edifact.state_machine import StateMachine
 from merits.exceptions import MeritsException
+from merits.profiler import PHASE_EDIFACT_SERIALIZE, PHASE_EDIFACT_STATE_MACHINE, Profiler
+
+
+@dataclass
+class BoundSegmentPlan:
+    """
+    The checked mapping of a combination of field names and default fields to the values of a segment format, see
+    EdifactWriter.to_edifact_values.
+    """
+    segment_format: SegmentFormat
+    template: List[Optional[str]]
+    "The values by position in the segment format field_list, with the defaults filled in."
+    value_indexes: List[int]
+    "The position in the template per given field name."
 
 
 class EdifactWriter(object):
@@ -17,38 +33,29 @@ class EdifactWriter(object):
     def __init__(
             self,
             definition: Definition,
+            profiler: Optional[Profiler] = None,
+            segment_observer: Optional[SegmentObserver] = None,
     ):
+        """
+
+        :param definition:
+        :param profiler: if given, the state machine and the writing of segments are timed as its phases
+        :param segment_observer: if given, it is told about every written segment
+        """
         self._definition = definition
+        self._segment_observer = segment_observer
         self._config = self._definition.config
-        self._node_id_2_segment_definition = {
-            seg.node_id: seg
-            for seg in self._definition.segment_list
-        }
-        self._path_2_segment_format: Dict[str, SegmentFormat] = {}
-        for top_node in self._definition.structure.child_list:
-            self._fill_path_2_segment_format(node=top_node, parent_path="")
-
-        self._state_machine = StateMachine(
-            definition=definition,
-        )
+        compiled_definition = CompiledDefinition.get(definition)
+        self._path_2_segment_format: Dict[str, SegmentFormat] = compiled_definition.path_2_segment_format
+        self._key_2_bound_plan: Dict[Tuple[str, Tuple[str, ...], Tuple[str, ...]], BoundSegmentPlan] = {}
+        "The bound plans by path, field names and default field names."
 
-    def _fill_path_2_segment_format(self, node: Node, parent_path: str) -> None:
-        is_group = bool(node.child_list)
-        if is_group:
-            node_path = parent_path + node.name + "/"
-            for child_node in node.child_list:
-                self._fill_path_2_segment_format(node=child_node, parent_path=node_path)
-        else:
-            node_path = parent_path + node.name
-            segment_definition = self._node_id_2_segment_definition.get(node.node_id)
-            if not segment_definition:
-                raise MeritsException(
-                    f'Could not find segment {node.node_id} {node_path} in definition.'
-                )
-            self._path_2_segment_format[node_path] = SegmentFormat(
-                definition=segment_definition,
-                config=self._config,
-            )
+        self._state_machine = compiled_definition.create_state_machine()
+        self._handle = self._state_machine.handle
+        self._write_values = SegmentWriter.write_values
+        if profiler:
+            self._handle = profiler.timed(PHASE_EDIFACT_STATE_MACHINE, self._handle)
+            self._write_values = profiler.timed(PHASE_EDIFACT_SERIALIZE, self._write_values)
 
     def to_edifact(
             self,
@@ -66,39 +73,168 @@ class EdifactWriter(object):
         :return: one EDIFACT line
         :raise MeritsException: if the path is unknown or is a group. If data contains an unknown field
         """
-        segment_format = self._path_2_segment_format.get(path)
+        return self.to_edifact_values(
+            path=path,
+            field_names=tuple(data),
+            values=tuple(data.values()),
+            add_defaults_for=tuple(add_defaults_for) if add_defaults_for else (),
+        )
+
+    def to_edifact_values(
+            self,
+            path: str,
+            field_names: Tuple[str, ...],
+            values: Sequence[Optional[str]],
+            add_defaults_for: Tuple[str, ...] = (),
+    ) -> str:
+        """
+        Like to_edifact, with the data as field names and values. The field names are checked and mapped to the segment
+        format once per combination of path, field names and add_defaults_for, so repeating a combination is cheap.
+
+        :param path: the path in the definition tree
+        :param field_names: names of fields in the segment definition
+        :param values: the value per field name
+        :param add_defaults_for: names of fields that should be added with the default values from the segment
+            definition
+        :return: one EDIFACT line
+        :raise MeritsException: if the path is unknown or is a group. If field_names contains an unknown field
+        """
+        if self._segment_observer is None:
+            return self._write_segment(path, field_names, values, add_defaults_for)
+        start = time.perf_counter()
+        try:
+            segment = self._write_segment(path, field_names, values, add_defaults_for)
+        except MeritsException as e:
+            self._segment_observer.on_segment(
+                path=path,
+                segment=None,
+                seconds=time.perf_counter() - start,
+                error=str(e),
+            )
+            raise
+        self._segment_observer.on_segment(
+            path=path,
+            segment=segment,
+            seconds=time.perf_counter() - start,
+            error=None,
+        )
+        return segment
+
+    def _write_segment(
+            self,
+            path: str,
+            field_names: Tuple[str, ...],
+            values: Sequence[Optional[str]],
+            add_defaults_for: Tuple[str, ...],
+    ) -> str:
+        """
+        Implements to_edifact_values.
+        """
+        key = (path, field_names, add_defaults_for)
+        bound_plan = self._key_2_bound_plan.get(key)
+        segment_format = bound_plan.segment_format if bound_plan else self._path_2_segment_format.get(path)
         if not segment_format:
             raise MeritsException(
                 f'Could not find a format for segment at "{path}"'
             )
         # Check valid segment name
-        transitions, err_msg = self._state_machine.handle(segment_format.name)
+        transitions, err_msg = self._handle(segment_format.name)
         if err_msg:
             raise MeritsException(
-                f'Could not add "{path}" {data}: {err_msg}'
+                f'Could not add "{path}" {dict(zip(field_names, values))}: {err_msg}'
             )
         if path != transitions[-1].enter.path:
             raise MeritsException(
                 f'Segment name expects path "{transitions[-1].enter.path}" but given is "{path}".'
             )
 
-        leaf = DataLeaf(
-            path=path,
+        if bound_plan is None:
+            bound_plan = self._bind(
+                path=path,
+                segment_format=segment_format,
+                field_names=field_names,
+                values=values,
+                add_defaults_for=add_defaults_for,
+            )
+            self._key_2_bound_plan[key] = bound_plan
+        segment_values = bound_plan.template.copy()
+        for value_idx, value in zip(bound_plan.value_indexes, values):
+            segment_values[value_idx] = value
+        return self._write_values(
+            name=segment_format.name,
+            terminator=self._config.segment_terminator,
+            plan=segment_format.get_write_plan(),
+            values=segment_values,
+        )
+
+    def _bind(
+            self,
+            path: str,
+            segment_format: SegmentFormat,
+            field_names: Tuple[str, ...],
+            values: Sequence[Optional[str]],
+            add_defaults_for: Tuple[str, ...],
+    ) -> BoundSegmentPlan:
+        """
+        Checks the field names and maps them to the segment format.
+        :param path: for error messages
+        :param segment_format: the format for the path
+        :param field_names:
+        :param values: for error messages
+        :param add_defaults_for:
+        :return: the plan
+        :raise MeritsException: if a field is unknown, is given twice or has no default value while it should
+        """
+        template: List[Optional[str]] = [None] * len(segment_format.field_list)
+        value_idx_2_value: Dict[int, Optional[str]] = {}
+        "The values set so far, for error messages."
+        for default_name in add_defaults_for:
+            field: Field = segment_format.name_2_field.get(default_name)
+            if not field:
+                raise MeritsException(
+                    f'No field "{default_name}" defined in "{path}".'
+                )
+            if not field.expected_value:
+                raise MeritsException(
+                    f'No expected/default value for field "{default_name}" defined in "{path}".'
+                )
+            value_idx = self._get_unset_index(segment_format, default_name, field.expected_value, value_idx_2_value)
+            template[value_idx] = field.expected_value
+            value_idx_2_value[value_idx] = field.expected_value
+        value_indexes = []
+        for name, value in zip(field_names, values):
+            value_idx = self._get_unset_index(segment_format, name, value, value_idx_2_value)
+            value_idx_2_value[value_idx] = value
+            value_indexes.append(value_idx)
+        return BoundSegmentPlan(
             segment_format=segment_format,
+            template=template,
+            value_indexes=value_indexes,
         )
-        if add_defaults_for:
-            for default_name in add_defaults_for:
-                field: Field = segment_format.name_2_field.get(default_name)
-                if not field:
-                    raise MeritsException(
-                        f'No field "{default_name}" defined in "{path}".'
-                    )
-                if not field.expected_value:
-                    raise MeritsException(
-                        f'No expected/default value for field "{default_name}" defined in "{path}".'
-                    )
-                leaf.set(default_name, field.expected_value)
-        for k, v in data.items():
-            leaf.set(k, v)
-        edifact = SegmentWriter.to_edifact(leaf)
-        return edifact
+
+    @staticmethod
+    def _get_unset_index(
+            segment_format: SegmentFormat,
+            name: str,
+            value: Optional[str],
+            value_idx_2_value: Dict[int, Optional[str]],
+    ) -> int:
+        """
+        Checks that a field can be set, with the messages of DataLeaf.set.
+        :param segment_format:
+        :param name: the field name
+        :param value: for error messages
+        :param value_idx_2_value: the values set so far
+        :return: the position of the field in the segment format field_list
+        :raise MeritsException: if name is not in the definition, or if it is already set
+        """
+        value_idx = segment_format.name_2_index.get(name)
+        if value_idx is None:
+            raise MeritsException(
+                f'Failed to set "{name}"="{value}": name not in definition.'
+            )
+        if value_idx in value_idx_2_value:
+            raise MeritsException(
+                f'Failed to set "{name}"="{value}": already has value "{value_idx_2_value[value_idx]}".'
+            )
+        return value_idx
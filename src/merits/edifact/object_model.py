@@ -8,11 +8,17 @@ from merits.edifact.segment_format import SegmentFormat
 from merits.exceptions import MeritsException
 
 
+_UNSET = object()
+"Marks a field value that has not been set. None can not be used since it is a valid value."
+
+
 class DataLeaf(object):
     """
     This class represents data of a segment/non-group node in an EDIFACT file. It has a setter and a getter, that both
     check if field names are according to the segment format in the definition.
     """
+    __slots__ = ("path", "segment_format", "error", "_values")
+
     def __init__(
             self,
             path: str,
@@ -26,13 +32,8 @@ class DataLeaf(object):
         self.path: str = path
         self.segment_format = segment_format
         self.error: Optional[str] = None
-        self._name_2_value: Dict[str, str] = {}
-        self._all_names = {
-            field.name
-            for field in self.segment_format.field_list
-            # Exclude fields without name.
-            if field.name
-        }
+        self._values: List = [_UNSET] * len(segment_format.field_list)
+        "The values by position in the segment format field_list."
 
     def set(
             self,
@@ -46,15 +47,16 @@ class DataLeaf(object):
         :return: None
         :raise MeritsException: if name is not in the definition, or if value already set for name
         """
-        if name in self._name_2_value:
+        field_idx = self.segment_format.name_2_index.get(name)
+        if field_idx is None:
             raise MeritsException(
-                f'Failed to set "{name}"="{value}": already has value "{self._name_2_value[name]}".'
+                f'Failed to set "{name}"="{value}": name not in definition.'
             )
-        if name not in self._all_names:
+        if self._values[field_idx] is not _UNSET:
             raise MeritsException(
-                f'Failed to set "{name}"="{value}": name not in definition.'
+                f'Failed to set "{name}"="{value}": already has value "{self._values[field_idx]}".'
             )
-        self._name_2_value[name] = value
+        self._values[field_idx] = value
 
     def get(
             self,
@@ -69,18 +71,32 @@ class DataLeaf(object):
         :return: the stored value or None
         :raise MeritsException: if name is not in the definition
         """
-        if name not in self._all_names:
+        field_idx = self.segment_format.name_2_index.get(name)
+        if field_idx is None:
             raise MeritsException(
                 f'Failed to get "{name}": name not in definition.'
             )
-        return self._name_2_value.get(name, default)
+        value = self._values[field_idx]
+        return default if value is _UNSET else value
+
+    def get_values(self) -> List[Optional[str]]:
+        """
+        Gives the values by position in the segment format field_list, without checks.
+        :return: a new list, with None for the values that are not set
+        """
+        return [None if value is _UNSET else value for value in self._values]
 
     def get_all(self) -> Dict[str, str]:
         """
         For testing purposes: has no checks: do NOT use for application.
-        :return:
+        :return: the values that are set, in the order of the segment format
         """
-        return dict(self._name_2_value)
+        field_list = self.segment_format.field_list
+        return {
+            field_list[field_idx].name: value
+            for field_idx, value in enumerate(self._values)
+            if value is not _UNSET
+        }
 
 
 @dataclass
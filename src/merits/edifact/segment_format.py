@@ -1,8 +1,10 @@
 """
 This module contains classes that extract single string EDIFACT segment formats into objects usable in python.
 """
+import re
 import string
-from typing import List, Tuple, Optional
+from dataclasses import dataclass
+from typing import List, Tuple, Optional, Dict, Pattern
 
 from merits.edifact.definition_model import Segment, Config
 
@@ -23,6 +25,98 @@ class Field(object):
         self.expected_value = expected_value
 
 
+@dataclass
+class SplitPlan:
+    """
+    A compiled plan for splitting segments that contain no escape characters, see SegmentFormat.get_split_plan.
+    """
+    separators: str
+    "The separators this plan is compiled for."
+    splitter: Pattern
+    "Splits a segment (without terminator) into alternately a value and the separator that follows it."
+    next_field_indexes: List[Dict[str, Optional[int]]]
+    """
+    The index of the field after a separator, by field index + 1 (0 is the segment name) and separator. None if the
+    separator is not expected after the field.
+    """
+
+    @staticmethod
+    def create(
+            separators: str,
+            field_list: List[Field],
+    ) -> "SplitPlan":
+        """
+        Compiles the plan for the given fields.
+        :param separators: the separators ordered by level
+        :param field_list: the fields of the segment format
+        :return: the plan
+        """
+        next_field_indexes = []
+        for field_idx in range(-1, len(field_list)):
+            separator_2_next_field_idx = {}
+            for separator_idx, separator in enumerate(separators):
+                # Continue to the next field of the level defined by the separator.
+                next_level = separator_idx + 1
+                next_field_idx = field_idx + 1
+                while next_field_idx < len(field_list) and field_list[next_field_idx].level > next_level:
+                    next_field_idx += 1
+                if next_field_idx >= len(field_list) or field_list[next_field_idx].level != next_level:
+                    next_field_idx = None
+                separator_2_next_field_idx[separator] = next_field_idx
+            next_field_indexes.append(separator_2_next_field_idx)
+        return SplitPlan(
+            separators=separators,
+            splitter=re.compile(f"([{re.escape(separators)}])"),
+            next_field_indexes=next_field_indexes,
+        )
+
+
+@dataclass
+class WritePlan:
+    """
+    A compiled plan for writing segments, see SegmentFormat.get_write_plan.
+    """
+    special_characters: str
+    "The separators, escape character and segment terminator this plan is compiled for."
+    reversed_fields: List[Tuple[Optional[int], int, str]]
+    """
+    Per field in reversed order: the index of its value (None for fields without name), its level and the separator
+    that precedes it. The value index is that of the first field with the same name.
+    """
+    needs_escape: Pattern
+    "Finds the first character that must be escaped in a value."
+    escape_table: Dict[int, str]
+    "Escapes all special characters in a value with str.translate."
+
+    @staticmethod
+    def create(
+            separators: str,
+            escape_char: str,
+            terminator: str,
+            field_list: List[Field],
+            name_2_index: Dict[str, int],
+    ) -> "WritePlan":
+        """
+        Compiles the plan for the given fields.
+        :param separators: the separators ordered by level
+        :param escape_char:
+        :param terminator: the segment terminator
+        :param field_list: the fields of the segment format
+        :param name_2_index: as SegmentFormat.name_2_index
+        :return: the plan
+        """
+        special_characters = escape_char + separators + terminator
+        return WritePlan(
+            special_characters=special_characters,
+            reversed_fields=[
+                (name_2_index[field.name] if field.name else None, field.level, separators[field.level - 1])
+                for field in reversed(field_list)
+            ],
+            needs_escape=re.compile(f"[{re.escape(special_characters)}]"),
+            escape_table={ord(c): escape_char + c for c in special_characters},
+        )
+
+
 # noinspection PyMethodMayBeStatic
 class SegmentFormat(object):
     """
@@ -48,6 +142,47 @@ class SegmentFormat(object):
             field.name: field
             for field in self.field_list
         }
+        self.name_2_index: Dict[str, int] = {}
+        "The position in field_list by field name. Fields without name are excluded."
+        for field_idx, field in enumerate(self.field_list):
+            if field.name:
+                self.name_2_index.setdefault(field.name, field_idx)
+        self.name_set = frozenset(self.name_2_index)
+        "The names of the fields that have a name."
+        self._split_plan: Optional[SplitPlan] = None
+        self._write_plan: Optional[WritePlan] = None
+
+    def get_split_plan(self) -> SplitPlan:
+        """
+        Gives the plan for splitting segments of this format that contain no escape characters. It is compiled on first
+        use, and again if the separators in the config have been changed since.
+        :return: the plan
+        """
+        separators = self.config.separators
+        if self._split_plan is None or self._split_plan.separators != separators:
+            self._split_plan = SplitPlan.create(
+                separators=separators,
+                field_list=self.field_list,
+            )
+        return self._split_plan
+
+    def get_write_plan(self) -> WritePlan:
+        """
+        Gives the plan for writing segments of this format. It is compiled on first use, and again if the separators,
+        escape character or segment terminator in the config have been changed since.
+        :return: the plan
+        """
+        config = self.config
+        special_characters = config.escape_char + config.separators + config.segment_terminator
+        if self._write_plan is None or self._write_plan.special_characters != special_characters:
+            self._write_plan = WritePlan.create(
+                separators=config.separators,
+                escape_char=config.escape_char,
+                terminator=config.segment_terminator,
+                field_list=self.field_list,
+                name_2_index=self.name_2_index,
+            )
+        return self._write_plan
 
     def _parse_format(self) -> Tuple[
         str,
@@ -0,0 +1,28 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class SegmentObserver(ABC):
+    """
+    This interface is told about every segment that EdifactReader parses or EdifactWriter writes, for example to count
+    the segments and their cost per definition path. Without an observer the reader and writer do not measure anything.
+    """
+
+    @abstractmethod
+    def on_segment(
+            self,
+            path: str,
+            segment: Optional[str],
+            seconds: float,
+            error: Optional[str],
+    ) -> None:
+        """
+        This method is called after a segment was parsed or written.
+        :param path: the path of the segment in the definition, like "2_PRD/4_POP/7_POR/POR"
+        :param segment: the segment text, without line ending. None if writing failed
+        :param seconds: the time to parse the segment into fields, or to write the fields as a segment (including the
+            check of the segment order)
+        :param error: the error message if parsing or writing failed, otherwise None
+        :return: None
+        """
+        pass
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Collection, List, Optional
 
 from merits.edifact.object_model import DataLeaf
 from merits.edifact.segment_format import SegmentFormat
@@ -14,13 +14,28 @@ class SegmentReader(object):
             self,
             path: str,
             segment_format: SegmentFormat,
+            field_names: Optional[Collection[str]] = None,
     ):
         """
         :param path: the path of this segment (needed in the created DataLeaf objects)
         :param segment_format: the segment format
+        :param field_names: the names of the fields that are needed. Parsing stops after the last of these fields, so
+            values and errors further on in the segment are not seen. If empty, segments are not parsed at all. None
+            parses all fields
         """
         self.path = path
         self.segment_format = segment_format
+        self._last_field_idx: Optional[int] = None
+        "The index of the last field to parse, or None to parse all fields."
+        if field_names is not None:
+            self._last_field_idx = max(
+                (
+                    field_idx
+                    for field_idx, field in enumerate(segment_format.field_list)
+                    if field.name and field.name in field_names
+                ),
+                default=-1,
+            )
 
     def from_edifact(self, edifact_segment: str) -> DataLeaf:
         """
@@ -31,14 +46,92 @@ class SegmentReader(object):
         :param edifact_segment:
         :return:
         """
-        separators = self.segment_format.config.separators
-        escape_char = self.segment_format.config.escape_char
-        terminator = self.segment_format.config.segment_terminator
-        fields = self.segment_format.field_list
         data_leaf = DataLeaf(
             path=self.path,
             segment_format=self.segment_format,
         )
+        if self._last_field_idx is not None and self._last_field_idx < 0:
+            # No field is needed.
+            return data_leaf
+        escape_char = self.segment_format.config.escape_char
+        if escape_char and escape_char in edifact_segment:
+            self._split_escaped(edifact_segment=edifact_segment, data_leaf=data_leaf)
+        else:
+            self._split_unescaped(edifact_segment=edifact_segment, data_leaf=data_leaf)
+        return data_leaf
+
+    def _split_unescaped(
+            self,
+            edifact_segment: str,
+            data_leaf: DataLeaf,
+    ) -> None:
+        """
+        Parses an edifact_segment string without escape characters into data_leaf, using the split plan of the segment
+        format. Gives the same result as _split_escaped.
+        :param edifact_segment:
+        :param data_leaf:
+        :return: None
+        """
+        plan = self.segment_format.get_split_plan()
+        terminator = self.segment_format.config.segment_terminator
+        last_field_idx = self._last_field_idx
+        # Every separator moves at least one field further, so more splits are never needed to reach the last field.
+        max_split = 0 if last_field_idx is None else last_field_idx + 2
+        parts = plan.splitter.split(edifact_segment.partition(terminator)[0], max_split)
+        "Alternately a value and the separator that follows it, ending with a value (or the unsplit rest)."
+        field_idx = -1
+        c_idx = 0
+        "The index of the character in edifact_segment."
+        for part_idx in range(0, len(parts) - 1, 2):
+            if last_field_idx is not None and field_idx > last_field_idx:
+                return
+            value = parts[part_idx]
+            c_idx += len(value)
+            self._set_field(
+                field_idx=field_idx,
+                value=value,
+                data_leaf=data_leaf,
+            )
+            if data_leaf.error:
+                # Abort further parsing.
+                return
+            separator = parts[part_idx + 1]
+            next_field_idx = plan.next_field_indexes[field_idx + 1][separator]
+            if next_field_idx is None:
+                data_leaf.error = self._get_unexpected_separator_error(
+                    separator=separator,
+                    c_idx=c_idx,
+                    start_field_idx=field_idx,
+                )
+                # Abort further parsing.
+                return
+            field_idx = next_field_idx
+            c_idx += 1
+        if last_field_idx is not None and field_idx > last_field_idx:
+            return
+        if parts[-1]:
+            # Add final bit of information.
+            self._set_field(
+                field_idx=field_idx,
+                value=parts[-1],
+                data_leaf=data_leaf,
+            )
+
+    def _split_escaped(
+            self,
+            edifact_segment: str,
+            data_leaf: DataLeaf,
+    ) -> None:
+        """
+        Parses an edifact_segment string into data_leaf one character at a time, handling escape characters.
+        :param edifact_segment:
+        :param data_leaf:
+        :return: None
+        """
+        separators = self.segment_format.config.separators
+        escape_char = self.segment_format.config.escape_char
+        terminator = self.segment_format.config.segment_terminator
+        fields = self.segment_format.field_list
         buffer: List[str] = []
         "Collects value characters."
         field_idx = -1
@@ -58,7 +151,7 @@ class SegmentReader(object):
                 )
                 if data_leaf.error:
                     # Abort further parsing.
-                    return data_leaf
+                    return
 
                 # Continue to the next field of the level defined by the encountered separator.
                 start_field_idx = field_idx
@@ -67,13 +160,16 @@ class SegmentReader(object):
                 while field_idx < len(fields) and fields[field_idx].level > next_level:
                     field_idx += 1
                 if field_idx >= len(fields) or fields[field_idx].level != next_level:
-                    data_leaf.error = (
-                        f'Unexpected separator "{c}" at {c_idx + 1}'
-                        f' coming from field index {start_field_idx}'
-                        f' "{fields[start_field_idx] if start_field_idx >= 0 else self.segment_format.name}".'
+                    data_leaf.error = self._get_unexpected_separator_error(
+                        separator=c,
+                        c_idx=c_idx,
+                        start_field_idx=start_field_idx,
                     )
                     # Abort further parsing.
-                    return data_leaf
+                    return
+                if self._last_field_idx is not None and field_idx > self._last_field_idx:
+                    # The rest is not needed.
+                    return
             elif not escaped and c == escape_char:
                 escaped = True
             else:
@@ -89,7 +185,25 @@ class SegmentReader(object):
                 data_leaf=data_leaf,
             )
 
-        return data_leaf
+    def _get_unexpected_separator_error(
+            self,
+            separator: str,
+            c_idx: int,
+            start_field_idx: int,
+    ) -> str:
+        """
+        Gives the error message for a separator that is not expected after a field.
+        :param separator: the encountered separator
+        :param c_idx: the index of the separator in the segment
+        :param start_field_idx: the index of the field before the separator, -1 for the segment name
+        :return: the error message
+        """
+        fields = self.segment_format.field_list
+        return (
+            f'Unexpected separator "{separator}" at {c_idx + 1}'
+            f' coming from field index {start_field_idx}'
+            f' "{fields[start_field_idx] if start_field_idx >= 0 else self.segment_format.name}".'
+        )
 
     def _set_field(
             self,
@@ -0,0 +1,82 @@
+"""
+This module contains functions that provide EDIFACT segments (lines) lazily from different sources, so a large file
+does not have to be in memory as a whole before parsing begins.
+"""
+import io
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, Optional, TextIO, Union
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+"The maximal number of characters read from a file or stream at once."
+
+EdifactSource = Union[Iterable[str], str, Path, TextIO, BinaryIO]
+"""
+An EDIFACT source: [Iterable[str]] the segments, one per item; [str or Path] the path to a file; [TextIO or BinaryIO]
+a file-like object.
+"""
+
+_LINE_BOUNDARIES = "\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029"
+"The characters that str.splitlines splits on."
+
+
+def iter_segments(
+        source: EdifactSource,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        encoding: Optional[str] = None,
+) -> Iterator[str]:
+    """
+    Gives the segments (lines without line endings) of an EDIFACT source one at a time. Files and streams are read in
+    chunks of at most chunk_size characters. The result is the same as that of str.splitlines on the full content.
+
+    :param source: see EdifactSource. A str is interpreted as a path, not as EDIFACT content.
+    :param chunk_size: the maximal number of characters to read at once
+    :param encoding: the encoding of files and binary streams. None uses the same default as the built-in open function
+    :return: the segments
+    """
+    if isinstance(source, (str, Path)):
+        with open(source, "r", encoding=encoding) as f:
+            yield from _iter_lines(f, chunk_size)
+    elif hasattr(source, "read"):
+        if isinstance(source.read(0), bytes):
+            text_stream = io.TextIOWrapper(source, encoding=encoding)
+            try:
+                yield from _iter_lines(text_stream, chunk_size)
+            finally:
+                # Do not let the wrapper close the stream of the caller.
+                text_stream.detach()
+        else:
+            yield from _iter_lines(source, chunk_size)
+    else:
+        yield from source
+
+
+def _iter_lines(
+        text_stream: TextIO,
+        chunk_size: int,
+) -> Iterator[str]:
+    """
+    Splits the text from the stream into lines, reading one chunk at a time.
+    :param text_stream: the stream to read, it is not closed
+    :param chunk_size: the maximal number of characters to read at once
+    :return: the lines
+    """
+    rest = ""
+    "The beginning of a line of which the end is not read yet."
+    while True:
+        chunk = text_stream.read(chunk_size)
+        if not chunk:
+            break
+        text = rest + chunk
+        lines = text.splitlines()
+        last_char = text[-1]
+        if last_char == "\r":
+            # A "\r" may be followed by "\n" in the next chunk.
+            rest = lines.pop() + last_char
+        elif last_char not in _LINE_BOUNDARIES:
+            # The last line may continue in the next chunk.
+            rest = lines.pop()
+        else:
+            rest = ""
+        yield from lines
+    if rest:
+        yield from rest.splitlines()
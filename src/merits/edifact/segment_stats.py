@@ -0,0 +1,77 @@
+import dataclasses
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from merits.edifact.segment_observer import SegmentObserver
+
+
+@dataclass
+class PathStats:
+    segment_count: int = 0
+    character_count: int = 0
+    "The length of the segments without line endings. For the ASCII based character sets this is the size in bytes."
+    seconds: float = 0.0
+    "The cumulative time to parse or write the segments."
+    error_count: int = 0
+
+
+class SegmentStats(SegmentObserver):
+    """
+    This implementation counts the segments, their size, time and errors per definition path. This shows which segment
+    types dominate the cost of a file.
+    """
+
+    def __init__(self):
+        self.path_2_stats: Dict[str, PathStats] = {}
+        "The statistics per path, in the order in which the paths were first seen."
+
+    def on_segment(
+            self,
+            path: str,
+            segment: Optional[str],
+            seconds: float,
+            error: Optional[str],
+    ) -> None:
+        stats = self.path_2_stats.get(path)
+        if stats is None:
+            stats = PathStats()
+            self.path_2_stats[path] = stats
+        stats.segment_count += 1
+        if segment:
+            stats.character_count += len(segment)
+        stats.seconds += seconds
+        if error:
+            stats.error_count += 1
+
+    def merge(self, other: "SegmentStats") -> None:
+        """
+        Adds the statistics of another observer, for example of a conversion in another process.
+        :param other:
+        :return: None
+        """
+        for path, other_stats in other.path_2_stats.items():
+            stats = self.path_2_stats.setdefault(path, PathStats())
+            stats.segment_count += other_stats.segment_count
+            stats.character_count += other_stats.character_count
+            stats.seconds += other_stats.seconds
+            stats.error_count += other_stats.error_count
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Gives the statistics with the most time consuming paths first.
+        :return: {"paths": {path: {"segment_count": ..., "character_count": ..., "seconds": ..., "error_count": ...}}}
+        """
+        return {
+            "paths": {
+                path: dataclasses.asdict(stats)
+                for path, stats in sorted(self.path_2_stats.items(), key=lambda item: -item[1].seconds)
+            },
+        }
+
+    def to_json(self) -> str:
+        """
+        Gives to_dict as JSON.
+        :return:
+        """
+        return json.dumps(self.to_dict(), indent=2)
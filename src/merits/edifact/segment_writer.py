@@ -1,6 +1,7 @@
-from typing import List, Optional
+from typing import List, Optional, Sequence
 
 from merits.edifact.object_model import DataLeaf
+from merits.edifact.segment_format import WritePlan
 
 
 class SegmentWriter(object):
@@ -13,35 +14,46 @@ class SegmentWriter(object):
         :return:
         """
         segment_format = leaf.segment_format
-        config = segment_format.config
-        separators = config.separators
-        escape_char = config.escape_char
-        terminator = config.segment_terminator
-        fields = segment_format.field_list
+        return SegmentWriter.write_values(
+            name=segment_format.name,
+            terminator=segment_format.config.segment_terminator,
+            plan=segment_format.get_write_plan(),
+            values=leaf.get_values(),
+        )
 
+    @staticmethod
+    def write_values(
+            name: str,
+            terminator: str,
+            plan: WritePlan,
+            values: Sequence[Optional[str]],
+    ) -> str:
+        """
+        Creates one EDIFACT segment string. Separators after the last value of a level are left out.
+        :param name: the segment name
+        :param terminator: the segment terminator
+        :param plan: the write plan of the segment format
+        :param values: by position in the segment format field_list. Empty strings and None are not written
+        :return:
+        """
+        needs_escape = plan.needs_escape.search
+        escape_table = plan.escape_table
         result: List[str] = [terminator]
         "The result will build up in reversed order."
-        buffer: List[str]
         current_level: Optional[int] = None
-        for field in reversed(fields):
-            level = field.level
-            if field.name:
-                value = leaf.get(field.name, None)
-            else:
-                value = None
+        for value_idx, level, separator in plan.reversed_fields:
+            value = None if value_idx is None else values[value_idx]
             if value:
                 # Escape special characters.
-                value = value.replace(escape_char, escape_char + escape_char)
-                for separator in separators:
-                    value = value.replace(separator, escape_char + separator)
-                value = value.replace(terminator, escape_char + terminator)
-                # Set the value.
+                if needs_escape(value):
+                    value = value.translate(escape_table)
                 result.append(value)
+                result.append(separator)
                 current_level = level
-            if current_level is not None and level <= current_level:
-                result.append(separators[level - 1])
+            elif current_level is not None and level <= current_level:
+                result.append(separator)
                 current_level = level
-        result.append(segment_format.name)
+        result.append(name)
         # Put the result in regular order.
         result.reverse()
         return "".join(result)
@@ -1,5 +1,6 @@
+import copy
 from dataclasses import dataclass
-from typing import Dict, Tuple, Optional, List
+from typing import Dict, Tuple, Optional, List, Sequence
 
 from merits import common
 from merits.edifact.definition_model import Definition, Node, Segment
@@ -177,28 +178,40 @@ class StateMachine(object):
         self.begin_state: Optional[State] = None
         self.end_state: Optional[State] = None
         self.state: Optional[State] = None
+        self._route_table: Dict[Tuple[str, str], Tuple[Tuple[Transition, ...], State]] = {}
+        """
+        Memo of the routes that have been resolved before: (state path, segment name) ➔ (route, destination state).
+        Invalid triggers are not stored.
+        """
         self._after_new()
 
     def handle(
             self,
             segment_name: str,
     ) -> Tuple[
-        List[Transition],
+        Sequence[Transition],
         Optional[str],
     ]:
         """
-        Call this method when encountering a segment during parsing of an EDIFACT file.
+        Call this method when encountering a segment during parsing of an EDIFACT file. The route of a state and
+        segment name is resolved only once, after that it is taken from a table. The route is shared, do not modify it.
         :param segment_name: the name of the encountered segment. Foe example "ASD"
         :return: route from current state to triggered state, error text
         """
-        transitions, err_msg = self.state.handle_trigger(segment_name)
-        if not err_msg:
+        key = (self.state.path, segment_name)
+        route = self._route_table.get(key)
+        if route is None:
+            transitions, err_msg = self.state.handle_trigger(segment_name)
+            if err_msg:
+                return transitions, err_msg
             destination = transitions[-1]
-            self.state = destination.enter if destination.enter else destination.exit
-        return transitions, err_msg
+            route = (tuple(transitions), destination.enter if destination.enter else destination.exit)
+            self._route_table[key] = route
+        self.state = route[1]
+        return route[0], None
 
     def finish(self) -> Tuple[
-        List[Transition],
+        Sequence[Transition],
         Optional[str],
     ]:
         """
@@ -218,6 +231,15 @@ class StateMachine(object):
         """
         self.state = self.begin_state
 
+    def copy(self) -> "StateMachine":
+        """
+        Gives a new state machine at the beginning state that shares the states and the memo of routes with this one.
+        :return:
+        """
+        result = copy.copy(self)
+        result.state = result.begin_state
+        return result
+
     def _create_states(
             self,
             root_node: Node,
@@ -0,0 +1,128 @@
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from merits.edifact.compiled_definition import CompiledDefinition
+from merits.edifact.definition_model import Definition
+from merits.edifact.segment_reader import SegmentReader
+from merits.edifact.segment_source import EdifactSource, iter_segments
+from merits.edifact.state_machine import Transition
+from merits.exceptions import MeritsException
+
+
+@dataclass
+class RowRule:
+    """
+    Tells which CSV row an EDIFACT group or segment creates in an EDIFACT to CSVs conversion.
+    """
+    csv_file_name: str
+    field_name: Optional[str] = None
+    "For a segment: the field that decides if a row is created. None if the group or segment always creates a row."
+    field_value: Optional[str] = None
+    "The value of field_name for which a row is created."
+
+
+class EdifactRowCounter(object):
+    """
+    This class counts the CSV rows that an EDIFACT to CSVs conversion would create, without converting. It only runs
+    the segment names through the state machine, and parses the one field of a conditional rule in the segments of its
+    path. The structure is validated as by EdifactReader. The row ID's of a conversion count on by one per row, so the
+    counts give the ID's of a conversion in advance.
+    """
+
+    def __init__(
+            self,
+            definition: Definition,
+            path_2_row_rule: Dict[str, RowRule],
+    ):
+        """
+
+        :param definition: the EDIFACT definition
+        :param path_2_row_rule: the rule by path of the group or segment that creates a row
+        """
+        compiled_definition = CompiledDefinition.get(definition)
+        self._state_machine = compiled_definition.create_state_machine()
+        self._path_2_row_rule = path_2_row_rule
+        self._path_2_segment_reader: Dict[str, SegmentReader] = {
+            path: SegmentReader(
+                path=path,
+                segment_format=compiled_definition.path_2_segment_format[path],
+                field_names=[row_rule.field_name],
+            )
+            for path, row_rule in path_2_row_rule.items()
+            if row_rule.field_name
+        }
+        self._route_2_rules: Dict[int, Tuple[Sequence[Transition], List[Tuple[str, RowRule]]]] = {}
+        """
+        The rules of the entered states by id of a memoized route of the state machine. The route is kept so the id is
+        not reused.
+        """
+
+    def count(
+            self,
+            segments: EdifactSource,
+            is_complete: bool = True,
+    ) -> Dict[str, int]:
+        """
+        Counts the rows that the segments convert to.
+        :param segments: the segments or a file path or stream, see EdifactSource
+        :param is_complete: False if the segments are only the first part of a message, see EdifactReader.read
+        :return: the number of rows per CSV file of the rules, including the files without rows
+        :raise MeritsException: if the structure is invalid, or a field of a conditional rule can not be parsed
+        """
+        csv_file_name_2_count = Counter({
+            row_rule.csv_file_name: 0
+            for row_rule in self._path_2_row_rule.values()
+        })
+        state_machine = self._state_machine
+        state_machine.reset()
+        for segment_idx, segment in enumerate(iter_segments(segments)):
+            if not segment:
+                # Skip empty lines (at the end of the file).
+                continue
+            transitions, err_msg = state_machine.handle(segment_name=segment[:3])
+            if err_msg:
+                raise MeritsException(
+                    f'Illegal segment at line {segment_idx + 1} coming from state '
+                    f'{state_machine.state.node.node_id} {state_machine.state.path}'
+                    f': {err_msg}'
+                )
+            for path, row_rule in self._get_rules(transitions):
+                if row_rule.field_name:
+                    data_leaf = self._path_2_segment_reader[path].from_edifact(edifact_segment=segment)
+                    if data_leaf.error:
+                        raise MeritsException(
+                            f'Failed to read line {segment_idx + 1} as segment type {path}: {data_leaf.error}'
+                        )
+                    if data_leaf.get(row_rule.field_name) != row_rule.field_value:
+                        continue
+                csv_file_name_2_count[row_rule.csv_file_name] += 1
+        if is_complete:
+            _, err_msg = state_machine.finish()
+            if err_msg:
+                raise MeritsException(
+                    f'Could not finalize coming from state '
+                    f'{state_machine.state.node.node_id} {state_machine.state.path}'
+                    f': {err_msg}'
+                )
+        return dict(csv_file_name_2_count)
+
+    def _get_rules(
+            self,
+            transitions: Sequence[Transition],
+    ) -> List[Tuple[str, RowRule]]:
+        """
+        Gives the rules of the states that the transitions enter.
+        :param transitions: a route given by the state machine
+        :return: the path and rule per entered state with a rule
+        """
+        route_and_rules = self._route_2_rules.get(id(transitions))
+        if route_and_rules is None:
+            rules = [
+                (transition.enter.path, self._path_2_row_rule[transition.enter.path])
+                for transition in transitions
+                if transition.enter and transition.enter.path in self._path_2_row_rule
+            ]
+            route_and_rules = (transitions, rules)
+            self._route_2_rules[id(transitions)] = route_and_rules
+        return route_and_rules[1]
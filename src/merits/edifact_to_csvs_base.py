@@ -1,5 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from typing import Dict, Union
+
+from merits.csvs_zip.collector_in_memory import CollectorInMemory
+from merits.csvs_zip.collector_on_disk import CollectorOnDisk
+from merits.edifact.segment_source import EdifactSource
 
 
 class EdifactToCsvsBase(ABC):
@@ -30,11 +34,21 @@ class EdifactToCsvsBase(ABC):
     @abstractmethod
     def load(
             self,
-            edifact_segments: List[str],
+            edifact_segments: EdifactSource,
+            is_complete: bool = True,
     ) -> None:
         """
         Reads and converts the edifact segments to CSV format.
-        :param edifact_segments:
+        :param edifact_segments: the segments or a file path or stream. Files and streams are read lazily.
+        :param is_complete: False if the segments are only the first part of a message, see EdifactReader.read
+        :return:
+        """
+        pass
+
+    @abstractmethod
+    def get_csv_collector(self) -> Union[CollectorInMemory, CollectorOnDisk]:
+        """
+        Gives the collector that holds the converted rows.
         :return:
         """
         pass
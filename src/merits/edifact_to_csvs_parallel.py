@@ -0,0 +1,261 @@
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Tuple, Type, Union
+
+from merits.csvs_zip.collector_in_memory import CollectorInMemory
+from merits.csvs_zip.collector_on_disk import CollectorOnDisk
+from merits.csvs_zip.csv_hierarchy import CsvHierarchy
+from merits.edifact.definition_model import Definition
+from merits.edifact.segment_source import EdifactSource, iter_segments
+from merits.edifact.state_machine import StateMachine
+from merits.edifact_to_csvs_base import EdifactToCsvsBase
+from merits.exceptions import MeritsException
+
+DEFAULT_GROUPS_PER_CHUNK = 500
+"The default number of partition groups per chunk of work."
+
+
+class EdifactToCsvsParallel(EdifactToCsvsBase):
+    """
+    This class converts EDIFACT to CSV files with the same result as a serial convertor, but divides the work over a
+    pool of processes.
+
+    The message is split into chunks at the top level partition group, for example 2_PRD in SKDUPD. Apart from the row
+    ID's these groups do not depend on each other. Every chunk starts with the segments before the first partition
+    group, so the header information is available. Each chunk is converted by a new serial convertor, counting the row
+    ID's from the start. The row ID's are renumbered when the results are merged in order. The meta rows are only taken
+    from the first chunk.
+    """
+
+    def __init__(
+            self,
+            convertor_class: Type[EdifactToCsvsBase],
+            definition: Definition,
+            csv_hierarchy: CsvHierarchy,
+            partition_path: str,
+            jobs: int,
+            groups_per_chunk: int = DEFAULT_GROUPS_PER_CHUNK,
+            csv_collector: Optional[Union[CollectorInMemory, CollectorOnDisk]] = None,
+    ):
+        """
+
+        :param convertor_class: the serial convertor. It must be constructable with only an optional csv_collector and
+            have a static method get_csv_file_name_2_field_names
+        :param definition: the EDIFACT definition that the convertor uses
+        :param csv_hierarchy: the CSV tables that the convertor creates. The ID columns are renumbered
+        :param partition_path: the path of the top level group at which the message is split
+        :param jobs: the number of processes. With 1 the chunks are converted in this process
+        :param groups_per_chunk: the number of partition groups in one chunk
+        :param csv_collector: the collector to give the merged rows to, see the convertor. The chunks are always
+            collected in memory
+        """
+        partition_nodes = [
+            node
+            for node in definition.structure.child_list
+            if node.name == partition_path and node.child_list
+        ]
+        if not partition_nodes:
+            raise MeritsException(
+                f'Partition path "{partition_path}" is not a top level group in the definition.'
+            )
+        if jobs < 1 or groups_per_chunk < 1:
+            raise MeritsException(
+                f'Expected at least one job and one group per chunk but got {jobs} and {groups_per_chunk}.'
+            )
+        self._convertor_class = convertor_class
+        self._definition = definition
+        self._csv_hierarchy = csv_hierarchy
+        self._partition_path = partition_path
+        self._jobs = jobs
+        self._groups_per_chunk = groups_per_chunk
+
+        self._convertor = convertor_class(csv_collector=csv_collector)
+        "Holds the merged rows."
+        self._default_next_ids = self._convertor.get_csv_file_name_2_next_id()
+        "The next row ID's with which every chunk starts."
+        self._next_ids = dict(self._default_next_ids)
+        self._csv_file_name_2_id_names: Dict[str, List[str]] = {
+            csv_file_name: [
+                field_name
+                for field_name in table.field_name_list
+                if field_name in csv_hierarchy.id_name_2_table
+            ]
+            for csv_file_name, table in csv_hierarchy.csv_file_name_2_table.items()
+        }
+        "The columns to renumber per CSV file."
+        self._chunk_count = 0
+
+    def get_csv_file_name_2_next_id(self) -> Dict[str, int]:
+        return dict(self._next_ids)
+
+    def set_csv_file_name_2_next_id(self, csv_file_name_2_next_id: Dict[str, int]) -> None:
+        self._next_ids.update(csv_file_name_2_next_id)
+
+    def load(
+            self,
+            edifact_segments: EdifactSource,
+            is_complete: bool = True,
+    ) -> None:
+        """
+        Reads and converts the edifact segments to CSV format.
+        :param edifact_segments: the segments or a file path or stream. Files and streams are read lazily.
+        :param is_complete: False if the segments are only the first part of a message, see EdifactReader.read
+        :return:
+        """
+        executor: Optional[ProcessPoolExecutor] = None
+        if self._jobs > 1:
+            executor = ProcessPoolExecutor(max_workers=self._jobs)
+        pending: Deque[Tuple[Future, int, int]] = deque()
+        "The submitted chunks in order with their first and last line numbers."
+        try:
+            for segments, first_line, last_line, is_last in self._iter_chunks(edifact_segments):
+                chunk_is_complete = is_complete if is_last else False
+                if executor:
+                    future = executor.submit(_convert_chunk, self._convertor_class, segments, chunk_is_complete)
+                    pending.append((future, first_line, last_line))
+                    if len(pending) >= 2 * self._jobs:
+                        # Limit the number of chunks in memory.
+                        future, first_line, last_line = pending.popleft()
+                        self._merge_result(future.result, first_line, last_line)
+                else:
+                    self._merge_result(
+                        lambda: _convert_chunk(self._convertor_class, segments, chunk_is_complete),
+                        first_line,
+                        last_line,
+                    )
+            while pending:
+                future, first_line, last_line = pending.popleft()
+                self._merge_result(future.result, first_line, last_line)
+        finally:
+            if executor:
+                executor.shutdown(cancel_futures=True)
+
+    def get_csv_collector(self) -> Union[CollectorInMemory, CollectorOnDisk]:
+        return self._convertor.get_csv_collector()
+
+    def get_csvs(self) -> Dict[str, str]:
+        """
+        Gives the loaded CSV files as a dict from file name to file content.
+        :return:
+        """
+        return self._convertor.get_csvs()
+
+    def get_zip(self) -> bytes:
+        """
+        Gives the loaded CSV files as zipped bytes
+        :return:
+        """
+        return self._convertor.get_zip()
+
+    def _iter_chunks(
+            self,
+            edifact_segments: EdifactSource,
+    ) -> Iterator[Tuple[List[str], int, int, bool]]:
+        """
+        Splits the segments into chunks. The structure is validated on the way.
+        :param edifact_segments:
+        :return: the segments of a chunk, its first and last line number (without header), is last chunk
+        """
+        state_machine = StateMachine(definition=self._definition)
+        header: List[str] = []
+        chunk: Optional[List[str]] = None
+        "The current chunk, None while still in the header."
+        group_count = 0
+        first_line = 1
+        last_line = 0
+        for segment_idx, segment in enumerate(iter_segments(edifact_segments)):
+            if not segment:
+                # Skip empty lines (at the end of the file).
+                continue
+            transitions, err_msg = state_machine.handle(segment_name=segment[:3])
+            if err_msg:
+                raise MeritsException(
+                    f'Illegal segment at line {segment_idx + 1} coming from state '
+                    f'{state_machine.state.node.node_id} {state_machine.state.path}'
+                    f': {err_msg}'
+                )
+            enters_partition = any(
+                transition.enter is not None and transition.enter.path == self._partition_path
+                for transition in transitions
+            )
+            if enters_partition:
+                if chunk is None:
+                    chunk = list(header)
+                    first_line = segment_idx + 1
+                elif group_count >= self._groups_per_chunk:
+                    yield chunk, first_line, last_line, False
+                    chunk = list(header)
+                    first_line = segment_idx + 1
+                    group_count = 0
+                group_count += 1
+            last_line = segment_idx + 1
+            if chunk is None:
+                header.append(segment)
+            else:
+                chunk.append(segment)
+        yield (header if chunk is None else chunk), first_line, last_line, True
+
+    def _merge_result(
+            self,
+            get_result: Callable[[], Tuple[Dict[str, List[Dict[str, str]]], Dict[str, int]]],
+            first_line: int,
+            last_line: int,
+    ) -> None:
+        """
+        Renumbers the row ID's of a converted chunk and adds the rows to the result.
+        :param get_result: gives the result of _convert_chunk
+        :param first_line: for error messages
+        :param last_line: for error messages
+        :return: None
+        """
+        try:
+            csv_file_name_2_rows, chunk_next_ids = get_result()
+        except MeritsException as e:
+            raise MeritsException(
+                f'Failed to convert the chunk of lines {first_line} to {last_line}: {e}'
+            ) from e
+        id_name_2_offset = {
+            id_name: self._next_ids[table.csv_file_name] - self._default_next_ids[table.csv_file_name]
+            for id_name, table in self._csv_hierarchy.id_name_2_table.items()
+        }
+        csv_collector = self._convertor.get_csv_collector()
+        for csv_file_name, rows in csv_file_name_2_rows.items():
+            if csv_file_name == self._csv_hierarchy.meta_file_name and self._chunk_count:
+                # Every chunk has the same header: take the meta rows only once.
+                continue
+            offsets = [
+                (id_name, id_name_2_offset[id_name])
+                for id_name in self._csv_file_name_2_id_names.get(csv_file_name, [])
+                if id_name_2_offset[id_name]
+            ]
+            for row in rows:
+                for id_name, offset in offsets:
+                    row[id_name] += offset
+                csv_collector.collect(csv_file_name=csv_file_name, row=row)
+        for csv_file_name, next_id in chunk_next_ids.items():
+            self._next_ids[csv_file_name] += next_id - self._default_next_ids[csv_file_name]
+        self._chunk_count += 1
+
+
+def _convert_chunk(
+        convertor_class: Type[EdifactToCsvsBase],
+        segments: List[str],
+        is_complete: bool,
+) -> Tuple[Dict[str, List[Dict[str, str]]], Dict[str, int]]:
+    """
+    Converts one chunk with a new serial convertor. This runs in a worker process.
+    :param convertor_class:
+    :param segments:
+    :param is_complete:
+    :return: the rows per CSV file, the next row ID's
+    """
+    csv_collector = CollectorInMemory(
+        csv_file_name_2_field_names=convertor_class.get_csv_file_name_2_field_names(),
+    )
+    convertor = convertor_class(csv_collector=csv_collector)
+    convertor.load(edifact_segments=segments, is_complete=is_complete)
+    csv_file_name_2_rows = {
+        csv_file_name: csv_collector.get_rows(csv_file_name)
+        for csv_file_name in csv_collector.get_csv_file_names()
+    }
+    return csv_file_name_2_rows, convertor.get_csv_file_name_2_next_id()
@@ -0,0 +1,237 @@
+import sys
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from merits.exceptions import MeritsException
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, where the peak RSS is not reported.
+    resource = None
+
+PHASE_CONVERT = "convert"
+"Converting the segments or rows, while the collector accumulates the output."
+
+DEFAULT_TOP_COUNT = 5
+
+KIB = 1024
+MIB = 1024 * 1024
+
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+"Leaves out the memory of tracemalloc, of this module and of imports."
+
+
+def get_peak_rss() -> Optional[int]:
+    """
+    Gives the peak resident set size of the process since it started.
+    :return: the size in bytes, or None if not available on this platform
+    """
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return max_rss
+    # In kilobytes on Linux.
+    return max_rss * 1024
+
+
+@dataclass
+class AllocationSite:
+    size_bytes: int = 0
+    "The memory that was allocated at the site during the phase and not freed at its end."
+    block_count: int = 0
+
+
+@dataclass
+class PhaseMemory:
+    traced_peak_bytes: int = 0
+    "The peak of the memory that Python allocated while the phase ran."
+    traced_growth_bytes: int = 0
+    "The memory that was allocated during the phase and not freed at its end. Can be negative."
+    rss_peak_bytes: Optional[int] = None
+    "The peak resident set size at the end of the phase, which includes the phases before it."
+    location_2_site: Dict[str, AllocationSite] = field(default_factory=dict)
+    "The sites with the largest growth, as file:line."
+
+
+@dataclass
+class _RunningPhase:
+    phase: PhaseMemory
+    snapshot: tracemalloc.Snapshot
+    traced_bytes: int
+
+
+class MemoryTracker(object):
+    """
+    This class measures the memory of the phases of a conversion with tracemalloc. At the start and the end of a phase
+    a snapshot is taken, and the allocation sites that grew the most in between are kept, with the peak of the traced
+    memory and the peak resident set size of the process. This shows which structure grows, like the rows in a
+    CollectorInMemory, and when.
+
+    tracemalloc makes a conversion a few times slower and a snapshot takes time, so phases should be coarse: around the
+    conversion, not around every segment. Phases can be nested: the peak of an outer phase includes the nested phases.
+    """
+
+    def __init__(
+            self,
+            top_count: int = DEFAULT_TOP_COUNT,
+    ):
+        """
+
+        :param top_count: the number of allocation sites to report per phase
+        """
+        self.top_count = top_count
+        self.name_2_phase: Dict[str, PhaseMemory] = {}
+        "The phases in the order in which they were first started."
+        self._stack: List[_RunningPhase] = []
+        self._started_tracing = False
+
+    def start(self, name: str) -> None:
+        """
+        Starts a phase, and starts tracing if tracemalloc is not tracing yet.
+        :param name: for example PHASE_CONVERT
+        :return: None
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        traced_bytes, peak_bytes = tracemalloc.get_traced_memory()
+        if self._stack:
+            outer = self._stack[-1].phase
+            outer.traced_peak_bytes = max(outer.traced_peak_bytes, peak_bytes)
+        phase = self.name_2_phase.get(name)
+        if phase is None:
+            phase = PhaseMemory()
+            self.name_2_phase[name] = phase
+        snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        tracemalloc.reset_peak()
+        self._stack.append(_RunningPhase(
+            phase=phase,
+            snapshot=snapshot,
+            traced_bytes=tracemalloc.get_traced_memory()[0],
+        ))
+
+    def stop(self) -> None:
+        """
+        Stops the last started phase.
+        :return: None
+        :raise MeritsException: if no phase is running
+        """
+        if not self._stack:
+            raise MeritsException(
+                'Cannot stop a memory phase: no phase is running.'
+            )
+        traced_bytes, peak_bytes = tracemalloc.get_traced_memory()
+        running = self._stack.pop()
+        phase = running.phase
+        phase.traced_peak_bytes = max(phase.traced_peak_bytes, peak_bytes)
+        phase.traced_growth_bytes += traced_bytes - running.traced_bytes
+        rss_peak_bytes = get_peak_rss()
+        if rss_peak_bytes is not None:
+            phase.rss_peak_bytes = max(phase.rss_peak_bytes or 0, rss_peak_bytes)
+        snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        statistics = snapshot.compare_to(running.snapshot, "lineno")
+        for statistic in statistics[:self.top_count]:
+            if statistic.size_diff <= 0:
+                break
+            frame = statistic.traceback[0]
+            site = phase.location_2_site.setdefault(
+                f"{_short_file_name(frame.filename)}:{frame.lineno}",
+                AllocationSite(),
+            )
+            site.size_bytes += statistic.size_diff
+            site.block_count += statistic.count_diff
+        if self._stack:
+            outer = self._stack[-1].phase
+            outer.traced_peak_bytes = max(outer.traced_peak_bytes, peak_bytes)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Runs the body of a with statement as a phase.
+        :param name:
+        :return:
+        """
+        self.start(name)
+        try:
+            yield
+        finally:
+            self.stop()
+
+    def close(self) -> None:
+        """
+        Stops tracing if this tracker started it. The measured phases are kept.
+        :return: None
+        """
+        self._stack.clear()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def merge(self, other: "MemoryTracker") -> None:
+        """
+        Adds the phases of another tracker, for example of a conversion in another process. The peaks are the highest
+        of both, the growth is added up.
+        :param other: a tracker of which no phase is running
+        :return: None
+        """
+        for name, other_phase in other.name_2_phase.items():
+            phase = self.name_2_phase.setdefault(name, PhaseMemory())
+            phase.traced_peak_bytes = max(phase.traced_peak_bytes, other_phase.traced_peak_bytes)
+            phase.traced_growth_bytes += other_phase.traced_growth_bytes
+            if other_phase.rss_peak_bytes is not None:
+                phase.rss_peak_bytes = max(phase.rss_peak_bytes or 0, other_phase.rss_peak_bytes)
+            for location, other_site in other_phase.location_2_site.items():
+                site = phase.location_2_site.setdefault(location, AllocationSite())
+                site.size_bytes += other_site.size_bytes
+                site.block_count += other_site.block_count
+
+    def get_top_sites(self, name: str) -> List[Tuple[str, AllocationSite]]:
+        """
+        Gives the allocation sites of a phase that grew the most.
+        :param name:
+        :return: at most top_count (location, site) tuples, the largest first
+        """
+        return sorted(
+            self.name_2_phase[name].location_2_site.items(),
+            key=lambda item: -item[1].size_bytes,
+        )[:self.top_count]
+
+    def get_report(self) -> List[str]:
+        """
+        Gives a table with the peak and growth of the memory per phase, each followed by its top allocation sites.
+        :return: the lines of the table
+        """
+        lines = [f'{"phase":24} {"peak MiB":>9} {"growth MiB":>11} {"rss peak MiB":>13}']
+        for name, phase in self.name_2_phase.items():
+            rss_peak = "" if phase.rss_peak_bytes is None else f'{phase.rss_peak_bytes / MIB:,.1f}'
+            lines.append(
+                f'{name:24} {phase.traced_peak_bytes / MIB:9,.1f} {phase.traced_growth_bytes / MIB:11,.1f}'
+                f' {rss_peak:>13}'.rstrip()
+            )
+            for location, site in self.get_top_sites(name):
+                lines.append(f'    {site.size_bytes / KIB:12,.1f} KiB {site.block_count:12,} blocks  {location}')
+        return lines
+
+
+def _short_file_name(file_name: str) -> str:
+    """
+    Gives the path of a file of this package from the package on, like "merits/csvs_zip/collector_in_memory.py".
+    :param file_name:
+    :return: other file names as they are
+    """
+    parts = Path(file_name).parts
+    if "merits" in parts:
+        idx = len(parts) - 1 - parts[::-1].index("merits")
+        return "/".join(parts[idx:])
+    return file_name
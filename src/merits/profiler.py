@@ -0,0 +1,440 @@
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Collection, Dict, Iterator, List, Optional, Sequence, TypeVar
+
+from merits.csvs_zip.collector import Collector as CsvCollector
+from merits.csvs_zip.csv_handler import CsvHandler
+from merits.csvs_zip.rows import Rows
+from merits.edifact.collector import Collector as EdifactCollector
+from merits.edifact.data_handler import DataHandler
+from merits.edifact.object_model import DataBranch, DataLeaf
+from merits.exceptions import MeritsException
+
+PHASE_EDIFACT_READ = "edifact read"
+"Reading the EDIFACT source and splitting it into segments."
+PHASE_EDIFACT_STATE_MACHINE = "edifact state machine"
+"Resolving the segment names to groups and segments of the definition."
+PHASE_EDIFACT_PARSE = "edifact parse"
+"Parsing segments into fields."
+PHASE_EDIFACT_SERIALIZE = "edifact serialize"
+"Writing fields as segments."
+PHASE_EDIFACT_WRITE = "edifact write"
+"Giving the segments to the EDIFACT collector, like the buffered output file."
+PHASE_MAP_TO_CSV = "map to csv"
+"The data handler that maps segments to CSV rows."
+PHASE_MAP_TO_EDIFACT = "map to edifact"
+"The CSV handler that maps CSV rows to segments."
+PHASE_CSV_READ = "csv read"
+"Reading and parsing the CSV files."
+PHASE_CSV_SORT = "csv sort"
+"Sorting the CSV rows."
+PHASE_CSV_SERIALIZE = "csv serialize"
+"Giving the rows to the CSV collector, which formats them into the buffered CSV files."
+PHASE_ZIP = "zip"
+"Compressing the CSV files into a ZIP file."
+PHASE_FILE_WRITE = "file write"
+"Closing the output files, which writes what is left in their buffers."
+PHASE_OTHER = "other"
+"Everything else, like checking the arguments and waiting for other processes."
+
+SEGMENTS = "segments"
+ROWS = "rows"
+
+PHASE_2_UNIT = {
+    PHASE_EDIFACT_READ: SEGMENTS,
+    PHASE_EDIFACT_STATE_MACHINE: SEGMENTS,
+    PHASE_EDIFACT_PARSE: SEGMENTS,
+    PHASE_EDIFACT_SERIALIZE: SEGMENTS,
+    PHASE_EDIFACT_WRITE: SEGMENTS,
+    PHASE_MAP_TO_CSV: SEGMENTS,
+    PHASE_MAP_TO_EDIFACT: ROWS,
+    PHASE_CSV_READ: ROWS,
+    PHASE_CSV_SERIALIZE: ROWS,
+}
+"The unit of the item count per phase. A phase that is not in here counts no items."
+
+T = TypeVar("T")
+
+
+@dataclass
+class PhaseStats:
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    "The CPU time of the process, so including other threads."
+    item_count: int = 0
+    "The number of segments or rows, see PHASE_2_UNIT."
+    byte_count: int = 0
+    "The size of the data that the phase reads or writes, if known."
+
+
+class Profiler(object):
+    """
+    This class measures the wall and CPU time of the phases of a conversion. A phase is started and stopped around the
+    calls that belong to it. Phases can be nested: the time of a nested phase is not counted in the outer phase, so the
+    times of all phases add up to the total.
+
+    Measuring takes about a microsecond per start and stop, so a profiled conversion is slower than a normal one. The
+    proxy classes in this module add the phases to the handlers, collectors and rows without changing them.
+    """
+
+    def __init__(self):
+        self.name_2_phase: Dict[str, PhaseStats] = {}
+        "The phases in the order in which they were first started."
+        self._stack: List[PhaseStats] = []
+        self._wall_mark = 0.0
+        self._cpu_mark = 0.0
+
+    def start(self, name: str) -> None:
+        """
+        Starts a phase. The phase that is running is paused until this one stops.
+        :param name: for example PHASE_EDIFACT_PARSE
+        :return: None
+        """
+        wall, cpu = time.perf_counter(), time.process_time()
+        if self._stack:
+            outer = self._stack[-1]
+            outer.wall_seconds += wall - self._wall_mark
+            outer.cpu_seconds += cpu - self._cpu_mark
+        phase = self.name_2_phase.get(name)
+        if phase is None:
+            phase = PhaseStats()
+            self.name_2_phase[name] = phase
+        self._stack.append(phase)
+        self._wall_mark, self._cpu_mark = wall, cpu
+
+    def stop(self, item_count: int = 0) -> None:
+        """
+        Stops the last started phase, and resumes the phase in which it was started.
+        :param item_count: the number of items to add to the phase
+        :return: None
+        :raise MeritsException: if no phase is running
+        """
+        wall, cpu = time.perf_counter(), time.process_time()
+        if not self._stack:
+            raise MeritsException(
+                'Cannot stop a phase: no phase is running.'
+            )
+        phase = self._stack.pop()
+        phase.wall_seconds += wall - self._wall_mark
+        phase.cpu_seconds += cpu - self._cpu_mark
+        phase.item_count += item_count
+        self._wall_mark, self._cpu_mark = wall, cpu
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Runs the body of a with statement as a phase.
+        :param name:
+        :return:
+        """
+        self.start(name)
+        try:
+            yield
+        finally:
+            self.stop()
+
+    def add(
+            self,
+            name: str,
+            item_count: int = 0,
+            byte_count: int = 0,
+    ) -> None:
+        """
+        Adds counts to a phase, for example the size of the files that it wrote.
+        :param name:
+        :param item_count:
+        :param byte_count:
+        :return: None
+        """
+        phase = self.name_2_phase.setdefault(name, PhaseStats())
+        phase.item_count += item_count
+        phase.byte_count += byte_count
+
+    def timed(
+            self,
+            name: str,
+            function: Callable[..., T],
+    ) -> Callable[..., T]:
+        """
+        Gives a function that runs the given function as a phase, counting one item per call.
+        :param name:
+        :param function:
+        :return:
+        """
+        def timed_function(*args, **kwargs) -> T:
+            self.start(name)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.stop(1)
+
+        return timed_function
+
+    def iter_timed(
+            self,
+            name: str,
+            iterator: Iterator[T],
+    ) -> Iterator[T]:
+        """
+        Gives the items of the iterator, with the time to get each item as a phase, counting one item per item.
+        :param name:
+        :param iterator:
+        :return:
+        """
+        while True:
+            self.start(name)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.stop()
+                return
+            except BaseException:
+                self.stop()
+                raise
+            self.stop(1)
+            yield item
+
+    def merge(self, other: "Profiler") -> None:
+        """
+        Adds the phases of another profiler, for example of a conversion in another process.
+        :param other: a profiler of which no phase is running
+        :return: None
+        """
+        for name, other_phase in other.name_2_phase.items():
+            phase = self.name_2_phase.setdefault(name, PhaseStats())
+            phase.wall_seconds += other_phase.wall_seconds
+            phase.cpu_seconds += other_phase.cpu_seconds
+            phase.item_count += other_phase.item_count
+            phase.byte_count += other_phase.byte_count
+
+    def get_report(self) -> List[str]:
+        """
+        Gives a table with the times and throughput per phase, and the total.
+        :return: the lines of the table
+        """
+        lines = [
+            f'{"phase":24} {"wall s":>9} {"cpu s":>9} {"wall %":>7} {"count":>12} {"per second":>12}'
+            f' {"unit":8} {"MiB/s":>8}'
+        ]
+        total_wall = sum(phase.wall_seconds for phase in self.name_2_phase.values())
+        total_cpu = sum(phase.cpu_seconds for phase in self.name_2_phase.values())
+        for name, phase in self.name_2_phase.items():
+            unit = PHASE_2_UNIT.get(name, "")
+            line = (
+                f'{name:24} {phase.wall_seconds:9.3f} {phase.cpu_seconds:9.3f}'
+                f' {_percentage(phase.wall_seconds, total_wall):>7}'
+            )
+            if unit and phase.item_count:
+                line += f' {phase.item_count:12,} {_rate(phase.item_count, phase.wall_seconds):>12} {unit:8}'
+            else:
+                line += f' {"":12} {"":12} {"":8}'
+            if phase.byte_count:
+                line += f' {_rate(phase.byte_count / (1024 * 1024), phase.wall_seconds, ",.1f"):>8}'
+            lines.append(line.rstrip())
+        lines.append(f'{"total":24} {total_wall:9.3f} {total_cpu:9.3f}')
+        return lines
+
+
+def _percentage(part: float, total: float) -> str:
+    if not total:
+        return ""
+    return f'{100 * part / total:.1f}%'
+
+
+def _rate(amount: float, seconds: float, number_format: str = ",.0f") -> str:
+    if seconds <= 0:
+        return ""
+    return format(amount / seconds, number_format)
+
+
+class ProfiledDataHandler(DataHandler):
+    """
+    Runs the calls to a data handler as PHASE_MAP_TO_CSV, counting the segments.
+    """
+
+    def __init__(
+            self,
+            data_handler: DataHandler,
+            profiler: Profiler,
+    ):
+        self._data_handler = data_handler
+        self._profiler = profiler
+
+    def on_enter_branch(self, branch: DataBranch) -> None:
+        self._profiler.start(PHASE_MAP_TO_CSV)
+        try:
+            self._data_handler.on_enter_branch(branch)
+        finally:
+            self._profiler.stop()
+
+    def on_exit_branch(self, path: str) -> None:
+        self._profiler.start(PHASE_MAP_TO_CSV)
+        try:
+            self._data_handler.on_exit_branch(path)
+        finally:
+            self._profiler.stop()
+
+    def on_enter_leaf(self, leaf: DataLeaf):
+        self._profiler.start(PHASE_MAP_TO_CSV)
+        try:
+            self._data_handler.on_enter_leaf(leaf)
+        finally:
+            self._profiler.stop(1)
+
+    def on_exit_leaf(self, path: str):
+        self._profiler.start(PHASE_MAP_TO_CSV)
+        try:
+            self._data_handler.on_exit_leaf(path)
+        finally:
+            self._profiler.stop()
+
+    def interest(self) -> Optional[Dict[str, Optional[Collection[str]]]]:
+        return self._data_handler.interest()
+
+
+class ProfiledCsvHandler(CsvHandler):
+    """
+    Runs the calls to a CSV handler as PHASE_MAP_TO_EDIFACT, counting the rows.
+    """
+
+    def __init__(
+            self,
+            csv_handler: CsvHandler,
+            profiler: Profiler,
+    ):
+        super().__init__()
+        self._csv_handler = csv_handler
+        self._profiler = profiler
+
+    def handle_begin(self, meta_data: Dict[str, str]):
+        with self._profiler.phase(PHASE_MAP_TO_EDIFACT):
+            self._csv_handler.handle_begin(meta_data)
+
+    def handle_row(self, csv_file_name: str, row: Dict[str, str]):
+        self._profiler.start(PHASE_MAP_TO_EDIFACT)
+        try:
+            self._csv_handler.handle_row(csv_file_name, row)
+        finally:
+            self._profiler.stop(1)
+
+    def handle_row_values(
+            self,
+            csv_file_name: str,
+            values: Sequence[Optional[str]],
+            header_2_index: Dict[str, int],
+    ):
+        self._profiler.start(PHASE_MAP_TO_EDIFACT)
+        try:
+            self._csv_handler.handle_row_values(csv_file_name, values, header_2_index)
+        finally:
+            self._profiler.stop(1)
+
+    def handle_end(self, meta_data: Dict[str, str]):
+        with self._profiler.phase(PHASE_MAP_TO_EDIFACT):
+            self._csv_handler.handle_end(meta_data)
+
+
+class ProfiledRows(Rows):
+    """
+    Runs the reading of rows as PHASE_CSV_READ, counting the popped rows.
+    """
+
+    def __init__(
+            self,
+            rows: Rows,
+            profiler: Profiler,
+    ):
+        super().__init__()
+        self._rows = rows
+        self._profiler = profiler
+
+    def headers(self) -> List[str]:
+        return self._rows.headers()
+
+    def header_2_index(self) -> Dict[str, int]:
+        return self._rows.header_2_index()
+
+    def has_more(self) -> bool:
+        self._profiler.start(PHASE_CSV_READ)
+        try:
+            return self._rows.has_more()
+        finally:
+            self._profiler.stop()
+
+    def peek(self) -> Dict[str, str]:
+        self._profiler.start(PHASE_CSV_READ)
+        try:
+            return self._rows.peek()
+        finally:
+            self._profiler.stop()
+
+    def pop(self) -> Dict[str, str]:
+        self._profiler.start(PHASE_CSV_READ)
+        try:
+            return self._rows.pop()
+        finally:
+            self._profiler.stop(1)
+
+    def peek_values(self) -> Sequence[Optional[str]]:
+        self._profiler.start(PHASE_CSV_READ)
+        try:
+            return self._rows.peek_values()
+        finally:
+            self._profiler.stop()
+
+    def pop_values(self) -> Sequence[Optional[str]]:
+        self._profiler.start(PHASE_CSV_READ)
+        try:
+            return self._rows.pop_values()
+        finally:
+            self._profiler.stop(1)
+
+    def close(self) -> None:
+        self._rows.close()
+
+
+class ProfiledCsvCollector(CsvCollector):
+    """
+    Runs the collecting of rows as PHASE_CSV_SERIALIZE, counting the rows.
+    """
+
+    def __init__(
+            self,
+            csv_collector: CsvCollector,
+            profiler: Profiler,
+    ):
+        super().__init__()
+        self._csv_collector = csv_collector
+        self._profiler = profiler
+
+    def collect(self, csv_file_name: str, row: Dict[str, str]) -> None:
+        self._profiler.start(PHASE_CSV_SERIALIZE)
+        try:
+            self._csv_collector.collect(csv_file_name, row)
+        finally:
+            self._profiler.stop(1)
+
+
+class ProfiledEdifactCollector(EdifactCollector):
+    """
+    Runs the collecting of segments as PHASE_EDIFACT_WRITE, counting the segments.
+    """
+
+    def __init__(
+            self,
+            edifact_collector: EdifactCollector,
+            profiler: Profiler,
+    ):
+        self._edifact_collector = edifact_collector
+        self._profiler = profiler
+
+    def collect(self, edifact_segment: str) -> None:
+        self._profiler.start(PHASE_EDIFACT_WRITE)
+        try:
+            self._edifact_collector.collect(edifact_segment)
+        finally:
+            self._profiler.stop(1)
+
+    def segment_count(self) -> int:
+        return self._edifact_collector.segment_count()
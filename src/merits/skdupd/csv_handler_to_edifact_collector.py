@@ -1,9 +1,11 @@
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 
-from merits.csvs_zip.csv_handler import CsvHandler
+from merits.csvs_zip.csv_handler import CsvHandler, RowObjectFactory
 from merits.edifact.collector import Collector
 from merits.edifact.definition_model import Definition
 from merits.edifact.edifact_writer import EdifactWriter
+from merits.edifact.segment_observer import SegmentObserver
+from merits.profiler import Profiler
 from merits.skdupd.csv_model import Train, Por, Relation, Odi, Meta
 from merits.skdupd.definition import ODI_FILE_NAME, RELATION_FILE_NAME, POR_FILE_NAME, TRAIN_FILE_NAME
 
@@ -18,6 +20,8 @@ class CsvHandlerToEdifactCollector(CsvHandler):
             edifact_collector: Collector,
             definition: Definition,
             prd_for_every_pop: bool = True,
+            profiler: Optional[Profiler] = None,
+            segment_observer: Optional[SegmentObserver] = None,
     ):
         """
 
@@ -25,13 +29,23 @@ class CsvHandlerToEdifactCollector(CsvHandler):
         :param definition:
         :param prd_for_every_pop: iff False a 2_PRD/PRD segment will only be added when the Train.service_number differs
             from the previous Train.service_number.
+        :param profiler: if given, the EdifactWriter is timed as its phases
+        :param segment_observer: if given, it is told about every segment that the EdifactWriter writes
         """
         super().__init__()
 
         self.edifact_collector = edifact_collector
         self.definition = definition
         self.prd_for_every_pop = prd_for_every_pop
-        self._edifact_writer = EdifactWriter(self.definition)
+        self._edifact_writer = EdifactWriter(
+            self.definition,
+            profiler=profiler,
+            segment_observer=segment_observer,
+        )
+        self._train_factory = RowObjectFactory(Train)
+        self._por_factory = RowObjectFactory(Por)
+        self._relation_factory = RowObjectFactory(Relation)
+        self._odi_factory = RowObjectFactory(Odi)
 
         self._last_service_number: Optional[str] = None
         self._por_list: List[Por] = []
@@ -48,10 +62,10 @@ class CsvHandlerToEdifactCollector(CsvHandler):
             data={
                 "initiator": meta.reference,
             },
-            add_defaults_for=[
+            add_defaults_for=(
                 "syntax_identifier",
                 "syntax_version_number",
-            ],
+            ),
         )
         # Add new UIH
         self._write(
@@ -60,20 +74,20 @@ class CsvHandlerToEdifactCollector(CsvHandler):
                 "initiator": meta.reference,
                 "sequence_number": "1",
             },
-            add_defaults_for=[
+            add_defaults_for=(
                 "message_type",
                 "message_version",
                 "message_release",
-            ]
+            )
         )
         # Add new MSD
         self._write(
             path="MSD",
             data={},
-            add_defaults_for=[
+            add_defaults_for=(
                 "business_function_code",
                 "message_function_code",
-            ]
+            )
         )
         # Add new ORG
         self._write(
@@ -92,10 +106,10 @@ class CsvHandlerToEdifactCollector(CsvHandler):
                 "date_1": meta.reference[:-2],
                 "reference_number": meta.reference,
             },
-            add_defaults_for=[
+            add_defaults_for=(
                 "status_description_code",
                 "validity_code",
-            ]
+            )
         )
 
     def handle_row(self, csv_file_name: str, row: Dict[str, str]):
@@ -112,6 +126,20 @@ class CsvHandlerToEdifactCollector(CsvHandler):
             obj = Odi(**row)
             self._handle_odi(obj)
 
+    def handle_row_values(self, csv_file_name: str, values: Sequence[Optional[str]], header_2_index: Dict[str, int]):
+        if csv_file_name == TRAIN_FILE_NAME:
+            obj = self._train_factory.create(values, header_2_index)
+            self._handle_train(obj)
+        elif csv_file_name == POR_FILE_NAME:
+            obj = self._por_factory.create(values, header_2_index)
+            self._handle_por(obj)
+        elif csv_file_name == RELATION_FILE_NAME:
+            obj = self._relation_factory.create(values, header_2_index)
+            self._handle_relation(obj)
+        elif csv_file_name == ODI_FILE_NAME:
+            obj = self._odi_factory.create(values, header_2_index)
+            self._handle_odi(obj)
+
     def handle_end(self, meta_data: Dict[str, str]):
         meta = Meta(**meta_data)
         # Add new UIT
@@ -154,9 +182,9 @@ class CsvHandlerToEdifactCollector(CsvHandler):
                     data={
                         "second_service_number": train.second_service_number,
                     },
-                    add_defaults_for=[
+                    add_defaults_for=(
                         "reference_function_code",
-                    ],
+                    ),
                 )
             self._last_service_number = train.service_number
         # Add new 2_PRD/4_POP/POP
@@ -166,9 +194,9 @@ class CsvHandlerToEdifactCollector(CsvHandler):
                 "first_day_last_day": train.first_day + "/" + train.last_day,
                 "days": train.operation_days,
             },
-            add_defaults_for=[
+            add_defaults_for=(
                 "period_qualifier",
-            ],
+            ),
         )
 
     def _handle_por(self, obj: Por):
@@ -244,9 +272,9 @@ class CsvHandlerToEdifactCollector(CsvHandler):
             data={
                 "service_number": obj.service,
             },
-            add_defaults_for=[
+            add_defaults_for=(
                 "reference_function_code",
-            ],
+            ),
         )
         # Add new 2_PRD/4_POP/7_POR/8_RFR/RLS
         if obj.relation:
@@ -255,9 +283,9 @@ class CsvHandlerToEdifactCollector(CsvHandler):
                 data={
                     "relation": obj.relation,
                 },
-                add_defaults_for=[
+                add_defaults_for=(
                     "relation_type_code",
-                ],
+                ),
             )
         # Add new 2_PRD/4_POP/7_POR/8_RFR/TCE
         if obj.transfer_time or obj.certainty:
@@ -328,7 +356,7 @@ class CsvHandlerToEdifactCollector(CsvHandler):
             self,
             path: str,
             data: Dict[str, str],
-            add_defaults_for: Optional[List[str]] = None,
+            add_defaults_for: Tuple[str, ...] = (),
     ):
         """
         Writes an EDIFACT segment to the collector.
@@ -338,9 +366,10 @@ class CsvHandlerToEdifactCollector(CsvHandler):
         :return:
         """
         self.edifact_collector.collect(
-            self._edifact_writer.to_edifact(
+            self._edifact_writer.to_edifact_values(
                 path=path,
-                data=data,
+                field_names=tuple(data),
+                values=tuple(data.values()),
                 add_defaults_for=add_defaults_for,
             )
         )
@@ -1,15 +1,23 @@
-import dataclasses
-from copy import deepcopy
-from typing import Optional, Callable, Dict, List
+from copy import copy
+from typing import Optional, Callable, Collection, Dict, List
 
-from merits.csvs_zip.collector import Collector
+from merits.csvs_zip.collector import Collector, dataclass_to_row
 from merits.edifact.data_handler import DataHandler
 from merits.edifact.definition_model import Definition, Node
 from merits.edifact.object_model import DataLeaf, DataBranch
+from merits.edifact_row_counter import RowRule
 from merits.exceptions import MeritsException
 from merits.skdupd.csv_model import Train, Por, Relation, Odi, Meta
 from merits.skdupd.definition import META_FILE_NAME, ODI_FILE_NAME, RELATION_FILE_NAME, POR_FILE_NAME, TRAIN_FILE_NAME
 
+PATH_2_ROW_RULE: Dict[str, RowRule] = {
+    "2_PRD/4_POP": RowRule(TRAIN_FILE_NAME),
+    "2_PRD/4_POP/7_POR": RowRule(POR_FILE_NAME),
+    "2_PRD/4_POP/7_POR/8_RFR": RowRule(RELATION_FILE_NAME),
+    "2_PRD/4_POP/9_ODI": RowRule(ODI_FILE_NAME),
+}
+"The groups that create a row with a new ID, see EdifactRowCounter. Keep this in sync with the branch handlers."
+
 
 class DataHandlerToCsvCollector(DataHandler):
     """
@@ -73,6 +81,33 @@ class DataHandlerToCsvCollector(DataHandler):
             "2_PRD/4_POP/9_ODI/10_SER/SER": self._handle_2_4_9_10_ser,
         }
 
+        self._path_2_field_names: Dict[str, List[str]] = {
+            "ORG": ["message_provider"],
+            "HDR": ["validity", "reference_number"],
+            "2_PRD/PRD": [
+                "service_number", "reservation", "tariff", "service_mode", "service_name", "service_provider",
+                "reservation_company",
+            ],
+            "2_PRD/RFR": ["second_service_number"],
+            "2_PRD/4_POP/POP": ["first_day_last_day", "days"],
+            "2_PRD/4_POP/7_POR/POR": [
+                "uic", "arrival", "arrival_offset", "departure", "departure_offset", "arrival_platform",
+                "departure_platform", "location_qualifier",
+            ],
+            "2_PRD/4_POP/7_POR/MES": ["distance", "unit"],
+            "2_PRD/4_POP/7_POR/ASD": ["asd_code", "last_time", "first_time"],
+            "2_PRD/4_POP/7_POR/TRF": ["trf_code"],
+            "2_PRD/4_POP/7_POR/8_RFR/RFR": ["service_number"],
+            "2_PRD/4_POP/7_POR/8_RFR/RLS": ["relation"],
+            "2_PRD/4_POP/7_POR/8_RFR/TCE": ["transfer_time", "certainty"],
+            "2_PRD/4_POP/9_ODI/ODI": ["from_stop_number", "to_stop_number"],
+            "2_PRD/4_POP/9_ODI/PDT": ["reservation", "brand_code", "tariff"],
+            "2_PRD/4_POP/9_ODI/TFF": ["tff_code"],
+            "2_PRD/4_POP/9_ODI/ASD": ["asd_code", "reservation"],
+            "2_PRD/4_POP/9_ODI/10_SER/SER": ["ser_code", "reservation", "units_quantity"],
+        }
+        "The fields read by the leaf handlers, see interest. Keep this in sync with the leaf handlers."
+
         # Check if the paths in self._path_2_branch_handler and self._path_2_leaf_handler are spelled correctly.
         if definition:
             all_paths = []
@@ -153,6 +188,9 @@ class DataHandlerToCsvCollector(DataHandler):
         self._next_relation_id = csv_file_name_2_next_id.get(RELATION_FILE_NAME, self._next_relation_id)
         self._next_odi_id = csv_file_name_2_next_id.get(ODI_FILE_NAME, self._next_odi_id)
 
+    def interest(self) -> Optional[Dict[str, Optional[Collection[str]]]]:
+        return self._path_2_field_names
+
     def on_enter_branch(self, branch: DataBranch) -> None:
         handler = self._path_2_branch_handler.get(branch.path)
         if handler:
@@ -181,14 +219,14 @@ class DataHandlerToCsvCollector(DataHandler):
 
     def _handle_train(self, begin: bool):
         if begin:
-            self._current_train = deepcopy(self._current_train_service)
+            self._current_train = copy(self._current_train_service)
             self._current_train.train_id = self._next_train_id
             self._next_train_id += 1
             self._next_stop_number = 1
         else:
             self._csv_collector.collect(
                 csv_file_name=TRAIN_FILE_NAME,
-                row=dataclasses.asdict(self._current_train),
+                row=dataclass_to_row(self._current_train),
             )
             self._current_train = None
 
@@ -204,7 +242,7 @@ class DataHandlerToCsvCollector(DataHandler):
         else:
             self._csv_collector.collect(
                 csv_file_name=POR_FILE_NAME,
-                row=dataclasses.asdict(self._current_por),
+                row=dataclass_to_row(self._current_por),
             )
             self._current_por = None
 
@@ -219,7 +257,7 @@ class DataHandlerToCsvCollector(DataHandler):
         else:
             self._csv_collector.collect(
                 csv_file_name=RELATION_FILE_NAME,
-                row=dataclasses.asdict(self._current_relation),
+                row=dataclass_to_row(self._current_relation),
             )
             self._current_relation = None
 
@@ -233,7 +271,7 @@ class DataHandlerToCsvCollector(DataHandler):
         else:
             self._csv_collector.collect(
                 csv_file_name=ODI_FILE_NAME,
-                row=dataclasses.asdict(self._current_odi),
+                row=dataclass_to_row(self._current_odi),
             )
             self._current_odi = None
 
@@ -252,7 +290,7 @@ class DataHandlerToCsvCollector(DataHandler):
             obj.reference = leaf.get("reference_number")
             self._csv_collector.collect(
                 csv_file_name=META_FILE_NAME,
-                row=dataclasses.asdict(obj),
+                row=dataclass_to_row(obj),
             )
 
     def _handle_2_prd(self, leaf: DataLeaf, begin: bool):
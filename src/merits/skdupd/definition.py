@@ -14,6 +14,8 @@ POR_FILE_NAME = "SKDUPD_POR.csv"
 TRAIN_FILE_NAME = "SKDUPD_TRAIN.csv"
 CSV_ZIP_FILE_NAME = "SKDUPD.zip"
 "Default zipped CSVs file name."
+PARTITION_PATH = "2_PRD"
+"The top level group at which a message can be split for parallel conversion."
 
 
 def get_csv_hierarchy() -> CsvHierarchy:
@@ -1,13 +1,18 @@
 import dataclasses
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 
 from merits.csvs_zip.collector_in_memory import CollectorInMemory
+from merits.csvs_zip.collector_on_disk import CollectorOnDisk
 from merits.edifact.edifact_reader import EdifactReader
+from merits.edifact.segment_observer import SegmentObserver
+from merits.edifact.segment_source import EdifactSource
+from merits.edifact_row_counter import EdifactRowCounter
 from merits.edifact_to_csvs_base import EdifactToCsvsBase
+from merits.profiler import ProfiledCsvCollector, Profiler
 from merits.skdupd import definition
 from merits.skdupd.definition import META_FILE_NAME, ODI_FILE_NAME, RELATION_FILE_NAME, POR_FILE_NAME, TRAIN_FILE_NAME
 from merits.skdupd.csv_model import Train, Por, Relation, Odi, Meta
-from merits.skdupd.data_handler_to_csv_collector import DataHandlerToCsvCollector
+from merits.skdupd.data_handler_to_csv_collector import DataHandlerToCsvCollector, PATH_2_ROW_RULE
 
 
 class EdifactToCsvs(EdifactToCsvsBase):
@@ -17,40 +22,78 @@ class EdifactToCsvs(EdifactToCsvsBase):
 
     def __init__(
             self,
+            csv_collector: Optional[Union[CollectorInMemory, CollectorOnDisk]] = None,
+            profiler: Optional[Profiler] = None,
+            segment_observer: Optional[SegmentObserver] = None,
     ):
+        """
+
+        :param csv_collector: the collector to give the rows to. By default, the rows are collected in memory. A
+            collector must have the file names and field names of get_csv_file_name_2_field_names
+        :param profiler: if given, the phases of the conversion are timed, see Profiler
+        :param segment_observer: if given, it is told about every segment that is parsed, see SegmentStats
+        """
         self._definition = definition.edifact_definition
-        self._csv_collector = CollectorInMemory(
-            csv_file_name_2_field_names={
-                TRAIN_FILE_NAME: [
-                    field.name
-                    for field in dataclasses.fields(Train)
-                ],
-                POR_FILE_NAME: [
-                    field.name
-                    for field in dataclasses.fields(Por)
-                ],
-                RELATION_FILE_NAME: [
-                    field.name
-                    for field in dataclasses.fields(Relation)
-                ],
-                ODI_FILE_NAME: [
-                    field.name
-                    for field in dataclasses.fields(Odi)
-                ],
-                META_FILE_NAME: [
-                    field.name
-                    for field in dataclasses.fields(Meta)
-                ],
-            },
-        )
+        if csv_collector is None:
+            csv_collector = CollectorInMemory(
+                csv_file_name_2_field_names=self.get_csv_file_name_2_field_names(),
+            )
+        self._csv_collector = csv_collector
+        if profiler:
+            csv_collector = ProfiledCsvCollector(csv_collector=csv_collector, profiler=profiler)
         self._data_handler = DataHandlerToCsvCollector(
-            csv_collector=self._csv_collector,
+            csv_collector=csv_collector,
             definition=self._definition,
         )
         self._edifact_reader = EdifactReader(
             definition=self._definition,
+            profiler=profiler,
+            segment_observer=segment_observer,
         )
 
+    @staticmethod
+    def get_csv_file_name_2_field_names() -> Dict[str, List[str]]:
+        """
+        Gives the field names of the CSV files in the order in which the files are written.
+        :return:
+        """
+        return {
+            TRAIN_FILE_NAME: [
+                field.name
+                for field in dataclasses.fields(Train)
+            ],
+            POR_FILE_NAME: [
+                field.name
+                for field in dataclasses.fields(Por)
+            ],
+            RELATION_FILE_NAME: [
+                field.name
+                for field in dataclasses.fields(Relation)
+            ],
+            ODI_FILE_NAME: [
+                field.name
+                for field in dataclasses.fields(Odi)
+            ],
+            META_FILE_NAME: [
+                field.name
+                for field in dataclasses.fields(Meta)
+            ],
+        }
+
+    @staticmethod
+    def count_csv_rows(edifact_segments: EdifactSource) -> Dict[str, int]:
+        """
+        Counts the rows that a conversion of the segments would create, without converting, see EdifactRowCounter.
+        Since the row ID's count on by one per row, this gives the ID's of a conversion in advance.
+        :param edifact_segments: the segments or a file path or stream
+        :return: the number of rows per CSV file with ID's, so without the meta file
+        """
+        row_counter = EdifactRowCounter(
+            definition=definition.edifact_definition,
+            path_2_row_rule=PATH_2_ROW_RULE,
+        )
+        return row_counter.count(segments=edifact_segments)
+
     def get_csv_file_name_2_next_id(self) -> Dict[str, int]:
         return self._data_handler.get_csv_file_name_2_next_id()
 
@@ -59,18 +102,24 @@ class EdifactToCsvs(EdifactToCsvsBase):
 
     def load(
             self,
-            edifact_segments: List[str],
+            edifact_segments: EdifactSource,
+            is_complete: bool = True,
     ):
         """
         Reads and converts the edifact segments to CSV format.
-        :param edifact_segments:
+        :param edifact_segments: the segments or a file path or stream. Files and streams are read lazily.
+        :param is_complete: False if the segments are only the first part of a message, see EdifactReader.read
         :return:
         """
         self._edifact_reader.read(
             segments=edifact_segments,
             data_handler=self._data_handler,
+            is_complete=is_complete,
         )
 
+    def get_csv_collector(self) -> Union[CollectorInMemory, CollectorOnDisk]:
+        return self._csv_collector
+
     def get_csvs(self) -> Dict[str, str]:
         """
         Gives the loaded CSV files as a dict from file name to file content.
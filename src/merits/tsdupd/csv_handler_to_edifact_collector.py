@@ -1,9 +1,11 @@
-from typing import Dict, List, Optional
+from typing import Dict, Optional, Sequence, Tuple
 
-from merits.csvs_zip.csv_handler import CsvHandler
+from merits.csvs_zip.csv_handler import CsvHandler, RowObjectFactory
 from merits.edifact.collector import Collector
 from merits.edifact.definition_model import Definition
 from merits.edifact.edifact_writer import EdifactWriter
+from merits.edifact.segment_observer import SegmentObserver
+from merits.profiler import Profiler
 from merits.exceptions import MeritsException
 from merits.tsdupd.csv_model import Stop, Synonym, Mct, Footpath, Meta
 from merits.tsdupd.definition import (
@@ -20,17 +22,29 @@ class CsvHandlerToEdifactCollector(CsvHandler):
             self,
             edifact_collector: Collector,
             definition: Definition,
+            profiler: Optional[Profiler] = None,
+            segment_observer: Optional[SegmentObserver] = None,
     ):
         """
 
         :param edifact_collector:
         :param definition:
+        :param profiler: if given, the EdifactWriter is timed as its phases
+        :param segment_observer: if given, it is told about every segment that the EdifactWriter writes
         """
         super().__init__()
 
         self.edifact_collector = edifact_collector
         self.definition = definition
-        self._edifact_writer = EdifactWriter(self.definition)
+        self._edifact_writer = EdifactWriter(
+            self.definition,
+            profiler=profiler,
+            segment_observer=segment_observer,
+        )
+        self._stop_factory = RowObjectFactory(Stop)
+        self._synonym_factory = RowObjectFactory(Synonym)
+        self._mct_factory = RowObjectFactory(Mct)
+        self._footpath_factory = RowObjectFactory(Footpath)
 
         self._current_stop: Optional[Stop] = None
         """
@@ -46,10 +60,10 @@ class CsvHandlerToEdifactCollector(CsvHandler):
             data={
                 "initiator": meta.reference,
             },
-            add_defaults_for=[
+            add_defaults_for=(
                 "syntax_identifier",
                 "syntax_version_number",
-            ],
+            ),
         )
         # Add new UIH
         self._write(
@@ -58,20 +72,20 @@ class CsvHandlerToEdifactCollector(CsvHandler):
                 "initiator": meta.reference,
                 "sequence_number": "1",
             },
-            add_defaults_for=[
+            add_defaults_for=(
                 "message_type",
                 "message_version",
                 "message_release",
-            ]
+            )
         )
         # Add new MSD
         self._write(
             path="MSD",
             data={},
-            add_defaults_for=[
+            add_defaults_for=(
                 "business_function_code",
                 "message_function_code",
-            ]
+            )
         )
         # Add new ORG
         self._write(
@@ -94,10 +108,10 @@ class CsvHandlerToEdifactCollector(CsvHandler):
                 "date_1": meta.reference[:-2],
                 "reference_number": meta.reference,
             },
-            add_defaults_for=[
+            add_defaults_for=(
                 "status_description_code",
                 "validity_code",
-            ]
+            )
         )
 
     def handle_row(self, csv_file_name: str, row: Dict[str, str]):
@@ -118,6 +132,24 @@ class CsvHandlerToEdifactCollector(CsvHandler):
                 f'Unknown csv_file_name: "{csv_file_name}".'
             )
 
+    def handle_row_values(self, csv_file_name: str, values: Sequence[Optional[str]], header_2_index: Dict[str, int]):
+        if csv_file_name == STOP_FILE_NAME:
+            obj = self._stop_factory.create(values, header_2_index)
+            self._handle_stop(obj)
+        elif csv_file_name == SYNONYM_FILE_NAME:
+            obj = self._synonym_factory.create(values, header_2_index)
+            self._handle_synonym(obj)
+        elif csv_file_name == MCT_FILE_NAME:
+            obj = self._mct_factory.create(values, header_2_index)
+            self._handle_mct(obj)
+        elif csv_file_name == FOOTPATH_FILE_NAME:
+            obj = self._footpath_factory.create(values, header_2_index)
+            self._handle_footpath(obj)
+        else:
+            raise MeritsException(
+                f'Unknown csv_file_name: "{csv_file_name}".'
+            )
+
     def handle_end(self, meta_data: Dict[str, str]):
         self._handle_stop_end()
         meta = Meta(**meta_data)
@@ -305,7 +337,7 @@ class CsvHandlerToEdifactCollector(CsvHandler):
             self,
             path: str,
             data: Dict[str, str],
-            add_defaults_for: Optional[List[str]] = None,
+            add_defaults_for: Tuple[str, ...] = (),
     ):
         """
         Writes an EDIFACT segment to the collector.
@@ -315,9 +347,10 @@ class CsvHandlerToEdifactCollector(CsvHandler):
         :return:
         """
         self.edifact_collector.collect(
-            self._edifact_writer.to_edifact(
+            self._edifact_writer.to_edifact_values(
                 path=path,
-                data=data,
+                field_names=tuple(data),
+                values=tuple(data.values()),
                 add_defaults_for=add_defaults_for,
             )
         )
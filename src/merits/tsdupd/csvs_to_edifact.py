@@ -1,9 +1,14 @@
-from typing import Dict
+from typing import Dict, Optional
 
 from merits.csvs_to_edifact_base import CsvsToEdifactBase
+from merits.csvs_zip.csv_index_reader import CsvIndexReader
 from merits.csvs_zip.csv_reader import CsvReader
 from merits.csvs_zip.rows import Rows
+from merits.edifact.collector import Collector
 from merits.edifact.collector_in_memory import CollectorInMemory
+from merits.edifact.segment_observer import SegmentObserver
+from merits.exceptions import MeritsException
+from merits.profiler import ProfiledEdifactCollector, Profiler
 from merits.tsdupd import definition
 from merits.tsdupd.csv_handler_to_edifact_collector import CsvHandlerToEdifactCollector
 
@@ -13,17 +18,49 @@ class CsvsToEdifact(CsvsToEdifactBase):
     This class is a high level entry point for a conversion from CSVs to TSDUPD EDIFACT.
     """
 
-    def __init__(self):
+    def __init__(
+            self,
+            edifact_collector: Optional[Collector] = None,
+            unsorted_csvs: bool = False,
+            profiler: Optional[Profiler] = None,
+            segment_observer: Optional[SegmentObserver] = None,
+    ):
+        """
+
+        :param edifact_collector: receives the EDIFACT segments. If None, a CollectorInMemory is used, which is needed
+            for the get method. Use for example a CollectorToFile to write large results without keeping them in memory.
+        :param unsorted_csvs: True if the rows of child tables may not be grouped by parent ID. Then the child tables
+            are indexed in memory first, see CsvIndexReader.
+        :param profiler: if given, the phases of the conversion are timed, see Profiler
+        :param segment_observer: if given, it is told about every segment that is written, see SegmentStats
+        """
         self._csv_definition = definition.get_csv_hierarchy()
         self._edifact_definition = definition.edifact_definition
-        self._edifact_collector = CollectorInMemory()
-        self._csv_handler = CsvHandlerToEdifactCollector(
-            edifact_collector=self._edifact_collector,
+        if edifact_collector is None:
+            edifact_collector = CollectorInMemory()
+        self._edifact_collector = edifact_collector
+        self._unsorted_csvs = unsorted_csvs
+        self._profiler = profiler
+        self._segment_observer = segment_observer
+        self._csv_reader = self._create_csv_reader(edifact_collector)
+
+    def _create_csv_reader(
+            self,
+            edifact_collector: Collector,
+    ) -> CsvReader:
+        if self._profiler:
+            edifact_collector = ProfiledEdifactCollector(edifact_collector=edifact_collector, profiler=self._profiler)
+        csv_handler = CsvHandlerToEdifactCollector(
+            edifact_collector=edifact_collector,
             definition=self._edifact_definition,
+            profiler=self._profiler,
+            segment_observer=self._segment_observer,
         )
-        self._csv_reader = CsvReader(
+        csv_reader_class = CsvIndexReader if self._unsorted_csvs else CsvReader
+        return csv_reader_class(
             csv_hierarchy=self._csv_definition,
-            csv_handler=self._csv_handler,
+            csv_handler=csv_handler,
+            profiler=self._profiler,
         )
 
     def load(
@@ -33,4 +70,12 @@ class CsvsToEdifact(CsvsToEdifactBase):
         self._csv_reader.read(csv_file_name_2_rows)
 
     def get(self) -> str:
+        if not isinstance(self._edifact_collector, CollectorInMemory):
+            raise MeritsException(
+                f'The EDIFACT is only available as a string when it is collected in memory'
+                f', not with a {type(self._edifact_collector).__name__}.'
+            )
         return self._edifact_collector.get()
+
+    def get_edifact_collector(self) -> Collector:
+        return self._edifact_collector
@@ -1,16 +1,27 @@
-import dataclasses
-from typing import Optional, Callable, Dict, List
+from typing import Optional, Callable, Collection, Dict, List
 
-from merits.csvs_zip.collector import Collector
+from merits.csvs_zip.collector import Collector, dataclass_to_row
 from merits.edifact.data_handler import DataHandler
 from merits.edifact.definition_model import Definition, Node
 from merits.edifact.object_model import DataLeaf, DataBranch
+from merits.edifact_row_counter import RowRule
 from merits.exceptions import MeritsException
 from merits.tsdupd.csv_model import Stop, Synonym, Mct, Footpath, Meta
 from merits.tsdupd.definition import (
     META_FILE_NAME, STOP_FILE_NAME, SYNONYM_FILE_NAME, MCT_FILE_NAME, FOOTPATH_FILE_NAME,
 )
 
+PATH_2_ROW_RULE: Dict[str, RowRule] = {
+    "2_ALS": RowRule(STOP_FILE_NAME),
+    "2_ALS/4_PRD": RowRule(MCT_FILE_NAME),
+    "2_ALS/IFT": RowRule(SYNONYM_FILE_NAME, field_name="text_subject_code", field_value="AGW"),
+    "2_ALS/5_RFR/RFR": RowRule(FOOTPATH_FILE_NAME, field_name="reference_function_code", field_value="AWN"),
+}
+"""
+The groups and segments that create a row with a new ID, see EdifactRowCounter. Keep this in sync with the branch and
+leaf handlers.
+"""
+
 
 class DataHandlerToCsvCollector(DataHandler):
     """
@@ -67,6 +78,27 @@ class DataHandlerToCsvCollector(DataHandler):
             "2_ALS/5_RFR/6_PRD/SER": self._handle_2_5_6_ser,
         }
 
+        self._path_2_field_names: Dict[str, List[str]] = {
+            "ORG": ["message_provider"],
+            "HDR": ["validity", "reference_number"],
+            "2_ALS/ALS": ["location_function_code", "uic_code", "location_name", "latitude", "longitude"],
+            "2_ALS/POP": ["period_qualifier", "first_day_last_day"],
+            "2_ALS/CNY": ["country_code"],
+            "2_ALS/TIZ": ["time_zone", "time_variation"],
+            "2_ALS/IFT": ["text_subject_code", "language_code", "location_name"],
+            "2_ALS/4_PRD/PRD": [
+                "service_mode_or_brand_1", "service_mode_or_brand_2", "mct", "service_provider_1", "service_provider_2",
+            ],
+            "2_ALS/5_RFR/RFR": ["reference_function_code", "uic_code"],
+            "2_ALS/5_RFR/MES": ["transfer_time", "unit"],
+            "2_ALS/5_RFR/RLS": ["relation_type_code", "relation"],
+            "2_ALS/5_RFR/6_PRD/PRD": [
+                "service_mode_or_brand_1", "service_mode_or_brand_2", "service_provider_1", "service_provider_2",
+            ],
+            "2_ALS/5_RFR/6_PRD/SER": ["ser_code"],
+        }
+        "The fields read by the leaf handlers, see interest. Keep this in sync with the leaf handlers."
+
         # Check if the paths in self._path_2_branch_handler and self._path_2_leaf_handler are spelled correctly.
         if definition:
             all_paths = []
@@ -147,6 +179,9 @@ class DataHandlerToCsvCollector(DataHandler):
         self._next_mct_id = csv_file_name_2_next_id.get(MCT_FILE_NAME, self._next_mct_id)
         self._next_footpath_id = csv_file_name_2_next_id.get(FOOTPATH_FILE_NAME, self._next_footpath_id)
 
+    def interest(self) -> Optional[Dict[str, Optional[Collection[str]]]]:
+        return self._path_2_field_names
+
     def on_enter_branch(self, branch: DataBranch) -> None:
         handler = self._path_2_branch_handler.get(branch.path)
         if handler:
@@ -174,7 +209,7 @@ class DataHandlerToCsvCollector(DataHandler):
         else:
             self._csv_collector.collect(
                 csv_file_name=STOP_FILE_NAME,
-                row=dataclasses.asdict(self._current_stop),
+                row=dataclass_to_row(self._current_stop),
             )
             self._current_stop = None
 
@@ -188,7 +223,7 @@ class DataHandlerToCsvCollector(DataHandler):
         else:
             self._csv_collector.collect(
                 csv_file_name=MCT_FILE_NAME,
-                row=dataclasses.asdict(self._current_mct),
+                row=dataclass_to_row(self._current_mct),
             )
             self._current_mct = None
 
@@ -200,7 +235,7 @@ class DataHandlerToCsvCollector(DataHandler):
             if self._current_footpath is not None:
                 self._csv_collector.collect(
                     csv_file_name=FOOTPATH_FILE_NAME,
-                    row=dataclasses.asdict(self._current_footpath),
+                    row=dataclass_to_row(self._current_footpath),
                 )
                 self._current_footpath = None
 
@@ -219,7 +254,7 @@ class DataHandlerToCsvCollector(DataHandler):
             obj.reference = leaf.get("reference_number")
             self._csv_collector.collect(
                 csv_file_name=META_FILE_NAME,
-                row=dataclasses.asdict(obj),
+                row=dataclass_to_row(obj),
             )
 
     def _handle_2_als(self, leaf: DataLeaf, begin: bool):
@@ -272,7 +307,7 @@ class DataHandlerToCsvCollector(DataHandler):
                 obj.synonym = leaf.get("location_name")
                 self._csv_collector.collect(
                     SYNONYM_FILE_NAME,
-                    dataclasses.asdict(self._current_synonym),
+                    dataclass_to_row(self._current_synonym),
                 )
                 self._current_synonym = None
             elif code == "X02":
@@ -12,6 +12,8 @@ MCT_FILE_NAME = "TSDUPD_MCT.csv"
 FOOTPATH_FILE_NAME = "TSDUPD_FOOTPATH.csv"
 CSV_ZIP_FILE_NAME = "TSDUPD.zip"
 "Default zipped CSVs file name."
+PARTITION_PATH = "2_ALS"
+"The top level group at which a message can be split for parallel conversion."
 
 
 def get_csv_hierarchy() -> CsvHierarchy:
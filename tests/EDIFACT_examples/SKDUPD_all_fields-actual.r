@@ -0,0 +1,53 @@
+UIB+UNOB:4+2022-07-26T112758'
+UIH+SKDUPD:D:04A+1+2022-07-26T112758'
+MSD+AAR:61'
+ORG+0000+++0000'
+HDR+81+273:2021-01-01/2021-12-12*45:2022-07-26T1127+2022-07-26T112758'
+PRD+3:11:1:3:::ALPHA TANGO+0060**80'
+RFR+AVI:33'
+POP+273:2021-08-23/2021-08-28::101111'
+POR+006070001+*0503+*1+5'
+ASD+7'
+ASD+44::0453'
+TRF+1'
+POR+006070013+0445:::1*0400:::1+3*3+17'
+MES+190:KMT'
+ASD+9'
+ASD+44::0330'
+ASD+45:0505'
+TRF+4'
+RFR+AUE:02'
+RLS+13+8'
+RFR+AUE:03'
+RLS+13+11'
+RFR+AUE:45'
+RLS+13+7'
+TCE+10+1'
+RFR+AUE:60'
+RLS+13+7'
+TCE+30+X02'
+RFR+AUE:75'
+RLS+13+7'
+TCE++X04'
+POR+006070016+0500'
+MES+200:KMT'
+ASD+45:0540'
+POR+005514449+2347:::1*0017:::1'
+ODI+006070001*006070013+1*2'
+PDT++:::84'
+ODI+006070013*006070016+2*3'
+PDT++:::58'
+ODI+006070001*006070016+1*3'
+ASD+30'
+ODI+006070001*006070016+1*3'
+ASD+46'
+ODI+006070001*006070016+1*3'
+ASD+5'
+ODI+006070001*006070016+1*3'
+SER+26'
+ODI+006070001*006070016+1*3'
+SER+4:::13++2'
+ODI+006070001*006070016+1*3'
+SER+5:::12++1'
+UIT+1+51'
+UIZ+2022-07-26T112758+1'
@@ -0,0 +1,53 @@
+UIB+UNOB:4+2022-03-24T112355'
+UIH+TSDUPD:D:04A+1+2022-03-24T112355'
+MSD+AAR:61'
+ORG+0000+++0000'
+HDR+81+273:2022-01-01*45:2022-03-24T1123+2022-03-24T112355'
+ALS+29+007300101:Piraeus?? ?+ ?: ?* ?'+375656N+233833E'
+POP+273:2021-08-12/2999-12-31'
+POP+87:0005'
+CNY+GR'
+TIZ+EET:2'
+IFT+X02+Piraeus'
+IFT+AGW+Pir_general'
+IFT+AGW::::FR+Pir_French'
+IFT+AGW::::IT+Pir_Italian'
+PRD+::::54::0008'
+PRD+::::::0006+*1073'
+PRD+:::53:::0007'
+PRD+::::::0005+1073'
+PRD+:::68:84::0009+1073*1180'
+RFR+X01:007300101'
+RFR+AWN:007350001'
+MES+8:MIN'
+RLS+13+6'
+PRD+:::53:54+1186*X292'
+SER+21'
+RFR+AWN:007350001'
+RLS+13+14'
+ALS+29+005102443:BIELSK PODLASKI+524541N+231117E'
+POP+273:2022-07-29/2999-12-31'
+POP+87:0004'
+CNY+PL'
+TIZ+CET:1'
+IFT+X02+BIELSK'
+PRD+::::::0005+1151*1151'
+RFR+X01:5101101'
+ALS+29+005107840:SUCHA BESKIDZKA+494426N+193450E'
+POP+273:2020-12-03/2999-12-31'
+POP+87:0002'
+CNY+PL'
+TIZ+CET:1'
+IFT+X02+SUCHA'
+PRD+::::::0005+1151*1151'
+PRD+::::::0005+1151*1251'
+PRD+::::::0005+1251*1151'
+PRD+::::::0005+1251*1251'
+RFR+X01:005100183'
+ALS+29+008734657:MONTCHEVRIER "LA MESSILLE"'
+POP+273:2014-05-07/2999-12-31'
+CNY+FR'
+TIZ+CET:1'
+IFT+X02+MONTCHEVRIER'
+UIT+1+51'
+UIZ+2022-03-24T112355+1'
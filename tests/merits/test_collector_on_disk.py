@@ -0,0 +1,58 @@
+import io
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from zipfile import ZipFile
+
+from . import test_data_helper
+from merits.csvs_zip.collector_on_disk import CollectorOnDisk
+from merits.skdupd.edifact_to_csvs import EdifactToCsvs as SkdupdEdifactToCsvs
+
+
+class TestCollectorOnDisk(TestCase):
+
+    def test_to_csvs_and_zip(self):
+        edifact = test_data_helper.load_txt(test_data_helper.SKDUPD_ALL_FIELDS_FILE)
+        edifact_lines = edifact.splitlines(keepends=False)
+        in_memory = SkdupdEdifactToCsvs()
+        in_memory.load(edifact_segments=edifact_lines)
+        expected = in_memory.get_csvs()
+
+        csv_collector = CollectorOnDisk(
+            csv_file_name_2_field_names=SkdupdEdifactToCsvs.get_csv_file_name_2_field_names(),
+        )
+        try:
+            obj = SkdupdEdifactToCsvs(csv_collector=csv_collector)
+            obj.load(edifact_segments=edifact_lines)
+            self.assertEqual(expected, obj.get_csvs())
+            with ZipFile(io.BytesIO(obj.get_zip())) as actual_zip, ZipFile(io.BytesIO(in_memory.get_zip())) as zf:
+                self.assertEqual(zf.namelist(), actual_zip.namelist())
+                for name in zf.namelist():
+                    self.assertEqual(zf.read(name), actual_zip.read(name), name)
+            directory = csv_collector.directory
+        finally:
+            csv_collector.cleanup()
+        self.assertFalse(directory.exists(), "The temporary directory should be removed.")
+
+    def test_directory(self):
+        field_names = SkdupdEdifactToCsvs.get_csv_file_name_2_field_names()
+        with tempfile.TemporaryDirectory() as directory:
+            csv_collector = CollectorOnDisk(
+                csv_file_name_2_field_names=field_names,
+                directory=Path(directory),
+            )
+            obj = SkdupdEdifactToCsvs(csv_collector=csv_collector)
+            obj.load(edifact_segments=test_data_helper.SKDUPD_ALL_FIELDS_FILE)
+            csv_collector.close()
+            self.assertEqual(
+                sorted(field_names),
+                sorted(file.name for file in Path(directory).iterdir()),
+            )
+            for file, expected_file in (
+                    ("SKDUPD_TRAIN.csv", test_data_helper.SKDUPD_ALL_FIELDS_TRAIN_FILE),
+                    ("SKDUPD_POR.csv", test_data_helper.SKDUPD_ALL_FIELDS_POR_FILE),
+            ):
+                self.assertEqual(
+                    test_data_helper.load_txt(expected_file),
+                    test_data_helper.load_txt(Path(directory) / file),
+                )
@@ -0,0 +1,29 @@
+from unittest import TestCase
+
+from merits.edifact.compiled_definition import CompiledDefinition
+from merits.edifact.edifact_reader import EdifactReader
+from merits.edifact.edifact_writer import EdifactWriter
+from merits.skdupd import definition as skdupd_definition
+from merits.tsdupd import definition as tsdupd_definition
+
+
+class TestCompiledDefinition(TestCase):
+
+    def test_get(self):
+        compiled = CompiledDefinition.get(skdupd_definition.edifact_definition)
+        self.assertIs(compiled, CompiledDefinition.get(skdupd_definition.edifact_definition))
+        self.assertIsNot(compiled, CompiledDefinition.get(tsdupd_definition.edifact_definition))
+        self.assertIs(skdupd_definition.edifact_definition.config, compiled.path_2_segment_format["UIB"].config)
+        self.assertEqual(set(compiled.path_2_segment_format), set(compiled.path_2_state))
+
+        writer_1 = EdifactWriter(skdupd_definition.edifact_definition)
+        writer_2 = EdifactWriter(skdupd_definition.edifact_definition)
+        reader = EdifactReader(skdupd_definition.edifact_definition)
+        self.assertIs(writer_1._path_2_segment_format, writer_2._path_2_segment_format)
+        self.assertIs(compiled.path_2_segment_format, writer_1._path_2_segment_format)
+
+        # The state machines share the states, but not the current state.
+        self.assertIs(writer_1._state_machine.begin_state, reader._state_machine.begin_state)
+        writer_1._state_machine.handle("UIB")
+        self.assertEqual("UIB", writer_1._state_machine.state.path)
+        self.assertIs(writer_2._state_machine.begin_state, writer_2._state_machine.state)
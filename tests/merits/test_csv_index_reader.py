@@ -0,0 +1,75 @@
+import csv
+import io
+from typing import Dict, Optional
+from unittest import TestCase
+
+from .test_edifact_to_csvs_parallel import get_skdupd_segments
+from merits.csvs_zip import config
+from merits.exceptions import MeritsException
+from merits.skdupd.csvs_to_edifact import CsvsToEdifact
+from merits.skdupd.definition import POR_FILE_NAME, get_csv_hierarchy
+from merits.skdupd.edifact_to_csvs import EdifactToCsvs
+
+
+def reverse_parents(csv_content: str, parent_id_name: str, extra_row: Optional[Dict[str, str]] = None) -> str:
+    """
+    Gives the CSV content with the parents in reversed order. Rows with the same parent keep their order.
+    """
+    reader = csv.DictReader(io.StringIO(csv_content), **config.get_csv_dict_reader_kwargs())
+    rows = sorted(reader, key=lambda row: int(row[parent_id_name]), reverse=True)
+    if extra_row:
+        rows.insert(1, extra_row)
+    f = io.StringIO()
+    writer = csv.DictWriter(f, fieldnames=reader.fieldnames, **config.get_csv_dict_writer_kwargs())
+    writer.writeheader()
+    writer.writerows(rows)
+    return f.getvalue()
+
+
+class TestCsvIndexReader(TestCase):
+
+    def test_unsorted(self):
+        segments = get_skdupd_segments(group_count=10)
+        edifact_to_csvs = EdifactToCsvs()
+        edifact_to_csvs.load(edifact_segments=segments)
+        csv_file_name_2_content = edifact_to_csvs.get_csvs()
+        csvs_to_edifact = CsvsToEdifact()
+        csvs_to_edifact.load_csvs(csv_file_name_2_content=csv_file_name_2_content)
+        expected = csvs_to_edifact.get()
+
+        csv_hierarchy = get_csv_hierarchy()
+        for csv_file_name, table in csv_hierarchy.csv_file_name_2_table.items():
+            if table.parent:
+                csv_file_name_2_content[csv_file_name] = reverse_parents(
+                    csv_file_name_2_content[csv_file_name],
+                    table.parent.id_name,
+                )
+
+        obj = CsvsToEdifact()
+        try:
+            obj.load_csvs(csv_file_name_2_content=csv_file_name_2_content)
+            actual = obj.get()
+        except (IndexError, MeritsException):
+            actual = None
+        self.assertNotEqual(expected, actual, "Expected that the sorted reader needs sorted input.")
+
+        obj = CsvsToEdifact(unsorted_csvs=True)
+        obj.load_csvs(csv_file_name_2_content=csv_file_name_2_content)
+        self.assertEqual(expected, obj.get())
+
+    def test_parent_not_found(self):
+        edifact_to_csvs = EdifactToCsvs()
+        edifact_to_csvs.load(edifact_segments=get_skdupd_segments(group_count=3))
+        csv_file_name_2_content = edifact_to_csvs.get_csvs()
+        table = get_csv_hierarchy().csv_file_name_2_table[POR_FILE_NAME]
+        extra_row = {field_name: "" for field_name in table.field_name_list}
+        extra_row.update({table.id_name: "999999", table.parent.id_name: "888888"})
+        csv_file_name_2_content[POR_FILE_NAME] = reverse_parents(
+            csv_file_name_2_content[POR_FILE_NAME],
+            table.parent.id_name,
+            extra_row,
+        )
+
+        obj = CsvsToEdifact(unsorted_csvs=True)
+        with self.assertRaisesRegex(MeritsException, rf"Found 1 rows in {POR_FILE_NAME} .*\['888888'\]"):
+            obj.load_csvs(csv_file_name_2_content=csv_file_name_2_content)
@@ -0,0 +1,153 @@
+import csv
+import io
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+from unittest import TestCase
+
+from . import test_data_helper
+from .test_csv_index_reader import reverse_parents
+from .test_edifact_to_csvs_parallel import get_skdupd_segments
+from merits.csvs_zip import config
+from merits.csvs_zip.csv_sorter import DEFAULT_MEMORY_BUDGET, CsvSorter, get_id_key
+from merits.csvs_zip.rows import RowsFactory
+from merits.exceptions import MeritsException
+from merits.skdupd.csvs_to_edifact import CsvsToEdifact
+from merits.skdupd.definition import (
+    META_FILE_NAME, ODI_FILE_NAME, POR_FILE_NAME, RELATION_FILE_NAME, TRAIN_FILE_NAME, get_csv_hierarchy,
+)
+from merits.skdupd.edifact_to_csvs import EdifactToCsvs
+
+
+def change_rows(csv_content: str, change: Callable[[List[Dict[str, str]]], List[Dict[str, str]]]) -> str:
+    """
+    Gives the CSV content with the rows changed by a function.
+    """
+    reader = csv.DictReader(io.StringIO(csv_content), **config.get_csv_dict_reader_kwargs())
+    rows = change(list(reader))
+    f = io.StringIO()
+    writer = csv.DictWriter(f, fieldnames=reader.fieldnames, **config.get_csv_dict_writer_kwargs())
+    writer.writeheader()
+    writer.writerows(rows)
+    return f.getvalue()
+
+
+def sort_and_convert(
+        csv_file_name_2_content: Dict[str, str],
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
+) -> Tuple[str, List[str]]:
+    """
+    Gives the EDIFACT of the sorted CSVs, and the names of the run files of the sorted tables.
+    """
+    csv_sorter = CsvSorter(csv_hierarchy=get_csv_hierarchy(), memory_budget=memory_budget)
+    csv_file_name_2_rows = {
+        csv_file_name: RowsFactory.from_string(content, pre_load=False)
+        for csv_file_name, content in csv_file_name_2_content.items()
+    }
+    run_file_names = []
+    try:
+        sorted_rows = csv_sorter.sort(csv_file_name_2_rows)
+        if csv_sorter.get_run_count():
+            run_file_names = sorted(path.name for path in Path(csv_sorter._run_directory.name).iterdir())
+        obj = CsvsToEdifact()
+        try:
+            obj.load(sorted_rows)
+        finally:
+            RowsFactory.close(sorted_rows)
+    finally:
+        csv_sorter.cleanup()
+    return obj.get(), run_file_names
+
+
+class TestCsvSorter(TestCase):
+
+    def test_get_id_key(self):
+        self.assertEqual(["1", "2", "10", "a"], sorted(["a", "10", "2", "1"], key=get_id_key))
+
+    def test_sort(self):
+        edifact_to_csvs = EdifactToCsvs()
+        edifact_to_csvs.load(edifact_segments=get_skdupd_segments(group_count=10))
+        csv_file_name_2_content = edifact_to_csvs.get_csvs()
+        csvs_to_edifact = CsvsToEdifact()
+        csvs_to_edifact.load_csvs(csv_file_name_2_content=csv_file_name_2_content)
+        expected = csvs_to_edifact.get()
+
+        csv_hierarchy = get_csv_hierarchy()
+        for csv_file_name, table in csv_hierarchy.csv_file_name_2_table.items():
+            csv_file_name_2_content[csv_file_name] = reverse_parents(
+                csv_file_name_2_content[csv_file_name],
+                table.parent.id_name if table.parent else table.id_name,
+            )
+
+        for memory_budget, expect_runs in ((1000, True), (10_000_000, False)):
+            csv_sorter = CsvSorter(csv_hierarchy=csv_hierarchy, memory_budget=memory_budget)
+            csv_file_name_2_rows = {
+                csv_file_name: RowsFactory.from_string(content, pre_load=False)
+                for csv_file_name, content in csv_file_name_2_content.items()
+            }
+            try:
+                sorted_rows = csv_sorter.sort(csv_file_name_2_rows)
+                obj = CsvsToEdifact()
+                obj.load(sorted_rows)
+                RowsFactory.close(sorted_rows)
+                run_directory = csv_sorter._run_directory
+            finally:
+                csv_sorter.cleanup()
+            self.assertEqual(expected, obj.get(), f"Wrong result with memory budget {memory_budget}.")
+            self.assertEqual(expect_runs, csv_sorter.get_run_count() > 0)
+            if expect_runs:
+                self.assertFalse(Path(run_directory.name).exists())
+
+    def test_sort_descending_ids(self):
+        csv_file_name_2_content = {
+            csv_file_name: path.read_text(encoding="utf-8")
+            for csv_file_name, path in (
+                (META_FILE_NAME, test_data_helper.SKDUPD_ALL_FIELDS_META_FILE),
+                (TRAIN_FILE_NAME, test_data_helper.SKDUPD_ALL_FIELDS_TRAIN_FILE),
+                (POR_FILE_NAME, test_data_helper.SKDUPD_ALL_FIELDS_POR_FILE),
+                (RELATION_FILE_NAME, test_data_helper.SKDUPD_ALL_FIELDS_RELATION_FILE),
+                (ODI_FILE_NAME, test_data_helper.SKDUPD_ALL_FIELDS_ODI_FILE),
+            )
+        }
+        por_ids = [row["por_id"] for row in csv.DictReader(
+            io.StringIO(csv_file_name_2_content[POR_FILE_NAME]), **config.get_csv_dict_reader_kwargs()
+        )]
+        # The POR rows keep their order, but their ID's descend.
+        old_2_new_por_id = dict(zip(por_ids, reversed(por_ids)))
+
+        def renumber_pors(rows: List[Dict[str, str]]) -> List[Dict[str, str]]:
+            for row in rows:
+                row["por_id"] = old_2_new_por_id[row["por_id"]]
+            return rows
+
+        def spread_relations(rows: List[Dict[str, str]]) -> List[Dict[str, str]]:
+            # The relations of the second and the third POR, in the order of the POR rows.
+            for idx, row in enumerate(rows):
+                row["por_id"] = old_2_new_por_id[por_ids[1 if idx < 3 else 2]]
+            return rows
+
+        csv_file_name_2_content[POR_FILE_NAME] = change_rows(csv_file_name_2_content[POR_FILE_NAME], renumber_pors)
+        csv_file_name_2_content[RELATION_FILE_NAME] = change_rows(
+            csv_file_name_2_content[RELATION_FILE_NAME], spread_relations,
+        )
+        csvs_to_edifact = CsvsToEdifact()
+        csvs_to_edifact.load_csvs(csv_file_name_2_content=csv_file_name_2_content)
+        expected = csvs_to_edifact.get()
+        self.assertEqual(5, expected.count("\nRLS+"))
+
+        # The relations of the third POR first.
+        csv_file_name_2_content[RELATION_FILE_NAME] = change_rows(
+            csv_file_name_2_content[RELATION_FILE_NAME], lambda rows: rows[3:] + rows[:3],
+        )
+        self.assertEqual((expected, []), sort_and_convert(csv_file_name_2_content))
+        # The POR table alone is over the memory budget, so it and the RELATION table are sorted in run files.
+        actual, run_file_names = sort_and_convert(csv_file_name_2_content, memory_budget=1500)
+        self.assertEqual(expected, actual)
+        self.assertTrue(any(name.startswith(f"{POR_FILE_NAME}.") for name in run_file_names), run_file_names)
+        self.assertTrue(any(name.startswith(f"{RELATION_FILE_NAME}.") for name in run_file_names), run_file_names)
+
+        # A relation of which the POR does not exist is not skipped silently.
+        csv_file_name_2_content[RELATION_FILE_NAME] = change_rows(
+            csv_file_name_2_content[RELATION_FILE_NAME], lambda rows: rows + [dict(rows[0], por_id="99")],
+        )
+        with self.assertRaisesRegex(MeritsException, f"Row in {RELATION_FILE_NAME} with parent ID 99"):
+            sort_and_convert(csv_file_name_2_content)
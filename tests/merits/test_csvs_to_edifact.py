@@ -1,5 +1,10 @@
+import io
 from unittest import TestCase
 
+from merits.csvs_zip.rows import RowsFactory
+from merits.edifact.collector_to_file import CollectorToFile
+from merits.exceptions import MeritsException
+
 from merits.skdupd.definition import META_FILE_NAME, ODI_FILE_NAME, RELATION_FILE_NAME, POR_FILE_NAME, TRAIN_FILE_NAME
 from merits.skdupd.csvs_to_edifact import CsvsToEdifact
 from merits.tsdupd.definition import (
@@ -55,3 +60,63 @@ class TestCsvsToEdifact(TestCase):
         test_data_helper.dump_txt(actual, test_data_helper.TSDUPD_V3_ACTUAL_FILE)
         expected = test_data_helper.load_txt(test_data_helper.TSDUPD_V3_FILE)
         self.assertEqual(expected, actual)
+
+    def test_collector_to_file(self):
+        csv_file_name_2_content = {
+            META_FILE_NAME: test_data_helper.load_txt(test_data_helper.SKDUPD_ALL_FIELDS_META_FILE),
+            TRAIN_FILE_NAME: test_data_helper.load_txt(test_data_helper.SKDUPD_ALL_FIELDS_TRAIN_FILE),
+            POR_FILE_NAME: test_data_helper.load_txt(test_data_helper.SKDUPD_ALL_FIELDS_POR_FILE),
+            RELATION_FILE_NAME: test_data_helper.load_txt(test_data_helper.SKDUPD_ALL_FIELDS_RELATION_FILE),
+            ODI_FILE_NAME: test_data_helper.load_txt(test_data_helper.SKDUPD_ALL_FIELDS_ODI_FILE),
+        }
+        stream = io.StringIO()
+        edifact_collector = CollectorToFile(stream)
+        obj = CsvsToEdifact(edifact_collector=edifact_collector)
+        obj.load_csvs(csv_file_name_2_content=csv_file_name_2_content)
+        edifact_collector.close()
+        expected = test_data_helper.load_txt(test_data_helper.SKDUPD_ALL_FIELDS_FILE)
+        self.assertEqual(expected, stream.getvalue())
+        self.assertEqual(len(expected.splitlines()), edifact_collector.segment_count())
+        with self.assertRaises(MeritsException):
+            obj.get()
+
+    def test_iter_segments(self):
+        csv_file_name_2_rows = {
+            csv_file_name: RowsFactory.from_string(test_data_helper.load_txt(file), positional=True)
+            for csv_file_name, file in (
+                (META_FILE_NAME, test_data_helper.SKDUPD_ALL_FIELDS_META_FILE),
+                (TRAIN_FILE_NAME, test_data_helper.SKDUPD_ALL_FIELDS_TRAIN_FILE),
+                (POR_FILE_NAME, test_data_helper.SKDUPD_ALL_FIELDS_POR_FILE),
+                (RELATION_FILE_NAME, test_data_helper.SKDUPD_ALL_FIELDS_RELATION_FILE),
+                (ODI_FILE_NAME, test_data_helper.SKDUPD_ALL_FIELDS_ODI_FILE),
+            )
+        }
+        expected = test_data_helper.load_txt(test_data_helper.SKDUPD_ALL_FIELDS_FILE).splitlines()
+        obj = CsvsToEdifact()
+        segments = obj.iter_segments(csv_file_name_2_rows)
+        # The header is given before the trains are read.
+        first_prd_idx = [segment[:3] for segment in expected].index("PRD")
+        actual = [next(segments) for _ in range(first_prd_idx)]
+        self.assertEqual(expected[:first_prd_idx], actual)
+        first_train = RowsFactory.from_string(
+            test_data_helper.load_txt(test_data_helper.SKDUPD_ALL_FIELDS_TRAIN_FILE), positional=True,
+        ).peek_values()
+        self.assertEqual(first_train, csv_file_name_2_rows[TRAIN_FILE_NAME].peek_values())
+        actual.extend(segments)
+        self.assertEqual(expected, actual)
+        self.assertEqual(0, obj.get_edifact_collector().segment_count())
+
+        csv_file_name_2_content = {
+            TSDUPD_META_FILE_NAME: test_data_helper.load_txt(test_data_helper.TSDUPD_V3_META_FILE),
+            STOP_FILE_NAME: test_data_helper.load_txt(test_data_helper.TSDUPD_V3_STOP_FILE),
+            SYNONYM_FILE_NAME: test_data_helper.load_txt(test_data_helper.TSDUPD_V3_SYNONYM_FILE),
+            MCT_FILE_NAME: test_data_helper.load_txt(test_data_helper.TSDUPD_V3_MCT_FILE),
+            FOOTPATH_FILE_NAME: test_data_helper.load_txt(test_data_helper.TSDUPD_V3_FOOTPATH_FILE),
+        }
+        for unsorted_csvs in (False, True):
+            obj = TsdupdCsvsToEdifact(unsorted_csvs=unsorted_csvs)
+            segments = obj.iter_segments({
+                csv_file_name: RowsFactory.from_string(content, positional=True)
+                for csv_file_name, content in csv_file_name_2_content.items()
+            })
+            self.assertEqual(test_data_helper.load_txt(test_data_helper.TSDUPD_V3_FILE).splitlines(), list(segments))
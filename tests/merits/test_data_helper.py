@@ -1,8 +1,11 @@
 from pathlib import Path
-from typing import List
+from typing import Callable, List
+from unittest import TestCase
 
+from benchmarks.fixtures import SkdupdSize, generate_skdupd
 from merits.edifact.data_handler import DataHandler
 from merits.edifact.object_model import DataLeaf, DataBranch
+from merits.memory_tracker import MIB, MemoryTracker, PhaseMemory
 
 SKDUPD_ALL_FIELDS_FILE = Path("tests/EDIFACT_examples/SKDUPD_all_fields.r")
 SKDUPD_ALL_FIELDS_META_FILE = Path("tests/EDIFACT_examples/SKDUPD_all_fields_META.csv")
@@ -69,6 +72,46 @@ def dump_txt(content: str, file: Path) -> None:
         fp.write(content)
 
 
+def get_skdupd_trains(train_count: int) -> List[str]:
+    """
+    Gives the segments of a synthetic SKDUPD message, see benchmarks/fixtures.py.
+    :param train_count: the number of 2_PRD groups
+    :return:
+    """
+    return generate_skdupd(SkdupdSize(trains=train_count))
+
+
+def assert_memory_budget(
+        test_case: TestCase,
+        name: str,
+        function: Callable[[], None],
+        budget_mib: float,
+) -> PhaseMemory:
+    """
+    Runs the function as a phase of a MemoryTracker, and fails the test if the peak of the memory that Python allocated
+    during the function is over the budget. The message gives the allocation sites that grew the most.
+    :param test_case:
+    :param name: the name of the phase
+    :param function:
+    :param budget_mib:
+    :return: the measurements of the phase
+    """
+    memory_tracker = MemoryTracker()
+    try:
+        with memory_tracker.phase(name):
+            function()
+    finally:
+        memory_tracker.close()
+    phase = memory_tracker.name_2_phase[name]
+    if phase.traced_peak_bytes > budget_mib * MIB:
+        test_case.fail(
+            f'The peak memory of {name} is {phase.traced_peak_bytes / MIB:.1f} MiB,'
+            f' over the budget of {budget_mib} MiB:\n'
+            + "\n".join(memory_tracker.get_report())
+        )
+    return phase
+
+
 class DataHandlerToStr(DataHandler):
 
     def __init__(
@@ -86,11 +129,10 @@ class DataHandlerToStr(DataHandler):
 
     def on_enter_leaf(self, leaf: DataLeaf):
         self._add_line(f'Entered leaf "{leaf.path}".')
-        # noinspection PyProtectedMember
-        name_len = max(len(n) for n in leaf._name_2_value) if leaf._name_2_value else 1
+        name_2_value = leaf.get_all()
+        name_len = max(len(n) for n in name_2_value) if name_2_value else 1
         fmt = f'    "{{name:{name_len}}}" = "{{value}}"'
-        # noinspection PyProtectedMember
-        for name, value in leaf._name_2_value.items():
+        for name, value in name_2_value.items():
             self._add_line(fmt.format(name=name, value=value))
 
     def on_exit_leaf(self, path: str):
@@ -1,14 +1,27 @@
+import itertools
 from pathlib import Path
 from unittest import TestCase
 
 from . import test_data_helper
+from merits.edifact.edifact_event import ENTER_BRANCH, EXIT_BRANCH, LEAF, handle_events
 from merits.edifact.edifact_reader import EdifactReader
+from merits.exceptions import MeritsException
 
 from merits.skdupd.definition import edifact_definition as skdupd_definition
 from merits.tsdupd.definition import edifact_definition as tsdupd_definition
 from .test_data_helper import DataHandlerToStr
 
 
+class DataHandlerToStrWithInterest(DataHandlerToStr):
+
+    def __init__(self, path_2_field_names):
+        super().__init__(do_print=False)
+        self.path_2_field_names = path_2_field_names
+
+    def interest(self):
+        return self.path_2_field_names
+
+
 class TestEdifactReader(TestCase):
 
     FILE_001_PRINT = Path("tests/merits/test_edifact_reader-001-print.txt")
@@ -55,3 +68,82 @@ class TestEdifactReader(TestCase):
         test_data_helper.dump_txt(actual, self.FILE_002_PRINT_ACTUAL)
         expected = test_data_helper.load_txt(self.FILE_002_PRINT)
         self.assertEqual(expected, actual, "Wrong printed result.")
+
+    def test_read_interest(self):
+        edifact = test_data_helper.load_txt(test_data_helper.SKDUPD_ALL_FIELDS_FILE)
+        edifact_lines = edifact.splitlines(keepends=False)
+        expected = test_data_helper.load_txt(self.FILE_001_PRINT)
+
+        # Declaring all fields of all segments gives the full result.
+        data_handler = DataHandlerToStrWithInterest({
+            line.strip()[len("Entered leaf \""):-len("\".")]: None
+            for line in expected.splitlines()
+            if line.startswith("Entered leaf") and "start" not in line
+        })
+        EdifactReader(definition=skdupd_definition).read(segments=edifact_lines, data_handler=data_handler)
+        self.assertEqual(expected, data_handler.get_result(), "Wrong printed result with interest in all fields.")
+
+        # Only declared fields up to the last declared field are read.
+        data_handler = DataHandlerToStrWithInterest({"UIB": ["syntax_version_number"]})
+        EdifactReader(definition=skdupd_definition).read(segments=edifact_lines, data_handler=data_handler)
+        actual_lines = data_handler.get_result().splitlines()
+        self.assertEqual(
+            [
+                'Entered leaf "UIB".',
+                '    "syntax_identifier    " = "UNOB"',
+                '    "syntax_version_number" = "4"',
+                'Exited leaf "UIB".',
+                'Entered leaf "UIH".',
+                'Exited leaf "UIH".',
+            ],
+            actual_lines[1:7],
+        )
+        self.assertEqual(
+            [line for line in expected.splitlines() if not line.startswith("    ")],
+            [line for line in actual_lines if not line.startswith("    ")],
+            "The structure should be reported in full.",
+        )
+
+        for path_2_field_names in ({"XXX": None}, {"2_PRD": None}, {"UIB": ["xxx"]}):
+            with self.assertRaises(MeritsException):
+                EdifactReader(definition=skdupd_definition).read(
+                    segments=edifact_lines,
+                    data_handler=DataHandlerToStrWithInterest(path_2_field_names),
+                )
+
+    def test_iter_events(self):
+        edifact = test_data_helper.load_txt(test_data_helper.SKDUPD_ALL_FIELDS_FILE)
+        edifact_lines = edifact.splitlines(keepends=False)
+        edifact_reader = EdifactReader(definition=skdupd_definition)
+
+        # A stopped iteration is abandoned by the next one.
+        first_events = list(itertools.islice(edifact_reader.iter_events(segments=edifact_lines), 3))
+        self.assertEqual([LEAF, LEAF, LEAF], [kind for kind, _ in first_events])
+        self.assertEqual(["UIB", "UIH", "MSD"], [leaf.path for _, leaf in first_events])
+
+        events = list(edifact_reader.iter_events(segments=edifact_lines))
+        leaves = [payload for kind, payload in events if kind == LEAF]
+        self.assertEqual([line[:3] for line in edifact_lines], [leaf.path.split("/")[-1] for leaf in leaves])
+        open_paths = []
+        for kind, payload in events:
+            if kind == ENTER_BRANCH:
+                open_paths.append(payload)
+            elif kind == EXIT_BRANCH:
+                self.assertEqual(open_paths.pop(), payload)
+        self.assertEqual([], open_paths)
+
+        # The events give a data handler the same calls as read, apart from leaving the begin state.
+        data_handler = DataHandlerToStr(do_print=False)
+        handle_events(events=events, data_handler=data_handler)
+        expected = test_data_helper.load_txt(self.FILE_001_PRINT)
+        self.assertEqual(expected.split("\n", 1)[1], data_handler.get_result())
+
+        # Open groups are exited at the end of an incomplete message.
+        first_part = edifact_lines[:[line[:3] for line in edifact_lines].index("POR")]
+        events = list(edifact_reader.iter_events(segments=first_part, is_complete=False))
+        self.assertEqual([(EXIT_BRANCH, "2_PRD/4_POP"), (EXIT_BRANCH, "2_PRD")], events[-2:])
+
+        events = edifact_reader.iter_events(segments=edifact_lines, interest={"UIB": ["syntax_identifier"]})
+        leaves = [payload for kind, payload in events if kind == LEAF]
+        self.assertEqual("UNOB", leaves[0].get("syntax_identifier"))
+        self.assertEqual({}, leaves[1].get_all())
@@ -68,6 +68,40 @@ class TestEdifactToCsvs(TestCase):
             "Wrong " + TRAIN_FILE_NAME
         )
 
+    def test_load_skdupd_from_file_and_stream(self):
+        edifact = test_data_helper.load_txt(test_data_helper.SKDUPD_ALL_FIELDS_FILE)
+        obj = SkdupdEdifactToCsvs()
+        obj.load(edifact_segments=edifact.splitlines(keepends=False))
+        expected = obj.get_csvs()
+
+        obj = SkdupdEdifactToCsvs()
+        obj.load(edifact_segments=test_data_helper.SKDUPD_ALL_FIELDS_FILE)
+        self.assertEqual(expected, obj.get_csvs(), "Wrong CSVs when loaded from a file path.")
+
+        with open(test_data_helper.SKDUPD_ALL_FIELDS_FILE, "rb") as f:
+            obj = SkdupdEdifactToCsvs()
+            obj.load(edifact_segments=f)
+        self.assertEqual(expected, obj.get_csvs(), "Wrong CSVs when loaded from a binary stream.")
+
+    def test_interest(self):
+        # The interest of a data handler lists the fields that its leaf handlers read. If it misses a field, the
+        # conversion gives other CSVs than with the interest None, which means all fields are parsed.
+        for convertor_class, file in [
+            (SkdupdEdifactToCsvs, test_data_helper.SKDUPD_ALL_FIELDS_FILE),
+            (TsdupdEdifactToCsvs, test_data_helper.TSDUPD_ALL_FIELDS_FILE),
+            (TsdupdEdifactToCsvs, test_data_helper.TSDUPD_ESCAPES_FILE),
+            (TsdupdEdifactToCsvs, test_data_helper.TSDUPD_V3_FILE),
+        ]:
+            obj = convertor_class()
+            self.assertIsNotNone(obj._data_handler.interest())
+            obj.load(edifact_segments=file)
+            expected = obj.get_csvs()
+
+            obj = convertor_class()
+            obj._data_handler.interest = lambda: None
+            obj.load(edifact_segments=file)
+            self.assertEqual(expected, obj.get_csvs(), f"Wrong CSVs for {file} when only the interest is parsed.")
+
     def test_get_csvs_tsdupd(self):
         edifact = test_data_helper.load_txt(test_data_helper.TSDUPD_ALL_FIELDS_FILE)
         edifact_segments = edifact.splitlines(keepends=False)
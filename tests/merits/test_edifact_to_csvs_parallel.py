@@ -0,0 +1,99 @@
+from typing import List
+from unittest import TestCase
+
+from . import test_data_helper
+from merits.edifact_to_csvs_parallel import EdifactToCsvsParallel
+from merits.exceptions import MeritsException
+from merits.skdupd import definition as skdupd_definition
+from merits.skdupd.edifact_to_csvs import EdifactToCsvs as SkdupdEdifactToCsvs
+from merits.tsdupd import definition as tsdupd_definition
+from merits.tsdupd.edifact_to_csvs import EdifactToCsvs as TsdupdEdifactToCsvs
+
+
+def get_skdupd_segments(group_count: int) -> List[str]:
+    """
+    Gives the header, the first group_count 2_PRD groups, and the trailer of the SKDUPD example.
+    """
+    segments = test_data_helper.load_txt(test_data_helper.SKDUPD_EXAMPLE_FILE).splitlines(keepends=False)
+    group_starts = [idx for idx, segment in enumerate(segments) if segment.startswith("PRD+")]
+    trailer_start = next(idx for idx, segment in enumerate(segments) if segment.startswith("UIT+"))
+    return segments[:group_starts[group_count]] + segments[trailer_start:]
+
+
+class TestEdifactToCsvsParallel(TestCase):
+
+    def test_get_csvs_skdupd(self):
+        segments = get_skdupd_segments(group_count=25)
+        csv_file_name_2_next_id = {
+            skdupd_definition.TRAIN_FILE_NAME: 12,
+            skdupd_definition.POR_FILE_NAME: 3456,
+        }
+        serial = SkdupdEdifactToCsvs()
+        serial.set_csv_file_name_2_next_id(csv_file_name_2_next_id)
+        serial.load(edifact_segments=segments)
+        expected = serial.get_csvs()
+
+        for jobs, groups_per_chunk in ((1, 1), (1, 7), (2, 4), (1, 100)):
+            obj = EdifactToCsvsParallel(
+                convertor_class=SkdupdEdifactToCsvs,
+                definition=skdupd_definition.edifact_definition,
+                csv_hierarchy=skdupd_definition.get_csv_hierarchy(),
+                partition_path=skdupd_definition.PARTITION_PATH,
+                jobs=jobs,
+                groups_per_chunk=groups_per_chunk,
+            )
+            obj.set_csv_file_name_2_next_id(csv_file_name_2_next_id)
+            obj.load(edifact_segments=segments)
+            self.assertEqual(expected, obj.get_csvs(), f"Wrong CSVs with {jobs} jobs, {groups_per_chunk} per chunk.")
+            self.assertEqual(serial.get_csv_file_name_2_next_id(), obj.get_csv_file_name_2_next_id())
+
+    def test_get_csvs_tsdupd(self):
+        csv_file_name_2_next_id = {
+            tsdupd_definition.STOP_FILE_NAME: 10,
+            tsdupd_definition.SYNONYM_FILE_NAME: 20,
+            tsdupd_definition.MCT_FILE_NAME: 30,
+            tsdupd_definition.FOOTPATH_FILE_NAME: 40,
+        }
+        for file in (test_data_helper.TSDUPD_V3_FILE, test_data_helper.TSDUPD_ESCAPES_FILE):
+            segments = test_data_helper.load_txt(file).splitlines(keepends=False)
+            serial = TsdupdEdifactToCsvs()
+            serial.set_csv_file_name_2_next_id(csv_file_name_2_next_id)
+            serial.load(edifact_segments=segments)
+            expected = serial.get_csvs()
+
+            for jobs, groups_per_chunk in ((1, 1), (2, 2), (1, 100)):
+                obj = EdifactToCsvsParallel(
+                    convertor_class=TsdupdEdifactToCsvs,
+                    definition=tsdupd_definition.edifact_definition,
+                    csv_hierarchy=tsdupd_definition.get_csv_hierarchy(),
+                    partition_path=tsdupd_definition.PARTITION_PATH,
+                    jobs=jobs,
+                    groups_per_chunk=groups_per_chunk,
+                )
+                obj.set_csv_file_name_2_next_id(csv_file_name_2_next_id)
+                obj.load(edifact_segments=segments)
+                self.assertEqual(expected, obj.get_csvs(), f"Wrong CSVs for {file} with {jobs} jobs.")
+                self.assertEqual(serial.get_csv_file_name_2_next_id(), obj.get_csv_file_name_2_next_id())
+
+    def test_errors(self):
+        with self.assertRaises(MeritsException):
+            EdifactToCsvsParallel(
+                convertor_class=SkdupdEdifactToCsvs,
+                definition=skdupd_definition.edifact_definition,
+                csv_hierarchy=skdupd_definition.get_csv_hierarchy(),
+                partition_path="2_PRD/4_POP",
+                jobs=2,
+            )
+        segments = get_skdupd_segments(group_count=3)
+        por_idx = next(idx for idx, segment in enumerate(segments) if segment.startswith("POR+"))
+        segments[por_idx] = "POR+x+y+z+w+v+u+t+s+r+q+p+o+n"
+        obj = EdifactToCsvsParallel(
+            convertor_class=SkdupdEdifactToCsvs,
+            definition=skdupd_definition.edifact_definition,
+            csv_hierarchy=skdupd_definition.get_csv_hierarchy(),
+            partition_path=skdupd_definition.PARTITION_PATH,
+            jobs=1,
+            groups_per_chunk=1,
+        )
+        with self.assertRaisesRegex(MeritsException, "Failed to convert the chunk of lines"):
+            obj.load(edifact_segments=segments)
@@ -0,0 +1,48 @@
+from unittest import TestCase
+
+from merits.edifact.edifact_writer import EdifactWriter
+from merits.exceptions import MeritsException
+from merits.skdupd import definition
+
+
+class TestEdifactWriter(TestCase):
+
+    def test_to_edifact_values(self):
+        obj = EdifactWriter(definition.edifact_definition)
+        for _ in range(2):
+            # The second time the bound plan is reused.
+            obj._state_machine.reset()
+            self.assertEqual(
+                "UIB+UNOB:4+2022-07-26T112758'",
+                obj.to_edifact_values(
+                    path="UIB",
+                    field_names=("initiator",),
+                    values=("2022-07-26T112758",),
+                    add_defaults_for=("syntax_identifier", "syntax_version_number"),
+                ),
+            )
+            self.assertEqual(
+                "UIH+SKDUPD:D:04A+1+2022-07-26T112758'",
+                obj.to_edifact(
+                    path="UIH",
+                    data={"initiator": "2022-07-26T112758", "sequence_number": "1"},
+                    add_defaults_for=["message_type", "message_version", "message_release"],
+                ),
+            )
+        self.assertEqual(2, len(obj._key_2_bound_plan))
+
+    def test_to_edifact_values_errors(self):
+        obj = EdifactWriter(definition.edifact_definition)
+        with self.assertRaisesRegex(MeritsException, "name not in definition"):
+            obj.to_edifact_values(path="UIB", field_names=("unknown",), values=("x",))
+        obj._state_machine.reset()
+        with self.assertRaisesRegex(MeritsException, 'already has value "UNOB"'):
+            obj.to_edifact_values(
+                path="UIB",
+                field_names=("syntax_identifier",),
+                values=("x",),
+                add_defaults_for=("syntax_identifier",),
+            )
+        obj._state_machine.reset()
+        with self.assertRaisesRegex(MeritsException, "Could not find a format"):
+            obj.to_edifact_values(path="XXX", field_names=(), values=())
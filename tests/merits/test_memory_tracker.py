@@ -0,0 +1,88 @@
+import tracemalloc
+from unittest import TestCase
+
+from . import test_data_helper
+from merits.csvs_zip.rows import RowsFactory
+from merits.exceptions import MeritsException
+from merits.memory_tracker import MIB, MemoryTracker
+from merits.skdupd.csvs_to_edifact import CsvsToEdifact
+from merits.skdupd.edifact_to_csvs import EdifactToCsvs
+
+
+class TestMemoryTracker(TestCase):
+
+    def test_phases(self):
+        memory_tracker = MemoryTracker()
+        with memory_tracker.phase("outer"):
+            kept = [bytes(1024) for _ in range(1024)]
+            with memory_tracker.phase("inner"):
+                freed = bytearray(4 * MIB)
+                del freed
+        memory_tracker.close()
+        self.assertFalse(tracemalloc.is_tracing())
+        with self.assertRaisesRegex(MeritsException, "no phase is running"):
+            memory_tracker.stop()
+
+        self.assertEqual(["outer", "inner"], list(memory_tracker.name_2_phase))
+        inner = memory_tracker.name_2_phase["inner"]
+        outer = memory_tracker.name_2_phase["outer"]
+        self.assertGreaterEqual(inner.traced_peak_bytes, 4 * MIB)
+        self.assertLess(inner.traced_growth_bytes, MIB)
+        # The peak of the outer phase includes the inner phase.
+        self.assertGreaterEqual(outer.traced_peak_bytes, 5 * MIB)
+        self.assertGreaterEqual(outer.traced_growth_bytes, MIB)
+        location, site = memory_tracker.get_top_sites("outer")[0]
+        self.assertIn("test_memory_tracker.py", location)
+        self.assertGreaterEqual(site.block_count, 1024)
+        self.assertEqual(1024, len(kept))
+
+        other = MemoryTracker()
+        with other.phase("inner"):
+            kept = [bytes(1024) for _ in range(2048)]
+        other.close()
+        memory_tracker.merge(other)
+        self.assertGreaterEqual(memory_tracker.name_2_phase["inner"].traced_growth_bytes, 2 * MIB)
+        self.assertEqual(inner.traced_peak_bytes, memory_tracker.name_2_phase["inner"].traced_peak_bytes)
+        report = memory_tracker.get_report()
+        self.assertTrue(report[1].startswith("outer"))
+        self.assertIn("test_memory_tracker.py", report[2])
+
+    def test_budget(self):
+        # About 7 KiB per train while the rows are collected in memory.
+        segments = test_data_helper.get_skdupd_trains(200)
+        edifact_to_csvs = EdifactToCsvs()
+        phase = test_data_helper.assert_memory_budget(
+            self, "convert", lambda: edifact_to_csvs.load(segments), budget_mib=4,
+        )
+        self.assertGreater(phase.traced_growth_bytes, 0)
+        zipped = []
+        test_data_helper.assert_memory_budget(
+            self, "zip", lambda: zipped.append(edifact_to_csvs.get_csv_collector().to_zip()), budget_mib=4,
+        )
+        csvs_to_edifact = CsvsToEdifact()
+        test_data_helper.assert_memory_budget(
+            self, "convert back", lambda: csvs_to_edifact.load_zip(zipped[0]), budget_mib=8,
+        )
+        self.assertEqual("\n".join(segments) + "\n", csvs_to_edifact.get())
+
+        with self.assertRaisesRegex(AssertionError, "over the budget of 0.1 MiB"):
+            test_data_helper.assert_memory_budget(
+                self, "convert", lambda: EdifactToCsvs().load(segments), budget_mib=0.1,
+            )
+
+    def test_iter_segments_budget(self):
+        edifact_to_csvs = EdifactToCsvs()
+        edifact_to_csvs.load(test_data_helper.get_skdupd_trains(400))
+        csv_file_name_2_rows = {
+            csv_file_name: RowsFactory.from_string(content, positional=True)
+            for csv_file_name, content in edifact_to_csvs.get_csvs().items()
+        }
+        # The segments of one train at a time, however many trains there are.
+        segment_counts = []
+        test_data_helper.assert_memory_budget(
+            self,
+            "iter segments",
+            lambda: segment_counts.append(sum(1 for _ in CsvsToEdifact().iter_segments(csv_file_name_2_rows))),
+            budget_mib=0.25,
+        )
+        self.assertGreater(segment_counts[0], 400)
@@ -0,0 +1,37 @@
+from unittest import TestCase
+
+from merits.edifact.definition_model import Segment
+from merits.edifact.object_model import DataLeaf
+from merits.edifact.segment_format import SegmentFormat
+from merits.exceptions import MeritsException
+from merits.skdupd import definition
+
+
+class TestDataLeaf(TestCase):
+
+    def test_set_get(self):
+        segment_format = SegmentFormat(
+            definition=Segment(node_id="0000", name="TST", format="TST+a_0*b_1:+c_0"),
+            config=definition.edifact_definition.config,
+        )
+        self.assertEqual({"a_0": 0, "b_1": 1, "c_0": 3}, segment_format.name_2_index)
+        self.assertEqual({"a_0", "b_1", "c_0"}, segment_format.name_set)
+
+        leaf = DataLeaf(path="TST", segment_format=segment_format)
+        leaf.set("c_0", "c")
+        leaf.set("a_0", None)
+        self.assertEqual("c", leaf.get("c_0"))
+        self.assertIsNone(leaf.get("a_0", "default"))
+        self.assertEqual("", leaf.get("b_1"))
+        self.assertIsNone(leaf.get("b_1", None))
+        self.assertEqual({"a_0": None, "c_0": "c"}, leaf.get_all())
+        self.assertEqual(["a_0", "c_0"], list(leaf.get_all()))
+
+        with self.assertRaises(MeritsException):
+            leaf.set("a_0", "again")
+        with self.assertRaises(MeritsException):
+            leaf.set("x", "x")
+        with self.assertRaises(MeritsException):
+            leaf.get("x")
+        with self.assertRaises(AttributeError):
+            leaf.other = "other"
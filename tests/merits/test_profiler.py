@@ -0,0 +1,75 @@
+from unittest import TestCase
+
+from . import test_data_helper
+from merits.exceptions import MeritsException
+from merits.profiler import (
+    PHASE_CSV_READ,
+    PHASE_CSV_SERIALIZE,
+    PHASE_EDIFACT_PARSE,
+    PHASE_EDIFACT_READ,
+    PHASE_EDIFACT_SERIALIZE,
+    PHASE_EDIFACT_STATE_MACHINE,
+    PHASE_EDIFACT_WRITE,
+    PHASE_MAP_TO_CSV,
+    PHASE_MAP_TO_EDIFACT,
+    Profiler,
+)
+from merits.skdupd.csvs_to_edifact import CsvsToEdifact
+from merits.skdupd.edifact_to_csvs import EdifactToCsvs
+
+
+class TestProfiler(TestCase):
+
+    def test_nested_phases(self):
+        profiler = Profiler()
+        profiler.start("outer")
+        profiler.start("inner")
+        profiler.stop(2)
+        with profiler.phase("inner"):
+            pass
+        profiler.stop()
+        self.assertEqual(["outer", "inner"], list(profiler.name_2_phase))
+        self.assertEqual(2, profiler.name_2_phase["inner"].item_count)
+        with self.assertRaisesRegex(MeritsException, "no phase is running"):
+            profiler.stop()
+
+        timed = profiler.timed("function", lambda x: x + 1)
+        self.assertEqual(2, timed(1))
+        self.assertEqual([1, 2], list(profiler.iter_timed("iterator", iter([1, 2]))))
+        self.assertEqual(1, profiler.name_2_phase["function"].item_count)
+        self.assertEqual(2, profiler.name_2_phase["iterator"].item_count)
+
+        other = Profiler()
+        other.add("inner", item_count=3, byte_count=10)
+        profiler.merge(other)
+        self.assertEqual(5, profiler.name_2_phase["inner"].item_count)
+        self.assertEqual(10, profiler.name_2_phase["inner"].byte_count)
+        report = profiler.get_report()
+        self.assertEqual(len(profiler.name_2_phase) + 2, len(report))
+        self.assertTrue(report[-1].startswith("total"))
+
+    def test_conversions(self):
+        edifact = test_data_helper.load_txt(test_data_helper.SKDUPD_ALL_FIELDS_FILE)
+        segment_count = len(edifact.splitlines())
+
+        profiler = Profiler()
+        edifact_to_csvs = EdifactToCsvs(profiler=profiler)
+        edifact_to_csvs.load(edifact.splitlines())
+        expected_csvs = EdifactToCsvs()
+        expected_csvs.load(edifact.splitlines())
+        csvs = edifact_to_csvs.get_csvs()
+        self.assertEqual(expected_csvs.get_csvs(), csvs)
+        row_count = sum(len(content.splitlines()) - 1 for content in csvs.values())
+        for name in (PHASE_EDIFACT_READ, PHASE_EDIFACT_STATE_MACHINE, PHASE_EDIFACT_PARSE, PHASE_MAP_TO_CSV):
+            self.assertEqual(segment_count, profiler.name_2_phase[name].item_count, name)
+        self.assertEqual(row_count, profiler.name_2_phase[PHASE_CSV_SERIALIZE].item_count)
+
+        profiler = Profiler()
+        csvs_to_edifact = CsvsToEdifact(profiler=profiler)
+        csvs_to_edifact.load_csvs(csvs)
+        self.assertEqual(edifact, csvs_to_edifact.get())
+        for name in (PHASE_EDIFACT_STATE_MACHINE, PHASE_EDIFACT_SERIALIZE, PHASE_EDIFACT_WRITE):
+            self.assertEqual(segment_count, profiler.name_2_phase[name].item_count, name)
+        # The meta row is peeked, not popped.
+        for name in (PHASE_CSV_READ, PHASE_MAP_TO_EDIFACT):
+            self.assertEqual(row_count - 1, profiler.name_2_phase[name].item_count, name)
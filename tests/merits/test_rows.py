@@ -0,0 +1,118 @@
+import io
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from zipfile import ZipFile
+
+from . import test_data_helper
+from merits.csvs_zip.csv_handler import RowObjectFactory
+from merits.csvs_zip.rows import RowsFactory, RowsDictReader, RowsInMemory, RowsValuesInMemory, RowsValuesIterator
+from merits.skdupd.csv_model import Relation
+from merits.skdupd.csvs_to_edifact import CsvsToEdifact
+from merits.skdupd.definition import META_FILE_NAME, ODI_FILE_NAME, RELATION_FILE_NAME, POR_FILE_NAME, TRAIN_FILE_NAME
+
+CSV_FILE_NAME_2_FILE = {
+    META_FILE_NAME: test_data_helper.SKDUPD_ALL_FIELDS_META_FILE,
+    TRAIN_FILE_NAME: test_data_helper.SKDUPD_ALL_FIELDS_TRAIN_FILE,
+    POR_FILE_NAME: test_data_helper.SKDUPD_ALL_FIELDS_POR_FILE,
+    RELATION_FILE_NAME: test_data_helper.SKDUPD_ALL_FIELDS_RELATION_FILE,
+    ODI_FILE_NAME: test_data_helper.SKDUPD_ALL_FIELDS_ODI_FILE,
+}
+
+
+def get_zip() -> bytes:
+    f = io.BytesIO()
+    with ZipFile(f, mode="w") as zf:
+        for csv_file_name, file in CSV_FILE_NAME_2_FILE.items():
+            zf.writestr(csv_file_name, test_data_helper.load_txt(file))
+    return f.getvalue()
+
+
+class TestRows(TestCase):
+
+    def test_rows_dict_reader(self):
+        rows = RowsFactory.from_string('"a";"b"\n"1";"2"\n"";""\n', pre_load=False)
+        self.assertIsInstance(rows, RowsDictReader)
+        self.assertEqual(["a", "b"], rows.headers())
+        self.assertTrue(rows.has_more())
+        self.assertEqual({"a": "1", "b": "2"}, rows.peek())
+        self.assertEqual({"a": "1", "b": "2"}, rows.pop())
+        self.assertTrue(rows.has_more())
+        self.assertEqual({"a": "", "b": ""}, rows.pop())
+        self.assertFalse(rows.has_more())
+        with self.assertRaises(StopIteration):
+            rows.peek()
+        rows.close()
+
+    def test_from_zip_lazy(self):
+        zipped = get_zip()
+        expected = RowsFactory.from_zip(zipped)
+        actual = RowsFactory.from_zip(zipped, pre_load=False)
+        self.assertEqual(sorted(expected), sorted(actual))
+        for csv_file_name, rows in actual.items():
+            self.assertIsInstance(rows, RowsDictReader)
+            self.assertIsInstance(expected[csv_file_name], RowsInMemory)
+            self.assertEqual(expected[csv_file_name].headers(), rows.headers())
+            # Read the members interleaved, as the conversion does.
+            self.assertEqual(expected[csv_file_name].pop(), rows.pop())
+        for csv_file_name, rows in actual.items():
+            expected_rows = expected[csv_file_name]
+            while expected_rows.has_more():
+                self.assertEqual(expected_rows.pop(), rows.pop())
+            self.assertFalse(rows.has_more())
+        RowsFactory.close(actual)
+
+    def test_csvs_to_edifact_lazy(self):
+        expected = test_data_helper.load_txt(test_data_helper.SKDUPD_ALL_FIELDS_FILE)
+
+        csv_file_name_2_rows = RowsFactory.from_zip(get_zip(), pre_load=False)
+        obj = CsvsToEdifact()
+        obj.load(csv_file_name_2_rows)
+        RowsFactory.close(csv_file_name_2_rows)
+        self.assertEqual(expected, obj.get())
+
+        with tempfile.TemporaryDirectory() as directory:
+            for csv_file_name, file in CSV_FILE_NAME_2_FILE.items():
+                shutil.copy(file, Path(directory) / csv_file_name)
+            csv_file_name_2_rows = RowsFactory.from_directory(directory, pre_load=False)
+            try:
+                obj = CsvsToEdifact()
+                obj.load(csv_file_name_2_rows)
+            finally:
+                RowsFactory.close(csv_file_name_2_rows)
+        self.assertEqual(expected, obj.get())
+
+    def test_positional(self):
+        content = '"a";"b";"c"\n"1";"2";"3"\n\n"4"\n'
+        for pre_load, expected_class in ((True, RowsValuesInMemory), (False, RowsValuesIterator)):
+            rows = RowsFactory.from_string(content, pre_load=pre_load, positional=True)
+            self.assertIsInstance(rows, expected_class)
+            self.assertEqual(["a", "b", "c"], rows.headers())
+            self.assertEqual({"a": 0, "b": 1, "c": 2}, rows.header_2_index())
+            self.assertIs(rows.header_2_index(), rows.header_2_index())
+            self.assertEqual({"a": "1", "b": "2", "c": "3"}, rows.peek())
+            self.assertEqual(["1", "2", "3"], rows.pop_values())
+            # Like csv.DictReader, skip empty lines and fill in missing values.
+            self.assertEqual(["4", "", ""], rows.peek_values())
+            self.assertEqual({"a": "4", "b": "", "c": ""}, rows.pop())
+            self.assertFalse(rows.has_more())
+            rows.close()
+
+        rows = RowsFactory.from_string(content)
+        self.assertEqual(["1", "2", "3"], rows.pop_values())
+        self.assertEqual(["4", "", ""], rows.peek_values())
+
+    def test_row_object_factory(self):
+        expected = Relation("1", "2", "3", "s", "r", "t", "c")
+        factory = RowObjectFactory(Relation)
+        header_2_index = {
+            "relation_id": 0, "por_id": 1, "train_id": 2, "service": 3, "relation": 4, "transfer_time": 5,
+            "certainty": 6,
+        }
+        self.assertEqual(expected, factory.create(["1", "2", "3", "s", "r", "t", "c"], header_2_index))
+        reordered = {
+            "certainty": 0, "relation_id": 1, "por_id": 2, "train_id": 3, "service": 4, "relation": 5,
+            "transfer_time": 6,
+        }
+        self.assertEqual(expected, factory.create(["c", "1", "2", "3", "s", "r", "t"], reordered))
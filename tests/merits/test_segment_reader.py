@@ -0,0 +1,100 @@
+from unittest import TestCase
+
+from . import test_data_helper
+from merits.edifact.definition_model import Segment
+from merits.edifact.object_model import DataLeaf
+from merits.edifact.segment_format import SegmentFormat
+from merits.edifact.segment_reader import SegmentReader
+from merits.skdupd import definition
+from merits.skdupd.definition import edifact_definition as skdupd_definition
+from merits.tsdupd.definition import edifact_definition as tsdupd_definition
+
+
+class TestSegmentReader(TestCase):
+
+    def _create_reader(self) -> SegmentReader:
+        segment_definition = Segment(
+            node_id="0000",
+            name="TST",
+            format="""
+            TST
+            +a_0=A
+                *b_1
+                    :c_2
+                    :d_2
+                *e_1
+                    :f_2
+                    :
+            +g_0
+                    :h_2
+                    :
+                    :i_2
+            """,
+        )
+        segment_format = SegmentFormat(
+            definition=segment_definition,
+            config=definition.edifact_definition.config,
+        )
+        return SegmentReader(path="TST", segment_format=segment_format)
+
+    def _assert_same_leaf(self, reader: SegmentReader, edifact_segment: str) -> DataLeaf:
+        """
+        Asserts that the unescaped fast path and the character loop give the same result.
+        """
+        expected = DataLeaf(path=reader.path, segment_format=reader.segment_format)
+        reader._split_escaped(edifact_segment=edifact_segment, data_leaf=expected)
+        actual = DataLeaf(path=reader.path, segment_format=reader.segment_format)
+        reader._split_unescaped(edifact_segment=edifact_segment, data_leaf=actual)
+        self.assertEqual(expected.get_all(), actual.get_all(), edifact_segment)
+        self.assertEqual(expected.error, actual.error, edifact_segment)
+        return actual
+
+    def test_from_edifact(self):
+        reader = self._create_reader()
+        leaf = reader.from_edifact("TST+A**:f_value+g_value:h_value::i_value'")
+        self.assertIsNone(leaf.error)
+        self.assertEqual(
+            {"a_0": "A", "b_1": "", "e_1": "", "f_2": "f_value", "g_0": "g_value",
+             "h_2": "h_value", "i_2": "i_value"},
+            leaf.get_all(),
+        )
+        leaf = reader.from_edifact("TST+A+g?+value?''")
+        self.assertIsNone(leaf.error)
+        self.assertEqual({"a_0": "A", "g_0": "g+value'"}, leaf.get_all())
+
+    def test_split_unescaped_same_as_escaped(self):
+        reader = self._create_reader()
+        for edifact_segment in (
+                "TST'",
+                "TST",
+                "TST+A'",
+                "TST+A'+ignored",
+                "TST+A*b:c:d*e:f:+g:h::i'",
+                "TST+A*b:c:d*e:f:+g:h::i:x'",
+                "TST+A*b:c:d:x'",
+                "TST+B*b'",
+                "TST:A'",
+                "TST+A+g+x'",
+                "TST+A++'",
+                "TST+A+'",
+        ):
+            self._assert_same_leaf(reader, edifact_segment)
+        with self.assertRaises(Exception):
+            reader.from_edifact("XXX+A'")
+
+    def test_split_unescaped_example_files(self):
+        for file, edifact_definition in (
+                (test_data_helper.SKDUPD_ALL_FIELDS_FILE, skdupd_definition),
+                (test_data_helper.TSDUPD_ALL_FIELDS_FILE, tsdupd_definition),
+        ):
+            name_2_readers = {}
+            for segment in edifact_definition.segment_list:
+                segment_format = SegmentFormat(definition=segment, config=edifact_definition.config)
+                name_2_readers.setdefault(segment_format.name, []).append(
+                    SegmentReader(path=segment.node_id, segment_format=segment_format)
+                )
+            for line in test_data_helper.load_txt(file).splitlines(keepends=False):
+                if "?" in line:
+                    continue
+                for reader in name_2_readers[line[:3]]:
+                    self._assert_same_leaf(reader, line)
@@ -0,0 +1,25 @@
+import io
+from unittest import TestCase
+
+from merits.edifact.segment_source import iter_segments
+from . import test_data_helper
+
+
+class TestSegmentSource(TestCase):
+
+    def test_iter_segments_chunks(self):
+        content = "UIB+UNOB:4'\r\nUIH+SKDUPD'\rMSD+AAR:61'\n\nORG+0000'\r\n"
+        expected = content.splitlines()
+        for chunk_size in (1, 2, 3, 5, 8, 100):
+            actual = list(iter_segments(io.StringIO(content, newline=""), chunk_size=chunk_size))
+            self.assertEqual(expected, actual, f"Wrong segments for chunk_size {chunk_size}.")
+
+    def test_iter_segments_file_and_streams(self):
+        file = test_data_helper.SKDUPD_ALL_FIELDS_FILE
+        expected = test_data_helper.load_txt(file).splitlines(keepends=False)
+        self.assertEqual(expected, list(iter_segments(file, chunk_size=7)))
+        self.assertEqual(expected, list(iter_segments(str(file))))
+        with open(file, "rb") as f:
+            self.assertEqual(expected, list(iter_segments(f, chunk_size=16)))
+            self.assertFalse(f.closed, "The stream of the caller should stay open.")
+        self.assertEqual(expected, list(iter_segments(expected)))
@@ -0,0 +1,61 @@
+import json
+from collections import Counter
+from unittest import TestCase
+
+from . import test_data_helper
+from .test_data_helper import DataHandlerToStr
+from merits.edifact.edifact_reader import EdifactReader
+from merits.edifact.edifact_writer import EdifactWriter
+from merits.edifact.segment_stats import SegmentStats
+from merits.exceptions import MeritsException
+from merits.skdupd import definition
+from merits.skdupd.csvs_to_edifact import CsvsToEdifact
+from merits.skdupd.edifact_to_csvs import EdifactToCsvs
+
+
+class TestSegmentStats(TestCase):
+
+    def test_read_and_write(self):
+        segments = test_data_helper.load_txt(test_data_helper.SKDUPD_ALL_FIELDS_FILE).splitlines()
+
+        read_stats = SegmentStats()
+        edifact_to_csvs = EdifactToCsvs(segment_observer=read_stats)
+        edifact_to_csvs.load(segments)
+        self.assertEqual(len(segments), sum(stats.segment_count for stats in read_stats.path_2_stats.values()))
+        self.assertEqual(
+            sum(len(segment) for segment in segments),
+            sum(stats.character_count for stats in read_stats.path_2_stats.values()),
+        )
+        por_count = Counter(segment[:3] for segment in segments)["POR"]
+        self.assertEqual(por_count, read_stats.path_2_stats["2_PRD/4_POP/7_POR/POR"].segment_count)
+
+        write_stats = SegmentStats()
+        csvs_to_edifact = CsvsToEdifact(segment_observer=write_stats)
+        csvs_to_edifact.load_csvs(edifact_to_csvs.get_csvs())
+        for path, stats in read_stats.path_2_stats.items():
+            self.assertEqual(stats.segment_count, write_stats.path_2_stats[path].segment_count, path)
+            self.assertEqual(stats.character_count, write_stats.path_2_stats[path].character_count, path)
+
+        read_stats.merge(write_stats)
+        self.assertEqual(2 * por_count, read_stats.path_2_stats["2_PRD/4_POP/7_POR/POR"].segment_count)
+        exported = json.loads(read_stats.to_json())
+        self.assertEqual(set(read_stats.path_2_stats), set(exported["paths"]))
+        seconds = [stats["seconds"] for stats in exported["paths"].values()]
+        self.assertEqual(sorted(seconds, reverse=True), seconds)
+
+    def test_errors(self):
+        segments = test_data_helper.load_txt(test_data_helper.SKDUPD_ALL_FIELDS_FILE).splitlines()
+        msd_idx = [segment[:3] for segment in segments].index("MSD")
+        segments[msd_idx] = segments[msd_idx][:-1] + "+1+2+3+4+5'"
+        stats = SegmentStats()
+        edifact_reader = EdifactReader(definition=definition.edifact_definition, segment_observer=stats)
+        with self.assertRaisesRegex(MeritsException, "Failed to read line"):
+            edifact_reader.read(segments=segments, data_handler=DataHandlerToStr(do_print=False))
+        self.assertEqual(1, stats.path_2_stats["MSD"].error_count)
+
+        stats = SegmentStats()
+        edifact_writer = EdifactWriter(definition=definition.edifact_definition, segment_observer=stats)
+        with self.assertRaises(MeritsException):
+            edifact_writer.to_edifact("UIB", {"unknown": "x"})
+        self.assertEqual(1, stats.path_2_stats["UIB"].error_count)
+        self.assertEqual(0, stats.path_2_stats["UIB"].character_count)
@@ -1,3 +1,4 @@
+from dataclasses import replace
 from unittest import TestCase
 
 from merits.edifact.definition_model import Segment
@@ -7,10 +8,8 @@ from merits.edifact.segment_writer import SegmentWriter
 from merits.skdupd import definition
 
 
-class TestSegmentWriter(TestCase):
-
-    def test_to_edifact(self):
-        segment_definition = Segment(
+def get_segment_definition() -> Segment:
+    return Segment(
             node_id="0000",
             name="TST",
             format="""
@@ -27,10 +26,15 @@ class TestSegmentWriter(TestCase):
                     :
                     :i_2
             """,
-        )
+    )
+
+
+class TestSegmentWriter(TestCase):
+
+    def test_to_edifact(self):
         config = definition.edifact_definition.config
         segment_format = SegmentFormat(
-            definition=segment_definition,
+            definition=get_segment_definition(),
             config=config,
         )
 
@@ -46,3 +50,21 @@ class TestSegmentWriter(TestCase):
         actual = obj.to_edifact(leaf)
         expected = "TST+a_0_value**:f_2_value+g_0_value:h_2_value'"
         self.assertEqual(expected, actual)
+
+    def test_escape(self):
+        config = replace(definition.edifact_definition.config)
+        segment_format = SegmentFormat(
+            definition=get_segment_definition(),
+            config=config,
+        )
+        leaf = DataLeaf(
+            path="TST",
+            segment_format=segment_format,
+        )
+        leaf.set("a_0", "1+2*3:4?5'6")
+        leaf.set("d_2", "plain")
+        self.assertEqual("TST+1?+2?*3?:4??5?'6*::plain'", SegmentWriter.to_edifact(leaf))
+
+        # The write plan follows changes of the config.
+        config.escape_char = "\\"
+        self.assertEqual("TST+1\\+2\\*3\\:4?5\\'6*::plain'", SegmentWriter.to_edifact(leaf))
@@ -0,0 +1,34 @@
+from unittest import TestCase
+
+from . import test_data_helper
+from merits.edifact.state_machine import StateMachine
+
+from merits.skdupd.definition import edifact_definition as skdupd_definition
+
+
+class TestStateMachine(TestCase):
+
+    def test_handle_uses_route_table(self):
+        edifact = test_data_helper.load_txt(test_data_helper.SKDUPD_ALL_FIELDS_FILE)
+        segment_names = [line[:3] for line in edifact.splitlines(keepends=False)]
+        state_machine = StateMachine(definition=skdupd_definition)
+        for _ in range(2):
+            state_machine.reset()
+            for segment_name in segment_names:
+                state = state_machine.state
+                expected_transitions, expected_err_msg = state.handle_trigger(segment_name)
+                transitions, err_msg = state_machine.handle(segment_name)
+                self.assertIsNone(err_msg)
+                self.assertEqual(expected_transitions, list(transitions))
+                # The second time the route is taken from the table.
+                self.assertIs(transitions, state_machine._route_table[(state.path, segment_name)][0])
+            transitions, err_msg = state_machine.finish()
+            self.assertIsNone(err_msg)
+
+    def test_handle_invalid_trigger(self):
+        state_machine = StateMachine(definition=skdupd_definition)
+        transitions, err_msg = state_machine.handle("XXX")
+        self.assertEqual([], list(transitions))
+        self.assertIn('Invalid trigger "XXX"', err_msg)
+        self.assertIs(state_machine.begin_state, state_machine.state)
+        self.assertEqual({}, state_machine._route_table)
@@ -0,0 +1,226 @@
+import json
+import pstats
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict
+from unittest import TestCase
+
+from . import test_data_helper
+from merits.cmd.arg_definition import (
+    Arguments, CONVERSION_TSDUPD_EDIFACT_CSV_MULTI, CONVERSION_TSDUPD_CSV_EDIFACT_MULTI, CONVERSION_TSDUPD_EDIFACT_COUNT,
+    CONVERSION_TSDUPD_EDIFACT_CSV, CONVERSION_TSDUPD_CSV_EDIFACT,
+)
+from merits.cmd.worker import Worker
+from merits.exceptions import MeritsException
+from merits.memory_tracker import PHASE_CONVERT
+from merits.profiler import PHASE_CSV_SERIALIZE, PHASE_EDIFACT_PARSE, PHASE_FILE_WRITE, PHASE_ZIP
+from merits.skdupd.edifact_to_csvs import EdifactToCsvs as SkdupdEdifactToCsvs
+from merits.tsdupd.edifact_to_csvs import EdifactToCsvs
+
+TSDUPD_FILES = [
+    test_data_helper.TSDUPD_ALL_FIELDS_FILE,
+    test_data_helper.TSDUPD_ESCAPES_FILE,
+    Path("tests/EDIFACT_examples/TSDUPD_V3.r"),
+]
+SKDUPD_FILES = [
+    test_data_helper.SKDUPD_ALL_FIELDS_FILE,
+    test_data_helper.SKDUPD_EXAMPLE_FILE,
+]
+
+
+def read_files(directory: Path) -> Dict[str, str]:
+    return {
+        str(path.relative_to(directory)): path.read_text(encoding="utf-8")
+        for path in sorted(directory.rglob("*"))
+        if path.is_file()
+    }
+
+
+class TestWorker(TestCase):
+
+    def test_count_csv_rows(self):
+        convertor_class_and_files = [(EdifactToCsvs, file) for file in TSDUPD_FILES]
+        convertor_class_and_files += [(SkdupdEdifactToCsvs, file) for file in SKDUPD_FILES]
+        for convertor_class, file in convertor_class_and_files:
+            convertor = convertor_class()
+            convertor.load(file)
+            expected = {
+                csv_file_name: next_id - 1
+                for csv_file_name, next_id in convertor.get_csv_file_name_2_next_id().items()
+            }
+            self.assertEqual(expected, convertor_class.count_csv_rows(file), file)
+        segments = test_data_helper.load_txt(test_data_helper.TSDUPD_ALL_FIELDS_FILE).splitlines()
+        with self.assertRaisesRegex(MeritsException, "Illegal segment at line 2"):
+            EdifactToCsvs.count_csv_rows([segments[0], segments[0]])
+        with self.assertRaisesRegex(MeritsException, "Could not finalize"):
+            EdifactToCsvs.count_csv_rows(segments[:-1])
+
+    def test_multi_jobs(self):
+        with tempfile.TemporaryDirectory() as directory:
+            directory = Path(directory)
+            edifact_dir = directory / "edifact"
+            edifact_dir.mkdir()
+            for file in TSDUPD_FILES:
+                shutil.copy(file, edifact_dir)
+
+            dir_2_next_ids = {}
+            for jobs in (1, 2):
+                arguments = Arguments(
+                    conversion=CONVERSION_TSDUPD_EDIFACT_CSV_MULTI,
+                    csv_zip=False,
+                    input=edifact_dir,
+                    output=directory / f"csv-{jobs}",
+                    csv_file_name_2_next_id={"TSDUPD_STOP.csv": 100},
+                    jobs=jobs,
+                )
+                Worker(arguments).run()
+                dir_2_next_ids[jobs] = arguments.csv_file_name_2_next_id
+                arguments = Arguments(
+                    conversion=CONVERSION_TSDUPD_CSV_EDIFACT_MULTI,
+                    csv_zip=False,
+                    input=directory / f"csv-{jobs}",
+                    output=directory / f"edifact-{jobs}",
+                    jobs=jobs,
+                )
+                Worker(arguments).run()
+
+            self.assertEqual(dir_2_next_ids[1], dir_2_next_ids[2])
+
+            arguments = Arguments(
+                conversion=CONVERSION_TSDUPD_EDIFACT_COUNT,
+                csv_zip=False,
+                input=edifact_dir,
+                output=directory / "ids.txt",
+                csv_file_name_2_next_id={"TSDUPD_STOP.csv": 100},
+            )
+            Worker(arguments).run()
+            self.assertEqual(dir_2_next_ids[1], arguments.csv_file_name_2_next_id)
+            lines = (directory / "ids.txt").read_text(encoding="utf-8").splitlines()
+            self.assertEqual(4, len(lines))
+            self.assertTrue(lines[0].endswith(
+                ": --csv-id TSDUPD_STOP.csv=100 TSDUPD_SYNONYM.csv=1 TSDUPD_MCT.csv=1 TSDUPD_FOOTPATH.csv=1"
+            ))
+            self.assertEqual(100 + 4 + 6 + 1, dir_2_next_ids[2]["TSDUPD_STOP.csv"])
+            self.assertEqual(read_files(directory / "csv-1"), read_files(directory / "csv-2"))
+            self.assertEqual(read_files(directory / "edifact-1"), read_files(directory / "edifact-2"))
+            self.assertEqual(3, len(read_files(directory / "edifact-2")))
+
+    def test_profile(self):
+        with tempfile.TemporaryDirectory() as directory:
+            directory = Path(directory)
+            edifact_dir = directory / "edifact"
+            edifact_dir.mkdir()
+            for file in TSDUPD_FILES:
+                shutil.copy(file, edifact_dir)
+
+            messages = []
+            arguments = Arguments(
+                conversion=CONVERSION_TSDUPD_EDIFACT_CSV,
+                csv_zip=True,
+                input=edifact_dir / TSDUPD_FILES[0].name,
+                output=directory / "csv.zip",
+                profile=True,
+                profile_stats=directory / "stats",
+            )
+            Worker(arguments, print_function=messages.append).run()
+            report = messages[-1].splitlines()
+            self.assertEqual("Profile:", report[0])
+            phase_names = [line.strip().split("  ")[0] for line in report[2:]]
+            for name in (PHASE_EDIFACT_PARSE, PHASE_CSV_SERIALIZE, PHASE_ZIP, "total"):
+                self.assertIn(name, phase_names)
+            self.assertTrue(pstats.Stats(str(directory / "stats")).total_calls > 0)
+
+            messages = []
+            arguments = Arguments(
+                conversion=CONVERSION_TSDUPD_EDIFACT_CSV_MULTI,
+                csv_zip=False,
+                input=edifact_dir,
+                output=directory / "csv",
+                jobs=2,
+                profile=True,
+                segment_stats=directory / "segments.json",
+            )
+            Worker(arguments, print_function=messages.append).run()
+            # The measurements of the other processes are merged.
+            self.assertIn(PHASE_EDIFACT_PARSE, messages[-2])
+            path_2_stats = json.loads((directory / "segments.json").read_text(encoding="utf-8"))["paths"]
+            self.assertEqual(len(TSDUPD_FILES), path_2_stats["UIB"]["segment_count"])
+
+    def test_failed_conversion(self):
+        with tempfile.TemporaryDirectory() as directory:
+            directory = Path(directory)
+            arguments = Arguments(
+                conversion=CONVERSION_TSDUPD_EDIFACT_CSV,
+                csv_zip=False,
+                input=TSDUPD_FILES[0],
+                output=directory / "csv",
+            )
+            Worker(arguments).run()
+
+            # A failed conversion keeps the existing output.
+            (directory / "csv" / "TSDUPD_MCT.csv").unlink()
+            output = directory / "edifact" / "TSDUPD.r"
+            output.parent.mkdir()
+            output.write_text("old", encoding="utf-8")
+            arguments = Arguments(
+                conversion=CONVERSION_TSDUPD_CSV_EDIFACT,
+                csv_zip=False,
+                input=directory / "csv",
+                output=output,
+            )
+            with self.assertRaisesRegex(MeritsException, "Missing files"):
+                Worker(arguments).run()
+            self.assertEqual({"TSDUPD.r": "old"}, read_files(output.parent))
+
+            segments = test_data_helper.load_txt(TSDUPD_FILES[0]).splitlines()
+            edifact_file = directory / "TSDUPD.r"
+            edifact_file.write_text("\n".join(segments[:-1]), encoding="utf-8")
+            expected = read_files(directory / "csv")
+            arguments = Arguments(
+                conversion=CONVERSION_TSDUPD_EDIFACT_CSV,
+                csv_zip=False,
+                input=edifact_file,
+                output=directory / "csv",
+            )
+            with self.assertRaisesRegex(MeritsException, "Could not finalize"):
+                Worker(arguments).run()
+            self.assertEqual(expected, read_files(directory / "csv"))
+
+    def test_memory_report(self):
+        with tempfile.TemporaryDirectory() as directory:
+            directory = Path(directory)
+            edifact_dir = directory / "edifact"
+            edifact_dir.mkdir()
+            for file in TSDUPD_FILES:
+                shutil.copy(file, edifact_dir)
+
+            messages = []
+            arguments = Arguments(
+                conversion=CONVERSION_TSDUPD_EDIFACT_CSV,
+                csv_zip=True,
+                input=edifact_dir / TSDUPD_FILES[0].name,
+                output=directory / "csv.zip",
+                profile=True,
+                memory_report=True,
+            )
+            Worker(arguments, print_function=messages.append).run()
+            report = messages[-1].splitlines()
+            self.assertEqual("Memory report:", report[0])
+            # The allocation sites are indented under their phase.
+            phase_names = [line.strip().split("  ")[0] for line in report[2:] if not line.startswith(" " * 8)]
+            self.assertEqual([PHASE_CONVERT, PHASE_FILE_WRITE, PHASE_ZIP], phase_names)
+            self.assertTrue(messages[-2].startswith("Profile:"))
+
+            messages = []
+            arguments = Arguments(
+                conversion=CONVERSION_TSDUPD_EDIFACT_CSV_MULTI,
+                csv_zip=False,
+                input=edifact_dir,
+                output=directory / "csv",
+                jobs=2,
+                memory_report=True,
+            )
+            Worker(arguments, print_function=messages.append).run()
+            # The measurements of the other processes are merged.
+            self.assertIn(PHASE_CONVERT, messages[-1])